@@ -0,0 +1,48 @@
+"""add notes_fts full-text index
+
+Revision ID: 2b7f3e9a4c15
+Revises: 9d4a6c2f1b87
+Create Date: 2026-10-17 02:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2b7f3e9a4c15'
+down_revision: Union[str, Sequence[str], None] = '9d4a6c2f1b87'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "CREATE VIRTUAL TABLE notes_fts USING fts5("
+        "text, content='notes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_notes_fts_insert AFTER INSERT ON notes BEGIN\n"
+        "    INSERT INTO notes_fts (rowid, text) VALUES (NEW.id, NEW.text);\nEND"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_notes_fts_delete AFTER DELETE ON notes BEGIN\n"
+        "    INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);\nEND"
+    )
+    op.execute(
+        "CREATE TRIGGER trg_notes_fts_update AFTER UPDATE OF text ON notes BEGIN\n"
+        "    INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);\n"
+        "    INSERT INTO notes_fts (rowid, text) VALUES (NEW.id, NEW.text);\nEND"
+    )
+    # Индексируем уже существующие заметки
+    op.execute("INSERT INTO notes_fts (notes_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_fts_update")
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_fts_delete")
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_fts_insert")
+    op.execute("DROP TABLE IF EXISTS notes_fts")
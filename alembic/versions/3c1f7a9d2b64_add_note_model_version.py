@@ -0,0 +1,29 @@
+"""add note model_version
+
+Revision ID: 3c1f7a9d2b64
+Revises: 8af35c8ec19f
+Create Date: 2026-10-16 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f7a9d2b64'
+down_revision: Union[str, Sequence[str], None] = '8af35c8ec19f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notes', sa.Column('model_version', sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('notes') as batch_op:
+        batch_op.drop_column('model_version')
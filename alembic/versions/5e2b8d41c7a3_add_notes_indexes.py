@@ -0,0 +1,31 @@
+"""add notes indexes
+
+Revision ID: 5e2b8d41c7a3
+Revises: 3c1f7a9d2b64
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e2b8d41c7a3'
+down_revision: Union[str, Sequence[str], None] = '3c1f7a9d2b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_notes_updated_at_created_at', 'notes', ['updated_at', 'created_at'])
+    op.create_index('ix_notes_emotion_created_at', 'notes', ['emotion', 'created_at'])
+    op.create_index('ix_notes_created_at', 'notes', ['created_at'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notes_created_at', table_name='notes')
+    op.drop_index('ix_notes_emotion_created_at', table_name='notes')
+    op.drop_index('ix_notes_updated_at_created_at', table_name='notes')
@@ -0,0 +1,70 @@
+"""add note_stats rollup
+
+Revision ID: 9d4a6c2f1b87
+Revises: 5e2b8d41c7a3
+Create Date: 2026-10-17 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d4a6c2f1b87'
+down_revision: Union[str, Sequence[str], None] = '5e2b8d41c7a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEY = "date({row}.created_at), CAST(strftime('%H', {row}.created_at) AS INTEGER), {row}.emotion"
+MATCH = ("day = date({row}.created_at) AND hour = CAST(strftime('%H', {row}.created_at) AS INTEGER) "
+         "AND emotion = {row}.emotion")
+
+ADD = f"""
+    INSERT INTO note_stats (day, hour, emotion, count, len_sum, len_sq_sum)
+    VALUES ({KEY.format(row='NEW')}, 1, length(NEW.text), length(NEW.text) * length(NEW.text))
+    ON CONFLICT (day, hour, emotion) DO UPDATE SET
+        count = count + 1,
+        len_sum = len_sum + excluded.len_sum,
+        len_sq_sum = len_sq_sum + excluded.len_sq_sum;"""
+
+REMOVE = f"""
+    UPDATE note_stats SET
+        count = count - 1,
+        len_sum = len_sum - length(OLD.text),
+        len_sq_sum = len_sq_sum - length(OLD.text) * length(OLD.text)
+    WHERE {MATCH.format(row='OLD')};
+    DELETE FROM note_stats WHERE {MATCH.format(row='OLD')} AND count <= 0;"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'note_stats',
+        sa.Column('day', sa.String(length=10), nullable=False),
+        sa.Column('hour', sa.Integer(), nullable=False),
+        sa.Column('emotion', sa.String(length=32), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('len_sum', sa.Integer(), nullable=False),
+        sa.Column('len_sq_sum', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('day', 'hour', 'emotion'),
+    )
+    op.execute(f"CREATE TRIGGER trg_notes_stats_insert AFTER INSERT ON notes BEGIN{ADD}\nEND")
+    op.execute(f"CREATE TRIGGER trg_notes_stats_delete AFTER DELETE ON notes BEGIN{REMOVE}\nEND")
+    op.execute("CREATE TRIGGER trg_notes_stats_update AFTER UPDATE OF created_at, emotion, text ON notes "
+               f"BEGIN{REMOVE}{ADD}\nEND")
+    # Заполняем сводку по уже существующим заметкам
+    op.execute(
+        "INSERT INTO note_stats (day, hour, emotion, count, len_sum, len_sq_sum) "
+        f"SELECT {KEY.format(row='notes')}, count(*), sum(length(text)), sum(length(text) * length(text)) "
+        "FROM notes GROUP BY 1, 2, 3"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_stats_update")
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_stats_delete")
+    op.execute("DROP TRIGGER IF EXISTS trg_notes_stats_insert")
+    op.drop_table('note_stats')
@@ -0,0 +1,100 @@
+"""
+@file
+@brief Отчёт «точность против задержки» для бэкендов EmotionDetector.
+@details
+Классифицирует фиксированный корпус каждым доступным бэкендом и сравнивает результаты
+с эталонным eager fp32: долю совпавших меток, максимальное расхождение вероятностей,
+среднюю задержку одного текста и пропускную способность пакетного режима.
+Запуск из корня проекта:
+    python -m benchmarks.backend_report --backends eager int8 onnx
+"""
+
+import argparse
+import json
+import statistics
+import time
+
+from benchmarks.batch_throughput import make_corpus
+from scripts.emotion_backends import BACKENDS
+from scripts.emotion_class import EmotionDetector
+
+
+def run_backend(name: str, texts: list[str], batch_size: int) -> dict:
+    """
+    @brief Загружает бэкенд и измеряет его на корпусе.
+    @param name Имя бэкенда.
+    @param texts Корпус текстов.
+    @param batch_size Размер пакета для predict_batch.
+    @return Словарь с результатами классификации и замерами.
+    """
+    started = time.perf_counter()
+    detector = EmotionDetector(backend=name)
+    load_s = time.perf_counter() - started
+
+    detector.predict_batch(texts[:4])  # прогрев
+
+    latencies = []
+    for text in texts:
+        started = time.perf_counter()
+        detector.start(text)
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    results = detector.predict_batch(texts, batch_size=batch_size)
+    batch_s = time.perf_counter() - started
+
+    return {
+        "results": results,
+        "load_s": load_s,
+        "latency_ms_mean": statistics.mean(latencies) * 1000,
+        "latency_ms_median": statistics.median(latencies) * 1000,
+        "throughput_tps": len(texts) / batch_s,
+    }
+
+
+def compare(reference: list, candidate: list) -> dict:
+    """
+    @brief Сравнивает результаты бэкенда с эталонными.
+    @param reference Результаты eager fp32.
+    @param candidate Результаты сравниваемого бэкенда.
+    @return Доля совпавших меток и максимальное абсолютное расхождение вероятностей.
+    """
+    agree = sum(r.label == c.label for r, c in zip(reference, candidate))
+    max_diff = max(
+        abs(r.probs[label] - c.probs[label])
+        for r, c in zip(reference, candidate)
+        for label in r.probs
+    )
+    return {"label_agreement": agree / len(reference), "max_prob_diff": max_diff}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--texts", type=int, default=200, help="размер корпуса")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--json", help="сохранить отчёт в JSON-файл")
+    args = parser.parse_args()
+
+    texts = make_corpus(args.texts, seed=42)
+    reference = run_backend("eager", texts, args.batch_size)
+    expected = reference.pop("results")
+
+    report = {}
+    for name in args.backends:
+        measured = dict(reference, results=expected) if name == "eager" else run_backend(name, texts, args.batch_size)
+        results = measured.pop("results")
+        report[name] = {**measured, **compare(expected, results)}
+
+    print(f"{'бэкенд':8} {'загрузка,с':>10} {'мс/текст':>9} {'текстов/с':>10} {'совпадение':>10} {'max Δp':>8}")
+    for name, row in report.items():
+        print(f"{name:8} {row['load_s']:10.2f} {row['latency_ms_mean']:9.2f} {row['throughput_tps']:10.1f}"
+              f" {row['label_agreement']:10.2%} {row['max_prob_diff']:8.4f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"texts": len(texts), "batch_size": args.batch_size, "backends": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+@file
+@brief Сравнение пропускной способности EmotionDetector: start() в цикле против predict_batch().
+@details
+Загружает локальную модель один раз, формирует корпус текстов разной длины и измеряет,
+сколько текстов в секунду обрабатывает каждый из способов. Запуск из корня проекта:
+    python -m benchmarks.batch_throughput --texts 256 --batch-size 32
+"""
+
+import argparse
+import random
+import time
+
+#: @brief Фразы, из которых собираются тексты корпуса.
+PHRASES = [
+    "Сегодня был отличный день, я гулял в парке.",
+    "Мне грустно, что всё так получилось.",
+    "Не понимаю, почему меня снова никто не послушал!",
+    "Интересно, что будет завтра на встрече.",
+    "Я боюсь, что не успею закончить проект вовремя.",
+    "Ничего особенного не произошло.",
+]
+
+
+def make_corpus(size: int, seed: int = 0) -> list[str]:
+    """
+    @brief Генерирует воспроизводимый корпус текстов разной длины.
+    @param size Количество текстов.
+    @param seed Зерно генератора случайных чисел.
+    @return Список текстов.
+    """
+    rng = random.Random(seed)
+    return [" ".join(rng.choices(PHRASES, k=rng.randint(1, 20))) for _ in range(size)]
+
+
+def measure(fn, texts: list[str]) -> float:
+    """
+    @brief Измеряет пропускную способность функции классификации.
+    @param fn Функция, принимающая список текстов.
+    @param texts Корпус текстов.
+    @return Количество текстов в секунду.
+    """
+    started = time.perf_counter()
+    fn(texts)
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=256, help="размер корпуса")
+    parser.add_argument("--batch-size", type=int, default=32, help="размер пакета predict_batch")
+    args = parser.parse_args()
+
+    # Импорт здесь, чтобы корпус можно было использовать без загрузки torch
+    from scripts.emotion_class import EmotionDetector
+
+    detector = EmotionDetector()
+    texts = make_corpus(args.texts)
+    # Прогрев, чтобы первый вызов не учитывал ленивую инициализацию torch
+    detector.predict_batch(texts[:4])
+
+    loop_tps = measure(lambda items: [detector.start(t) for t in items], texts)
+    batch_tps = measure(lambda items: detector.predict_batch(items, batch_size=args.batch_size), texts)
+
+    print(f"start() в цикле:   {loop_tps:8.1f} текстов/с")
+    print(f"predict_batch({args.batch_size}): {batch_tps:8.1f} текстов/с")
+    print(f"Ускорение: x{batch_tps / loop_tps:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+@file
+@brief Накладные расходы одного обращения к БД: asyncio.run на каждый вызов против DBRuntime.
+@details
+Создаёт временную БД с заметками и для каждого способа измеряет задержку синхронного вызова:
+пустой корутины (чистая цена запуска цикла) и чтения заметки по id через NoteRepository.
+Для asyncio.run замеряются два пула: общий движок (как раньше делал main.py) и NullPool
+(новое соединение на каждый вызов). Запуск из корня проекта:
+    python -m benchmarks.db_runtime_overhead --calls 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.pool import NullPool
+
+from db.base import Base
+from db.crud import NoteRepository
+from db.runtime import DBRuntime
+from db.session import make_engine
+
+
+def measure(call, calls: int) -> dict[str, float]:
+    """
+    @brief Измеряет задержку синхронного вызова.
+    @param call Функция без аргументов.
+    @param calls Число вызовов (после 10 прогревочных).
+    @return Среднее, p50 и p95 в микросекундах.
+    """
+    for _ in range(10):
+        call()
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - started) * 1e6)
+    timings.sort()
+    return {
+        "mean_us": statistics.fmean(timings),
+        "p50_us": timings[len(timings) // 2],
+        "p95_us": timings[int(len(timings) * 0.95)],
+    }
+
+
+async def fill(engine, notes: int) -> None:
+    """
+    @brief Создаёт схему и добавляет заметки.
+    """
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)() as session:
+        await NoteRepository(session, cache=None).add_many(
+            [{"text": f"Заметка {i}", "emotion": "neutral"} for i in range(notes)]
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=500, help="вызовов на каждый сценарий")
+    parser.add_argument("--notes", type=int, default=1000, help="заметок во временной БД")
+    args = parser.parse_args()
+
+    url = f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    asyncio.run(fill(make_engine(url, poolclass=NullPool), args.notes))
+
+    async def noop():
+        return None
+
+    def reader(engine):
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+        async def get():
+            async with sessions() as session:
+                return await NoteRepository(session, cache=None).get(args.notes // 2)
+        return get
+
+    shared = make_engine(url)
+    cold = make_engine(url, poolclass=NullPool)
+    runtime = DBRuntime()
+    pooled = make_engine(url)
+    try:
+        results = {
+            "asyncio.run, пустая корутина": measure(lambda: asyncio.run(noop()), args.calls),
+            "DBRuntime, пустая корутина": measure(lambda: runtime.run(noop()), args.calls),
+            "asyncio.run + NullPool, get()": measure(lambda: asyncio.run(reader(cold)()), args.calls),
+            "asyncio.run + общий пул, get()": measure(lambda: asyncio.run(reader(shared)()), args.calls),
+            "DBRuntime + общий пул, get()": measure(lambda: runtime.run(reader(pooled)()), args.calls),
+        }
+    finally:
+        runtime.close(pooled)
+        asyncio.run(shared.dispose())
+
+    print(f"{'Сценарий':34} {'среднее':>10} {'p50':>10} {'p95':>10}  (мкс)")
+    for name, r in results.items():
+        print(f"{name:34} {r['mean_us']:10.0f} {r['p50_us']:10.0f} {r['p95_us']:10.0f}")
+    base = results["asyncio.run + общий пул, get()"]["mean_us"]
+    print(f"Ускорение get() с DBRuntime: x{base / results['DBRuntime + общий пул, get()']['mean_us']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+@file
+@brief Воспроизводимый набор замеров производительности инференса эмоций.
+@details
+Загружает локальную модель один раз и измеряет:
+- время холодной загрузки (импорт torch/transformers и создание EmotionDetector);
+- задержку одного текста (p50/p95/p99) для нескольких длин текста;
+- пропускную способность predict_batch для сетки «размер пакета × длина текста»;
+- пиковый объём резидентной памяти процесса.
+Результаты пишутся в JSON; при указании --baseline сравниваются с сохранённым прогоном,
+и при замедлении сверх допуска процесс завершается с кодом 1.
+
+Запуск из корня проекта:
+    python -m benchmarks.emotion_inference --output bench.json
+    python -m benchmarks.emotion_inference --output new.json --baseline bench.json --tolerance 0.1
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+from benchmarks.batch_throughput import PHRASES
+
+#: @brief Длины текстов в словах, на которых выполняются замеры.
+TEXT_LENGTHS = (8, 64, 256, 1024)
+
+#: @brief Размеры пакетов для замера пропускной способности.
+BATCH_SIZES = (1, 8, 32, 64)
+
+
+def make_texts(words: int, count: int, seed: int) -> list[str]:
+    """
+    @brief Генерирует тексты заданной длины из фиксированного набора фраз.
+    @param words Приблизительная длина текста в словах.
+    @param count Количество текстов.
+    @param seed Зерно генератора.
+    @return Список текстов.
+    """
+    rng = random.Random(seed * 100_003 + words)
+    vocabulary = " ".join(PHRASES).split()
+    return [" ".join(rng.choices(vocabulary, k=words)) for _ in range(count)]
+
+
+def peak_rss_mb() -> float | None:
+    """
+    @brief Пиковый объём резидентной памяти процесса.
+    @return Мегабайты или None, если платформа не поддерживает модуль resource.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS — байты
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    @brief Перцентиль по методу ближайшего ранга.
+    @param values Выборка.
+    @param q Уровень от 0 до 100.
+    @return Значение перцентиля.
+    """
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def bench_latency(detector, lengths, repeats: int, seed: int) -> dict:
+    """
+    @brief Замеряет задержку классификации одного текста.
+    @return Словарь: длина текста -> p50/p95/p99/mean в миллисекундах.
+    """
+    report = {}
+    for words in lengths:
+        texts = make_texts(words, repeats, seed)
+        detector.start(texts[0])  # прогрев формы входа
+        samples = []
+        for text in texts:
+            started = time.perf_counter()
+            detector.start(text)
+            samples.append((time.perf_counter() - started) * 1000)
+        report[str(words)] = {
+            "p50_ms": percentile(samples, 50),
+            "p95_ms": percentile(samples, 95),
+            "p99_ms": percentile(samples, 99),
+            "mean_ms": statistics.mean(samples),
+        }
+    return report
+
+
+def bench_throughput(detector, lengths, batch_sizes, texts_per_run: int, seed: int) -> dict:
+    """
+    @brief Замеряет пропускную способность predict_batch.
+    @return Словарь: длина текста -> размер пакета -> текстов в секунду.
+    """
+    report = {}
+    for words in lengths:
+        texts = make_texts(words, texts_per_run, seed)
+        report[str(words)] = {}
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            detector.predict_batch(texts, batch_size=batch_size)
+            report[str(words)][str(batch_size)] = texts_per_run / (time.perf_counter() - started)
+    return report
+
+
+def run(args) -> dict:
+    """
+    @brief Выполняет все замеры.
+    @param args Аргументы командной строки.
+    @return Отчёт в виде словаря.
+    """
+    started = time.perf_counter()
+    import torch
+    from scripts.emotion_class import EmotionDetector
+    import_s = time.perf_counter() - started
+
+    torch.manual_seed(args.seed)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    started = time.perf_counter()
+    detector = EmotionDetector(backend=args.backend, long_text=args.long_text)
+    load_s = time.perf_counter() - started
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(tz=timezone.utc).isoformat(timespec="seconds"),
+            "model_id": detector.model_id,
+            "backend": args.backend,
+            "python": platform.python_version(),
+            "torch": torch.__version__,
+            "threads": torch.get_num_threads(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "seed": args.seed,
+        },
+        "cold_start": {"import_s": import_s, "load_s": load_s},
+        "latency": bench_latency(detector, args.lengths, args.repeats, args.seed),
+        "throughput_tps": bench_throughput(detector, args.lengths, args.batch_sizes, args.batch_texts, args.seed),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    """
+    @brief Сравнивает отчёт с базовым и находит регрессии.
+    @param current Текущий отчёт.
+    @param baseline Базовый отчёт.
+    @param tolerance Допустимое относительное ухудшение (0.1 = 10%).
+    @return Список описаний регрессий.
+    """
+    regressions = []
+
+    def check(name: str, new: float, old: float, higher_is_better: bool) -> None:
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher_is_better else change
+        marker = "РЕГРЕССИЯ" if worse > tolerance else ""
+        print(f"{name:40} {old:10.2f} -> {new:10.2f} ({change:+.1%}) {marker}")
+        if marker:
+            regressions.append(name)
+
+    check("cold_start.load_s", current["cold_start"]["load_s"], baseline["cold_start"]["load_s"], False)
+    for words, row in current["latency"].items():
+        if words in baseline["latency"]:
+            check(f"latency[{words}].p95_ms", row["p95_ms"], baseline["latency"][words]["p95_ms"], False)
+    for words, row in current["throughput_tps"].items():
+        for batch_size, tps in row.items():
+            old = baseline["throughput_tps"].get(words, {}).get(batch_size)
+            if old is not None:
+                check(f"throughput[{words}][bs={batch_size}]", tps, old, True)
+    if current["peak_rss_mb"] and baseline.get("peak_rss_mb"):
+        check("peak_rss_mb", current["peak_rss_mb"], baseline["peak_rss_mb"], False)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности инференса эмоций")
+    parser.add_argument("--backend", default="eager")
+    parser.add_argument("--long-text", default="truncate")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(TEXT_LENGTHS), help="длины текстов в словах")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=list(BATCH_SIZES))
+    parser.add_argument("--repeats", type=int, default=50, help="текстов на замер задержки")
+    parser.add_argument("--batch-texts", type=int, default=128, help="текстов на замер пропускной способности")
+    parser.add_argument("--threads", type=int, default=0, help="число потоков torch (0 — по умолчанию)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="bench_emotion.json", help="куда сохранить отчёт")
+    parser.add_argument("--baseline", help="отчёт для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="допустимое ухудшение")
+    args = parser.parse_args()
+
+    report = run(args)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Отчёт сохранён в {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"Регрессий: {len(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+@file
+@brief Кэш результатов чтения заметок в памяти процесса с версионной инвалидацией.
+@details
+Streamlit перезапускает скрипт на каждый клик и заново запрашивает историю и аналитику,
+хотя данные не менялись. ReadCache хранит готовые результаты (NoteDTO, сводки) по ключу
+из имени метода и параметров запроса. Каждая запись через NoteRepository увеличивает номер
+версии данных и очищает кэш, поэтому после своей записи процесс сразу видит свежие данные.
+Результаты, прочитанные до записи и сохраняемые после неё, отбрасываются по номеру версии.
+Изменения из других процессов (import_audio.py, reclassify.py) кэш не видит — их видимость
+ограничена временем жизни записи ttl_s.
+Сам ReadCache значения не копирует: NoteRepository (_cached_read в db/crud.py) кладёт в него
+глубокую копию результата и при каждом попадании отдаёт новую копию, поэтому вызывающий может
+изменять полученные DTO. Цена — copy.deepcopy на промахе и попадании, линейная по размеру результата
+(около 0,1 мс на страницу истории из 20 DTO — всё равно намного дешевле запроса к БД).
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+from scripts.config import READ_CACHE_SIZE, READ_CACHE_TTL_S
+
+
+class ReadCache:
+    """
+    @brief Потокобезопасный LRU-кэш результатов чтения с номером версии данных.
+    """
+
+    def __init__(self, max_entries: int = READ_CACHE_SIZE, ttl_s: float = READ_CACHE_TTL_S):
+        """
+        @brief Создаёт кэш.
+        @param max_entries Максимальное число результатов (0 — кэширование отключено).
+        @param ttl_s Время жизни результата в секундах.
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.version = 0
+        self.entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """
+        @brief Включено ли кэширование.
+        """
+        return self.max_entries > 0
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        """
+        @brief Ищет результат по ключу.
+        @param key Ключ запроса.
+        @return Кортеж (найден ли, результат); просроченные результаты удаляются.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, key: Hashable, value: Any, version: int) -> None:
+        """
+        @brief Сохраняет результат, прочитанный при версии данных version.
+        @param key Ключ запроса.
+        @param value Результат.
+        @param version Значение self.version до начала чтения; если с тех пор была запись, результат не сохраняется.
+        """
+        with self.lock:
+            if version != self.version:
+                return
+            self.entries[key] = (time.monotonic() + self.ttl_s, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """
+        @brief Отмечает изменение данных: увеличивает версию и очищает кэш.
+        """
+        with self.lock:
+            self.version += 1
+            self.entries.clear()
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        @brief Возвращает счётчики работы кэша.
+        @return Словарь: попадания, промахи, доля попаданий, вытеснения, размер, версия данных.
+        """
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "size": len(self.entries),
+                "version": self.version,
+            }
+
+
+#: @brief Общий кэш чтения процесса; используется NoteRepository по умолчанию.
+READ_CACHE = ReadCache()
@@ -1,12 +1,28 @@
 from __future__ import annotations
 
-from typing import Sequence, Any, TypedDict, overload
-from datetime import datetime, timezone
+import base64
+import copy
+import functools
+import hashlib
+import html
+import json
+import re
+from typing import Literal, NamedTuple, Sequence, Any, TypedDict, overload
+from datetime import date, datetime, time, timezone
 
-from sqlalchemy import select, delete
+from sqlalchemy import (Integer, String, cast, func, literal_column, select, delete, insert, update, bindparam,
+                        or_, tuple_, type_coerce)
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from .models import Note
+from .cache import READ_CACHE, ReadCache
+from .models import FTS5_STRUCTURE_ROWID, Note, NoteStat, notes_fts, notes_fts_data
+
+
+class StaleCursorError(ValueError):
+    """
+    @brief Курсор поиска создан до изменения заметок: оценки bm25 с тех пор сдвинулись,
+    и продолжение выдачи пропустило бы или повторило результаты. Поиск нужно начать с первой страницы.
+    """
 
 
 class NoteDTO(TypedDict):
@@ -23,6 +39,195 @@ class NoteDTO(TypedDict):
     emotion: str
     score: float | None
     source: str
+    model_version: str | None
+
+
+class EmotionStatsDTO(TypedDict):
+    """
+    @brief Сводка по одной эмоции для аналитики (NoteRepository.emotion_stats).
+    """
+    emotion: str
+    count: int
+    avg_len: float
+    """@brief Средняя длина текста заметки в символах."""
+    std_len: float
+    """@brief Стандартное отклонение длины текста (по генеральной совокупности)."""
+
+
+class NotePage(NamedTuple):
+    """
+    @brief Страница заметок при курсорной постраничности (NoteRepository.list_page).
+    """
+    items: list
+    """@brief Заметки страницы (Note или NoteDTO) от новых к старым."""
+    next_cursor: str | None
+    """@brief Курсор следующей (более старой) страницы; None — это последняя страница."""
+    prev_cursor: str | None
+    """@brief Курсор предыдущей (более новой) страницы; None — это первая страница."""
+
+
+class SearchHit(NamedTuple):
+    """
+    @brief Заметка, найденная полнотекстовым поиском (NoteRepository.search).
+    """
+    note: Any
+    """@brief Заметка (Note или NoteDTO)."""
+    snippet: str
+    """@brief Фрагмент текста вокруг совпадений: HTML-экранирован, совпадения обёрнуты в <mark>."""
+    rank: float
+    """@brief Оценка bm25: чем меньше, тем релевантнее."""
+
+
+class SearchPage(NamedTuple):
+    """
+    @brief Страница результатов поиска по релевантности.
+    """
+    items: list[SearchHit]
+    next_cursor: str | None
+    """@brief Курсор следующей страницы; None — результатов больше нет. Действителен, пока заметки не менялись."""
+
+
+def _encode_cursor(*key: Any) -> str:
+    """
+    @brief Упаковывает ключ сортировки заметки (последний элемент — id) в непрозрачный курсор.
+    """
+    raw = json.dumps(list(key), separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor: str, size: int = 3) -> tuple:
+    """
+    @brief Распаковывает курсор, созданный _encode_cursor.
+    @param cursor Курсор.
+    @param size Ожидаемое число элементов ключа.
+    @throws ValueError Если курсор повреждён.
+    """
+    try:
+        *head, note_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(head) != size - 1:
+            raise ValueError("неверная длина ключа")
+        return (*head, int(note_id))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Некорректный курсор: {cursor!r}") from e
+
+
+#: @brief Слово поискового запроса (буквы, цифры, подчёркивание в любом алфавите).
+_WORD_RE = re.compile(r"\w+")
+
+#: @brief Служебные символы, которыми snippet() отмечает совпадения до HTML-экранирования.
+_MARK_START, _MARK_END = "\x02", "\x03"
+
+
+def _fts_query(query: str) -> str | None:
+    """
+    @brief Переводит пользовательский запрос в выражение FTS5 MATCH.
+    @details Каждое слово берётся в кавычки (операторы и скобки FTS5 не интерпретируются)
+    и ищется как префикс: «груст» находит «грустно» и «грусть». Слова соединяются через AND.
+    @return Выражение или None, если в запросе нет слов.
+    """
+    words = _WORD_RE.findall(query)
+    return " ".join(f'"{word}"*' for word in words) or None
+
+
+def _highlight(snippet: str) -> str:
+    """
+    @brief Экранирует фрагмент для вывода в HTML и заменяет метки совпадений на <mark>.
+    """
+    return html.escape(snippet).replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def _utc(value: date | datetime) -> datetime:
+    """
+    @brief Приводит границу периода к datetime в UTC без пояса; дата без времени — начало суток.
+    """
+    if not isinstance(value, datetime):
+        return datetime.combine(value, time())
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _raw_time(value: date | datetime) -> str:
+    """
+    @brief Переводит момент времени в строку того вида, в котором SQLite хранит даты (UTC без пояса).
+    @details Микросекунды пишутся, только если они ненулевые, поэтому граница сравнивается корректно
+    и со значениями CURRENT_TIMESTAMP, и с записанными из Python.
+    """
+    return _utc(value).isoformat(sep=" ")
+
+
+def _created_between(date_from: date | datetime | None, date_to: date | datetime | None) -> list:
+    """
+    @brief Условия WHERE для полуинтервала date_from <= created_at < date_to (None — без границы).
+    """
+    created_raw = type_coerce(Note.created_at, String)
+    conditions = []
+    if date_from is not None:
+        conditions.append(created_raw >= _raw_time(date_from))
+    if date_to is not None:
+        conditions.append(created_raw < _raw_time(date_to))
+    return conditions
+
+
+def _stats_between(date_from: date | datetime | None, date_to: date | datetime | None) -> list | None:
+    """
+    @brief Условия WHERE на ключ (day, hour) сводки note_stats для того же полуинтервала, что _created_between.
+    @return Список условий или None, если граница не совпадает с началом часа и сводка не может ответить точно.
+    """
+    key = tuple_(NoteStat.day, NoteStat.hour)
+    conditions = []
+    for value, compare in ((date_from, key.__ge__), (date_to, key.__lt__)):
+        if value is None:
+            continue
+        value = _utc(value)
+        if value.minute or value.second or value.microsecond:
+            return None
+        conditions.append(compare(tuple_(value.strftime("%Y-%m-%d"), value.hour)))
+    return conditions
+
+
+#: @brief Выражения ключа сводки note_stats для заметки (как в триггерах NOTE_STATS_TRIGGERS).
+_STATS_DAY = func.date(Note.created_at)
+_STATS_HOUR = cast(func.strftime("%H", Note.created_at), Integer)
+
+
+def _cached_read(*, dto_only: bool):
+    """
+    @brief Декоратор метода чтения NoteRepository: результат берётся из self.cache, если он там есть.
+    @param dto_only Кэшировать только вызовы с as_dict=True: ORM-объекты привязаны к своей сессии.
+    @details Ключ — строка подключения, имя метода и аргументы вызова. В кэш кладётся копия результата,
+    и при попадании тоже возвращается копия: изменение DTO вызывающим не портит кэш для остальных читателей.
+    """
+    def decorate(method):
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs):
+            cache = self.cache
+            if cache is None or not cache.enabled or (dto_only and not kwargs.get("as_dict")):
+                return await method(self, *args, **kwargs)
+            key = (str(getattr(self.session.bind, "url", "")), method.__name__, args, tuple(sorted(kwargs.items())))
+            found, value = cache.get(key)
+            if found:
+                return copy.deepcopy(value)
+            version = cache.version
+            value = await method(self, *args, **kwargs)
+            cache.put(key, copy.deepcopy(value), version)
+            return value
+        return wrapper
+    return decorate
+
+
+def _invalidates(method):
+    """
+    @brief Декоратор метода записи NoteRepository: после вызова сбрасывает кэш чтения (даже при ошибке).
+    """
+    @functools.wraps(method)
+    async def wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate()
+    return wrapper
 
 
 class NoteRepository:
@@ -30,14 +235,18 @@ class NoteRepository:
     @brief Асинхронный репозиторий для работы с заметками.
 
     Позволяет выполнять основные CRUD-операции, а также сериализацию заметок для UI/REST.
+    Результаты чтения в виде NoteDTO и сводки аналитики кэшируются в ReadCache (db/cache.py);
+    любая запись через репозиторий сбрасывает кэш.
     """
 
-    def __init__(self, session: AsyncSession):
+    def __init__(self, session: AsyncSession, cache: ReadCache | None = READ_CACHE):
         """
         @brief Конструктор репозитория заметок.
         @param session Асинхронная сессия SQLAlchemy.
+        @param cache Кэш чтения (по умолчанию общий на процесс); None — без кэша.
         """
         self.session = session
+        self.cache = cache
 
     @staticmethod
     def _to_dto(note: Note) -> NoteDTO:
@@ -57,19 +266,24 @@ class NoteRepository:
             emotion=note.emotion,
             score=note.score,
             source=note.source,
+            model_version=note.model_version,
         )
 
     @overload
     async def add(self, *, text: str, emotion: str, score: float | None = None,
                   source: str = "voice", audio_path: str | None = None,
+                  model_version: str | None = None,
                   as_dict: bool = False) -> Note: ...
     @overload
     async def add(self, *, text: str, emotion: str, score: float | None = None,
                   source: str = "voice", audio_path: str | None = None,
+                  model_version: str | None = None,
                   as_dict: bool = True) -> NoteDTO: ...
 
+    @_invalidates
     async def add(self, *, text: str, emotion: str, score: float | None = None,
                   source: str = "voice", audio_path: str | None = None,
+                  model_version: str | None = None,
                   as_dict: bool = False):
         """
         @brief Добавляет новую заметку в базу данных.
@@ -79,11 +293,13 @@ class NoteRepository:
         @param score Оценка уверенности (опционально).
         @param source Источник заметки (по умолчанию "voice").
         @param audio_path Путь к аудиофайлу (опционально).
+        @param model_version Идентификатор модели, определившей эмоцию (опционально).
         @param as_dict Если True — возвращает NoteDTO, иначе объект Note.
         @return Добавленная заметка (Note или NoteDTO).
         """
         note = Note(text=text, emotion=emotion, score=score,
-                    source=source, audio_path=audio_path)
+                    source=source, audio_path=audio_path,
+                    model_version=model_version)
         self.session.add(note)
         await self.session.commit()
         await self.session.refresh(note)
@@ -94,6 +310,7 @@ class NoteRepository:
     @overload
     async def get(self, note_id: int, *, as_dict: bool = True) -> NoteDTO | None: ...
 
+    @_cached_read(dto_only=True)
     async def get(self, note_id: int, *, as_dict: bool = False):
         """
         @brief Получает заметку по ID.
@@ -114,6 +331,7 @@ class NoteRepository:
     async def list(self, *, limit: int = 20, offset: int = 0,
                    as_dict: bool = True) -> list[NoteDTO]: ...
 
+    @_cached_read(dto_only=True)
     async def list(self, *, limit: int = 20, offset: int = 0,
                    as_dict: bool = False):
         """
@@ -133,6 +351,63 @@ class NoteRepository:
         notes = res.scalars().all()
         return [self._to_dto(n) for n in notes] if as_dict else notes
 
+    @_cached_read(dto_only=True)
+    async def list_page(self, *, limit: int = 20, cursor: str | None = None,
+                        direction: Literal["next", "prev"] = "next",
+                        as_dict: bool = False) -> NotePage:
+        """
+        @brief Получает страницу заметок по курсору (keyset-постраничность).
+
+        @param limit Максимальное количество заметок на странице.
+        @param cursor Курсор из предыдущего NotePage; None — первая страница
+        (для direction="prev" — последняя, самая старая).
+        @param direction "next" — заметки старше курсора, "prev" — новее курсора.
+        @param as_dict Если True — элементы страницы NoteDTO, иначе Note.
+        @return NotePage с заметками и курсорами соседних страниц.
+        @throws ValueError Если курсор повреждён или direction неизвестно.
+
+        @details
+        Порядок тот же, что у list(): updated_at DESC, created_at DESC, а при равенстве — id DESC.
+        Вместо OFFSET условие «ключ меньше курсора» читается по индексу ix_notes_updated_at_created_at
+        (id входит в индекс SQLite неявно), поэтому стоимость любой страницы постоянна,
+        а вставки между запросами не сдвигают страницы.
+        Даты сравниваются как строки в том виде, в каком их хранит SQLite:
+        значения по умолчанию (CURRENT_TIMESTAMP) и выставленные из Python отличаются форматом.
+        """
+        if direction not in ("next", "prev"):
+            raise ValueError(f"Неизвестное направление {direction!r}")
+        updated_raw = type_coerce(Note.updated_at, String)
+        created_raw = type_coerce(Note.created_at, String)
+        key = tuple_(updated_raw, created_raw, Note.id)
+
+        stmt = select(Note, updated_raw.label("updated_raw"), created_raw.label("created_raw"))
+        if direction == "next":
+            if cursor is not None:
+                stmt = stmt.where(key < tuple_(*_decode_cursor(cursor)))
+            stmt = stmt.order_by(updated_raw.desc(), created_raw.desc(), Note.id.desc())
+        else:
+            if cursor is not None:
+                stmt = stmt.where(key > tuple_(*_decode_cursor(cursor)))
+            stmt = stmt.order_by(updated_raw, created_raw, Note.id)
+
+        rows = (await self.session.execute(stmt.limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if direction == "prev":
+            rows.reverse()
+
+        cursors = [_encode_cursor(r.updated_raw, r.created_raw, r.Note.id) for r in rows]
+        if direction == "next":
+            more_older, more_newer = has_more, cursor is not None
+        else:
+            more_older, more_newer = cursor is not None, has_more
+        notes = [r.Note for r in rows]
+        return NotePage(
+            items=[self._to_dto(n) for n in notes] if as_dict else notes,
+            next_cursor=cursors[-1] if rows and more_older else None,
+            prev_cursor=cursors[0] if rows and more_newer else None,
+        )
+
     @overload
     async def update(self, note_id: int, *, as_dict: bool = False,
                      **fields: Any) -> Note | None: ...
@@ -140,6 +415,7 @@ class NoteRepository:
     async def update(self, note_id: int, *, as_dict: bool = True,
                      **fields: Any) -> NoteDTO | None: ...
 
+    @_invalidates
     async def update(self, note_id: int, *, as_dict: bool = False,
                      **fields: Any):
         """
@@ -165,6 +441,319 @@ class NoteRepository:
         await self.session.refresh(note)
         return self._to_dto(note) if as_dict else note
 
+    async def list_stale(self, model_version: str, *, after_id: int = 0,
+                         limit: int = 500) -> list[tuple[int, str]]:
+        """
+        @brief Получает очередную порцию заметок, эмоция которых определена другой моделью.
+
+        @param model_version Идентификатор текущей модели.
+        @param after_id Вернуть только заметки с id больше этого (для постраничного обхода по id).
+        @param limit Максимальное количество заметок в порции.
+        @return Список пар (id, text), упорядоченный по id.
+        """
+        res = await self.session.execute(
+            select(Note.id, Note.text)
+            .where(Note.id > after_id)
+            .where(or_(Note.model_version.is_(None), Note.model_version != model_version))
+            .order_by(Note.id)
+            .limit(limit)
+        )
+        return [(row.id, row.text) for row in res]
+
+    async def set_classification(self, rows: Sequence[dict[str, Any]]) -> None:
+        """
+        @brief Записывает результаты классификации для набора заметок одной транзакцией.
+
+        @param rows Словари с ключами id, emotion, score, model_version.
+        @details
+        Пересчёт эмоции не является правкой заметки, поэтому updated_at
+        (и порядок в истории) не меняется.
+        """
+        await self.update_many([
+            {"id": r["id"], "emotion": r["emotion"], "score": r["score"], "model_version": r["model_version"]}
+            for r in rows
+        ], touch=False)
+
+    @overload
+    async def add_many(self, rows: Sequence[dict[str, Any]], *, chunk_size: int = 500,
+                       returning: Literal[False] = False, as_dict: bool = False) -> None: ...
+    @overload
+    async def add_many(self, rows: Sequence[dict[str, Any]], *, chunk_size: int = 500,
+                       returning: Literal[True], as_dict: Literal[False] = False) -> list[Note]: ...
+    @overload
+    async def add_many(self, rows: Sequence[dict[str, Any]], *, chunk_size: int = 500,
+                       returning: Literal[True], as_dict: Literal[True]) -> list[NoteDTO]: ...
+
+    @_invalidates
+    async def add_many(self, rows: Sequence[dict[str, Any]], *, chunk_size: int = 500,
+                       returning: bool = False, as_dict: bool = False):
+        """
+        @brief Добавляет пачку заметок одной транзакцией.
+
+        @param rows Словари с полями заметки (как аргументы add(); можно задать created_at/updated_at).
+        @param chunk_size Сколько строк передавать в одном INSERT.
+        @param returning Вернуть созданные заметки (INSERT ... RETURNING).
+        @param as_dict Если True — возвращает список NoteDTO, иначе список Note.
+        @return Созданные заметки в порядке rows или None, если returning=False.
+        @details
+        Каждая порция уходит одним executemany-запросом, commit (и fsync) выполняется один раз в конце;
+        при ошибке транзакция откатывается целиком.
+        """
+        created: list[Note] = []
+        try:
+            for i in range(0, len(rows), chunk_size):
+                chunk = rows[i:i + chunk_size]
+                if returning:
+                    res = await self.session.scalars(insert(Note).returning(Note, sort_by_parameter_order=True), chunk)
+                    created.extend(res.all())
+                else:
+                    await self.session.execute(insert(Note), chunk)
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        if not returning:
+            return None
+        return [self._to_dto(n) for n in created] if as_dict else created
+
+    @_invalidates
+    async def update_many(self, rows: Sequence[dict[str, Any]], *, chunk_size: int = 500,
+                          touch: bool = True, returning: bool = False, as_dict: bool = False):
+        """
+        @brief Обновляет пачку заметок по id одной транзакцией.
+
+        @param rows Словари с ключом id и изменяемыми полями; набор полей в строках может различаться.
+        @param chunk_size Сколько строк передавать в одном UPDATE.
+        @param touch Если True — updated_at ставится в текущее время (как в update()),
+        иначе сохраняется прежним (если не передан явно).
+        @param returning Вернуть обновлённые заметки.
+        @param as_dict Если True — возвращает список NoteDTO, иначе список Note.
+        @return Обновлённые заметки (в порядке id) или None, если returning=False.
+        """
+        table = Note.__table__
+        now = datetime.now(tz=timezone.utc)
+        # Строки с одинаковым набором полей выполняются одним executemany
+        groups: dict[tuple[str, ...], list[dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(k for k in row if k != "id")), []).append(row)
+
+        try:
+            for fields, group in groups.items():
+                values: dict[str, Any] = {f: bindparam(f"_{f}") for f in fields}
+                if "updated_at" not in values:
+                    # Явное присваивание отключает onupdate=func.now()
+                    values["updated_at"] = bindparam("_touched") if touch else table.c.updated_at
+                stmt = update(table).where(table.c.id == bindparam("_id")).values(**values)
+                for i in range(0, len(group), chunk_size):
+                    await self.session.execute(stmt, [
+                        {"_id": r["id"], "_touched": now, **{f"_{f}": r[f] for f in fields}}
+                        for r in group[i:i + chunk_size]
+                    ])
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        if not returning:
+            return None
+
+        ids = [r["id"] for r in rows]
+        notes: list[Note] = []
+        self.session.expire_all()
+        for i in range(0, len(ids), chunk_size):
+            res = await self.session.scalars(select(Note).where(Note.id.in_(ids[i:i + chunk_size])).order_by(Note.id))
+            notes.extend(res.all())
+        return [self._to_dto(n) for n in notes] if as_dict else notes
+
+    @_invalidates
+    async def delete_many(self, note_ids: Sequence[int], *, chunk_size: int = 500) -> int:
+        """
+        @brief Удаляет пачку заметок по id одной транзакцией.
+
+        @param note_ids ID заметок.
+        @param chunk_size Сколько id передавать в одном DELETE.
+        @return Количество удалённых заметок.
+        """
+        deleted = 0
+        try:
+            for i in range(0, len(note_ids), chunk_size):
+                res = await self.session.execute(delete(Note).where(Note.id.in_(note_ids[i:i + chunk_size])))
+                deleted += res.rowcount
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return deleted
+
+    async def existing_audio_paths(self, paths: Sequence[str], *, chunk_size: int = 500) -> set[str]:
+        """
+        @brief Находит пути к аудиофайлам, для которых заметки уже есть.
+
+        @param paths Проверяемые пути.
+        @param chunk_size Сколько путей передавать в одном запросе (ограничение SQLite на число параметров).
+        @return Множество путей из paths, уже сохранённых в audio_path.
+        """
+        found: set[str] = set()
+        for i in range(0, len(paths), chunk_size):
+            res = await self.session.execute(
+                select(Note.audio_path).where(Note.audio_path.in_(paths[i:i + chunk_size]))
+            )
+            found.update(res.scalars())
+        return found
+
+    async def search(self, query: str, *, emotion: str | None = None, limit: int = 20,
+                     cursor: str | None = None, as_dict: bool = False) -> SearchPage:
+        """
+        @brief Ищет заметки по словам текста через полнотекстовый индекс notes_fts.
+
+        @param query Запрос пользователя; слова ищутся как префиксы и должны встретиться все.
+        @param emotion Искать только среди заметок с этой эмоцией.
+        @param limit Максимальное количество результатов на странице.
+        @param cursor Курсор из предыдущей SearchPage; None — первая страница.
+        @param as_dict Если True — SearchHit.note содержит NoteDTO, иначе Note.
+        @return SearchPage с результатами от более релевантных к менее релевантным.
+        @throws StaleCursorError Если после выдачи курсора заметки менялись.
+        @throws ValueError Если курсор повреждён.
+
+        @details
+        Релевантность — bm25 по индексу FTS5, при равенстве — по id. Следующая страница выбирается
+        условием (rank, id) > курсора. bm25 зависит от статистики всего индекса (число заметок,
+        средняя длина, частоты слов), поэтому любая запись сдвигает оценки всех результатов, и сравнение
+        со старой оценкой пропустило бы или повторило строки. Курсор действителен только для неизменного
+        индекса: в нём хранится версия индекса (_fts_version), и курсор другой версии отклоняется.
+        Кэш чтения тоже учитывает версию, так что страница из кэша не отдаётся с курсором устаревшей выдачи.
+        """
+        match = _fts_query(query)
+        if match is None:
+            return SearchPage(items=[], next_cursor=None)
+        version = await self._fts_version()
+        if cursor is not None and _decode_cursor(cursor)[0] != version:
+            raise StaleCursorError("Заметки изменились после выдачи курсора: начните поиск заново")
+        return await self._search_page(match, emotion=emotion, limit=limit, cursor=cursor,
+                                       version=version, as_dict=as_dict)
+
+    async def _fts_version(self) -> str:
+        """
+        @brief Версия полнотекстового индекса: хэш записи его структуры, меняющейся при каждой записи в индекс.
+        """
+        block = (await self.session.execute(
+            select(notes_fts_data.c.block).where(notes_fts_data.c.id == FTS5_STRUCTURE_ROWID)
+        )).scalar()
+        return hashlib.sha1(block or b"").hexdigest()[:16]
+
+    @_cached_read(dto_only=True)
+    async def _search_page(self, match: str, *, emotion: str | None, limit: int, cursor: str | None,
+                           version: str, as_dict: bool) -> SearchPage:
+        """
+        @brief Выполняет поиск для search() при известной версии индекса (она входит в ключ кэша и в курсоры).
+        """
+        fts = literal_column("notes_fts")
+        rank = func.bm25(fts)
+        stmt = (
+            select(Note, rank.label("rank"),
+                   func.snippet(fts, 0, _MARK_START, _MARK_END, "…", 16).label("snippet"))
+            .join(notes_fts, notes_fts.c.rowid == Note.id)
+            .where(notes_fts.c.notes_fts.match(match))
+        )
+        if emotion is not None:
+            stmt = stmt.where(Note.emotion == emotion)
+        if cursor is not None:
+            stmt = stmt.where(tuple_(rank, Note.id) > tuple_(*_decode_cursor(cursor)[1:]))
+
+        rows = (await self.session.execute(stmt.order_by(rank, Note.id).limit(limit + 1))).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return SearchPage(
+            items=[SearchHit(note=self._to_dto(r.Note) if as_dict else r.Note,
+                             snippet=_highlight(r.snippet), rank=r.rank) for r in rows],
+            next_cursor=_encode_cursor(version, rows[-1].rank, rows[-1].Note.id) if has_more else None,
+        )
+
+    @_cached_read(dto_only=False)
+    async def emotion_stats(self, *, date_from: date | datetime | None = None,
+                            date_to: date | datetime | None = None) -> list[EmotionStatsDTO]:
+        """
+        @brief Считает число заметок и статистику длины текста по эмоциям.
+
+        @param date_from Учитывать заметки, созданные не раньше этого момента (UTC).
+        @param date_to Учитывать заметки, созданные раньше этого момента (UTC, не включительно).
+        @return Список EmotionStatsDTO по убыванию числа заметок.
+
+        @details
+        Агрегаты читаются из почасовой сводки note_stats, тексты заметок из базы не передаются.
+        Если граница периода не совпадает с началом часа, считается GROUP BY по самим заметкам.
+        Стандартное отклонение вычисляется из суммы квадратов длин: в SQLite нет sqrt по умолчанию.
+        """
+        conditions = _stats_between(date_from, date_to)
+        if conditions is not None:
+            stmt = (select(NoteStat.emotion, func.sum(NoteStat.count).label("count"),
+                           func.sum(NoteStat.len_sum).label("len_sum"), func.sum(NoteStat.len_sq_sum).label("sq_sum"))
+                    .where(*conditions)
+                    .group_by(NoteStat.emotion))
+        else:
+            length = func.length(Note.text)
+            stmt = (select(Note.emotion, func.count().label("count"),
+                           func.sum(length).label("len_sum"), func.sum(length * length).label("sq_sum"))
+                    .where(*_created_between(date_from, date_to))
+                    .group_by(Note.emotion))
+        stats = []
+        for row in await self.session.execute(stmt):
+            avg_len = row.len_sum / row.count
+            stats.append(EmotionStatsDTO(emotion=row.emotion, count=row.count, avg_len=avg_len,
+                                         std_len=max(0.0, row.sq_sum / row.count - avg_len ** 2) ** 0.5))
+        return sorted(stats, key=lambda s: (-s["count"], s["emotion"]))
+
+    @_cached_read(dto_only=False)
+    async def hour_counts(self, *, date_from: date | datetime | None = None,
+                          date_to: date | datetime | None = None) -> dict[int, int]:
+        """
+        @brief Считает заметки по часу создания.
+
+        @param date_from Учитывать заметки, созданные не раньше этого момента (UTC).
+        @param date_to Учитывать заметки, созданные раньше этого момента (UTC, не включительно).
+        @return Словарь {час UTC 0–23: число заметок}; часы без заметок не включаются.
+        @details Как и emotion_stats, читает сводку note_stats, если границы периода совпадают с началом часа.
+        """
+        conditions = _stats_between(date_from, date_to)
+        if conditions is not None:
+            stmt = (select(NoteStat.hour, func.sum(NoteStat.count).label("count"))
+                    .where(*conditions)
+                    .group_by(NoteStat.hour))
+        else:
+            stmt = (select(_STATS_HOUR.label("hour"), func.count().label("count"))
+                    .where(*_created_between(date_from, date_to))
+                    .group_by(_STATS_HOUR))
+        res = await self.session.execute(stmt)
+        return dict(sorted((row.hour, row.count) for row in res))
+
+    @_invalidates
+    async def rebuild_stats(self) -> int:
+        """
+        @brief Пересчитывает сводку note_stats по всем заметкам одной транзакцией.
+
+        @return Количество строк сводки.
+        @details
+        Обычно сводку поддерживают триггеры; пересчёт нужен для восстановления, например после
+        правки файла БД инструментом, который отключал триггеры, или после миграции со старой версии.
+        """
+        length = func.length(Note.text)
+        try:
+            await self.session.execute(delete(NoteStat))
+            await self.session.execute(
+                insert(NoteStat).from_select(
+                    ["day", "hour", "emotion", "count", "len_sum", "len_sq_sum"],
+                    select(_STATS_DAY, _STATS_HOUR, Note.emotion, func.count(),
+                           func.sum(length), func.sum(length * length))
+                    .group_by(_STATS_DAY, _STATS_HOUR, Note.emotion),
+                )
+            )
+            rows = await self.session.scalar(select(func.count()).select_from(NoteStat))
+            await self.session.commit()
+        except Exception:
+            await self.session.rollback()
+            raise
+        return rows
+
+    @_invalidates
     async def delete(self, note_id: int) -> None:
         """
         @brief Удаляет заметку по ID.
@@ -174,6 +763,7 @@ class NoteRepository:
         await self.session.execute(delete(Note).where(Note.id == note_id))
         await self.session.commit()
 
+    @_invalidates
     async def clear(self) -> None:
         """
         @brief Удаляет все заметки из таблицы (для тестов и dev-режима).
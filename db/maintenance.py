@@ -0,0 +1,96 @@
+"""
+@file
+@brief Периодическое обслуживание SQLite: WAL checkpoint, ANALYZE и PRAGMA optimize.
+@details
+В WAL-режиме изменения сначала пишутся в файл diary.db-wal; checkpoint(TRUNCATE) переносит их
+в основной файл и обрезает журнал, чтобы он не рос бесконечно при постоянных читателях.
+ANALYZE обновляет статистику для планировщика (выбор индексов), PRAGMA optimize пересобирает
+её только там, где она устарела.
+Обслуживание использует отдельный движок без пула соединений, поэтому его можно запускать
+из фонового потока со своим циклом событий.
+
+Запуск из корня проекта:
+    python -m db.maintenance            # один проход
+    python -m db.maintenance --loop 3600
+    python -m db.maintenance --rebuild-stats  # пересчитать сводку note_stats, затем один проход
+"""
+
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.pool import NullPool
+
+from scripts.config import DB_MAINTENANCE_INTERVAL_S, SQLALCHEMY_DATABASE_URI
+from .crud import NoteRepository
+from .session import make_engine
+
+
+async def run_maintenance(engine: AsyncEngine) -> dict[str, float | int]:
+    """
+    @brief Выполняет один проход обслуживания.
+    @param engine Движок SQLite.
+    @return Результат checkpoint (busy, wal_pages, checkpointed_pages) и длительность в секундах.
+    """
+    started = time.perf_counter()
+    async with engine.connect() as conn:
+        # PRAGMA/ANALYZE выполняются вне транзакции, в режиме autocommit
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        busy, wal_pages, checkpointed = (await conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))).one()
+        await conn.execute(text("ANALYZE"))
+        await conn.execute(text("PRAGMA optimize"))
+    return {
+        "busy": busy,
+        "wal_pages": wal_pages,
+        "checkpointed_pages": checkpointed,
+        "duration_s": time.perf_counter() - started,
+    }
+
+
+async def maintenance_loop(interval_s: float = DB_MAINTENANCE_INTERVAL_S,
+                           url: str = SQLALCHEMY_DATABASE_URI) -> None:
+    """
+    @brief Выполняет обслуживание каждые interval_s секунд (до отмены задачи).
+    @param interval_s Период в секундах.
+    @param url Строка подключения.
+    """
+    engine = make_engine(url, poolclass=NullPool)
+    try:
+        while True:
+            try:
+                stats = await run_maintenance(engine)
+                print(f"[db] обслуживание: {stats}")
+            except Exception as e:  # БД может быть временно занята; попробуем в следующий раз
+                print(f"[db] обслуживание не выполнено: {e}")
+            await asyncio.sleep(interval_s)
+    finally:
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Обслуживание SQLite: checkpoint, ANALYZE, optimize")
+    parser.add_argument("--loop", type=float, default=0, help="повторять каждые N секунд (0 — один проход)")
+    parser.add_argument("--rebuild-stats", action="store_true", help="пересчитать сводку note_stats по заметкам")
+    args = parser.parse_args()
+
+    if args.loop:
+        asyncio.run(maintenance_loop(args.loop))
+        return
+
+    async def once():
+        engine = make_engine(poolclass=NullPool)
+        try:
+            if args.rebuild_stats:
+                async with AsyncSession(engine) as session:
+                    print(f"Строк в сводке note_stats: {await NoteRepository(session).rebuild_stats()}")
+            print(await run_maintenance(engine))
+        finally:
+            await engine.dispose()
+
+    asyncio.run(once())
+
+
+if __name__ == "__main__":
+    main()
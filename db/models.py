@@ -1,4 +1,4 @@
-from sqlalchemy import String, Text, DateTime, Float, func
+from sqlalchemy import String, Text, DateTime, Float, Index, Integer, column, event, func, table
 from sqlalchemy.orm import Mapped, mapped_column
 
 from .base import Base
@@ -16,12 +16,21 @@ class Note(Base):
     - метку эмоции
     - оценку уверенности классификатора
     - источник создания
+    - версию модели, определившей эмоцию
     - даты создания и обновления
 
     Используется в приложении для анализа эмоций пользователя.
     """
 
     __tablename__ = "notes"
+    __table_args__ = (
+        # История: ORDER BY updated_at DESC, created_at DESC читается обратным проходом по индексу без сортировки
+        Index("ix_notes_updated_at_created_at", "updated_at", "created_at"),
+        # Аналитика: группировка и фильтр по эмоции с диапазоном дат
+        Index("ix_notes_emotion_created_at", "emotion", "created_at"),
+        # Фильтр только по диапазону дат
+        Index("ix_notes_created_at", "created_at"),
+    )
 
     id: Mapped[int] = mapped_column(
         primary_key=True, autoincrement=True
@@ -63,6 +72,11 @@ class Note(Base):
     )
     """@brief Источник заметки: voice (по умолчанию), edit, import и т.д."""
 
+    model_version: Mapped[str | None] = mapped_column(
+        String(64), nullable=True
+    )
+    """@brief Идентификатор модели, определившей эмоцию (EmotionDetector.model_id); None — неизвестна."""
+
     def __repr__(self) -> str:
         """
         @brief Строковое представление объекта Note.
@@ -70,3 +84,121 @@ class Note(Base):
         @return Строка для отладки, включающая id и эмоцию.
         """
         return f"<Note id={self.id} emotion={self.emotion}>"
+
+
+class NoteStat(Base):
+    """
+    @brief Почасовая сводка заметок для аналитики (таблица "note_stats").
+
+    @details
+    Одна строка на (день, час, эмоция) по времени создания заметки в UTC: число заметок,
+    сумма длин текстов и сумма квадратов длин (из них получаются среднее и стандартное отклонение).
+    Таблица поддерживается триггерами SQLite на notes (NOTE_STATS_TRIGGERS), поэтому запросы
+    аналитики читают O(дней × часов × эмоций) строк вместо всех заметок.
+    Восстанавливается целиком через NoteRepository.rebuild_stats.
+    """
+
+    __tablename__ = "note_stats"
+
+    day: Mapped[str] = mapped_column(String(10), primary_key=True)
+    """@brief День создания заметок в формате YYYY-MM-DD (UTC)."""
+
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+    """@brief Час создания 0–23 (UTC)."""
+
+    emotion: Mapped[str] = mapped_column(String(32), primary_key=True)
+    """@brief Метка эмоции."""
+
+    count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    """@brief Число заметок."""
+
+    len_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    """@brief Сумма длин текстов в символах."""
+
+    len_sq_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    """@brief Сумма квадратов длин текстов."""
+
+    def __repr__(self) -> str:
+        return f"<NoteStat {self.day} {self.hour:02d}h {self.emotion}={self.count}>"
+
+
+def _stats_key(row: str) -> str:
+    """
+    @brief Условие на строку note_stats, соответствующую заметке row (NEW или OLD в триггере).
+    """
+    return (f"day = date({row}.created_at) AND hour = CAST(strftime('%H', {row}.created_at) AS INTEGER) "
+            f"AND emotion = {row}.emotion")
+
+
+#: @brief Добавляет заметку NEW в сводку (UPSERT).
+_STATS_ADD = """
+    INSERT INTO note_stats (day, hour, emotion, count, len_sum, len_sq_sum)
+    VALUES (date(NEW.created_at), CAST(strftime('%H', NEW.created_at) AS INTEGER), NEW.emotion,
+            1, length(NEW.text), length(NEW.text) * length(NEW.text))
+    ON CONFLICT (day, hour, emotion) DO UPDATE SET
+        count = count + 1,
+        len_sum = len_sum + excluded.len_sum,
+        len_sq_sum = len_sq_sum + excluded.len_sq_sum;"""
+
+#: @brief Вычитает заметку OLD из сводки и удаляет опустевшую строку.
+_STATS_REMOVE = f"""
+    UPDATE note_stats SET
+        count = count - 1,
+        len_sum = len_sum - length(OLD.text),
+        len_sq_sum = len_sq_sum - length(OLD.text) * length(OLD.text)
+    WHERE {_stats_key("OLD")};
+    DELETE FROM note_stats WHERE {_stats_key("OLD")} AND count <= 0;"""
+
+#: @brief Триггеры SQLite, поддерживающие note_stats при любых изменениях notes
+#: (в том числе пакетных UPDATE/DELETE и правках в обход репозитория).
+NOTE_STATS_TRIGGERS = (
+    f"CREATE TRIGGER IF NOT EXISTS trg_notes_stats_insert AFTER INSERT ON notes BEGIN{_STATS_ADD}\nEND",
+    f"CREATE TRIGGER IF NOT EXISTS trg_notes_stats_delete AFTER DELETE ON notes BEGIN{_STATS_REMOVE}\nEND",
+    "CREATE TRIGGER IF NOT EXISTS trg_notes_stats_update AFTER UPDATE OF created_at, emotion, text ON notes "
+    f"BEGIN{_STATS_REMOVE}{_STATS_ADD}\nEND",
+)
+
+
+#: @brief Полнотекстовый индекс FTS5 по тексту заметок и триггеры его синхронизации.
+#: @details Индекс external content: тексты хранятся только в notes, notes_fts содержит лишь словарь
+#: и позиции слов. При удалении и правке старый текст передаётся команде 'delete', чтобы убрать его слова.
+NOTES_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5("
+    "text, content='notes', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS trg_notes_fts_insert AFTER INSERT ON notes BEGIN\n"
+    "    INSERT INTO notes_fts (rowid, text) VALUES (NEW.id, NEW.text);\nEND",
+    "CREATE TRIGGER IF NOT EXISTS trg_notes_fts_delete AFTER DELETE ON notes BEGIN\n"
+    "    INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);\nEND",
+    "CREATE TRIGGER IF NOT EXISTS trg_notes_fts_update AFTER UPDATE OF text ON notes BEGIN\n"
+    "    INSERT INTO notes_fts (notes_fts, rowid, text) VALUES ('delete', OLD.id, OLD.text);\n"
+    "    INSERT INTO notes_fts (rowid, text) VALUES (NEW.id, NEW.text);\nEND",
+)
+
+#: @brief Описание notes_fts для запросов (виртуальная таблица не входит в Base.metadata).
+#: @details Столбец notes_fts — скрытый столбец с именем таблицы, к нему применяется MATCH.
+notes_fts = table("notes_fts", column("rowid"), column("text"), column("notes_fts"))
+
+#: @brief Служебная таблица FTS5 с данными индекса notes_fts.
+#: @details Строка FTS5_STRUCTURE_ROWID — запись структуры индекса: она меняется при каждой записи в индекс.
+notes_fts_data = table("notes_fts_data", column("id"), column("block"))
+FTS5_STRUCTURE_ROWID = 10
+
+
+@event.listens_for(Note.__table__, "after_create")
+def _create_notes_triggers(target, connection, **kw):
+    """
+    @brief Создаёт триггеры сводки и полнотекстовый индекс вместе с таблицей notes (create_all, init_db, тесты).
+    """
+    if connection.dialect.name == "sqlite":
+        for ddl in NOTE_STATS_TRIGGERS + NOTES_FTS_DDL:
+            connection.exec_driver_sql(ddl)
+
+
+@event.listens_for(Note.__table__, "before_drop")
+def _drop_notes_fts(target, connection, **kw):
+    """
+    @brief Удаляет полнотекстовый индекс вместе с notes (триггеры SQLite удаляет сам), чтобы
+    при повторном create_all в нём не остались слова удалённых заметок.
+    """
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS notes_fts")
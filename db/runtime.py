@@ -0,0 +1,99 @@
+"""
+@file
+@brief Долгоживущий цикл событий для обращений к БД из синхронного кода (Streamlit).
+@details
+asyncio.run на каждый запрос создаёт и закрывает цикл событий, а соединения пула,
+открытые в прошлом цикле, не могут безопасно использоваться в следующем.
+DBRuntime держит один цикл в отдельном потоке-демоне: синхронные обёртки отправляют
+в него корутины через run_coroutine_threadsafe и ждут результат. Все соединения движка
+создаются и переиспользуются в этом цикле, поэтому пул остаётся «тёплым» между запросами.
+Замер накладных расходов: python -m benchmarks.db_runtime_overhead.
+"""
+
+import asyncio
+from concurrent.futures import Future
+from threading import Thread, current_thread
+from typing import Any, Coroutine
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class DBRuntime:
+    """
+    @brief Цикл событий в выделенном потоке, принимающий корутины из любых потоков.
+    """
+
+    def __init__(self, name: str = "db-runtime"):
+        """
+        @brief Создаёт цикл и запускает его поток.
+        @param name Имя потока (видно в отладчике и профилировщике).
+        """
+        self.loop = asyncio.new_event_loop()
+        self.thread = Thread(target=self._serve, name=name, daemon=True)
+        self.thread.start()
+
+    @property
+    def running(self) -> bool:
+        """
+        @brief Принимает ли цикл новые корутины.
+        """
+        return self.thread.is_alive() and not self.loop.is_closed()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        @brief Планирует корутину в цикле и сразу возвращает Future.
+        @param coro Корутина.
+        @return concurrent.futures.Future с результатом корутины.
+        @throws RuntimeError Если цикл уже остановлен.
+        """
+        if not self.running:
+            coro.close()
+            raise RuntimeError("Цикл БД остановлен")
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: float | None = None) -> Any:
+        """
+        @brief Выполняет корутину в цикле и ждёт результат.
+        @param coro Корутина.
+        @param timeout Максимальное время ожидания в секундах (None — без ограничения).
+        @return Результат корутины; её исключение пробрасывается вызывающему.
+        @throws RuntimeError При вызове из потока самого цикла: ожидание заблокировало бы цикл навсегда.
+        """
+        if current_thread() is self.thread:
+            coro.close()
+            raise RuntimeError("DBRuntime.run нельзя вызывать из корутины, выполняемой в том же цикле")
+        return self.submit(coro).result(timeout)
+
+    def close(self, engine: AsyncEngine | None = None, timeout: float = 5.0) -> None:
+        """
+        @brief Отменяет фоновые задачи, закрывает соединения движка и останавливает цикл.
+        @param engine Движок, пул которого нужно закрыть в этом же цикле.
+        @param timeout Максимальное время ожидания каждого шага в секундах.
+        """
+        if not self.running:
+            return
+        self.run(self._shutdown(engine), timeout)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout)
+
+    async def _shutdown(self, engine: AsyncEngine | None) -> None:
+        """
+        @brief Отменяет остальные задачи цикла (например, периодическое обслуживание) и закрывает пул.
+        """
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if engine is not None:
+            await engine.dispose()
+
+    def _serve(self) -> None:
+        """
+        @brief Тело потока: крутит цикл до close().
+        """
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.run_until_complete(self.loop.shutdown_asyncgens())
+            self.loop.close()
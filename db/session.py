@@ -1,11 +1,53 @@
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
 
 from .base import Base  # Базовый класс для всех ORM-моделей (Declarative Base)
-from scripts.config import SQLALCHEMY_DATABASE_URI  # Строка подключения к БД (задаётся в конфиге/ENV)
+from scripts.config import (  # Строка подключения к БД и профиль соединения SQLite (задаются в конфиге/ENV)
+    SQLALCHEMY_DATABASE_URI, SQLITE_BUSY_TIMEOUT_MS, SQLITE_CACHE_SIZE, SQLITE_JOURNAL_MODE, SQLITE_MMAP_SIZE,
+    SQLITE_SYNCHRONOUS, SQLITE_TEMP_STORE,
+)
+
+#: @brief PRAGMA, выполняемые на каждом новом соединении SQLite (пустые значения пропускаются).
+#: @details busy_timeout идёт первым: переключение в WAL само требует блокировки файла.
+SQLITE_PRAGMAS = {
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+    "journal_mode": SQLITE_JOURNAL_MODE,
+    "synchronous": SQLITE_SYNCHRONOUS,
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "cache_size": SQLITE_CACHE_SIZE,
+    "temp_store": SQLITE_TEMP_STORE,
+}
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """
+    @brief Обработчик события connect: применяет профиль SQLITE_PRAGMAS к новому соединению.
+    """
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            if value:
+                cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str = SQLALCHEMY_DATABASE_URI, **kwargs) -> AsyncEngine:
+    """
+    @brief Создаёт асинхронный движок; для SQLite подключает профиль PRAGMA.
+    @param url Строка подключения.
+    @param kwargs Дополнительные аргументы create_async_engine (например, poolclass).
+    @return AsyncEngine.
+    """
+    new_engine = create_async_engine(url, echo=False, future=True, **kwargs)
+    if new_engine.dialect.name == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return new_engine
+
 
 #: @brief Асинхронный движок SQLAlchemy.
 #: @details Используется для подключения к БД через aiosqlite или asyncpg.
-engine = create_async_engine(SQLALCHEMY_DATABASE_URI, echo=False, future=True)
+engine = make_engine()
 
 #: @brief Фабрика асинхронных сессий для работы с БД.
 #: @details Создаёт экземпляры AsyncSession с нужными параметрами.
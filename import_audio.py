@@ -0,0 +1,197 @@
+"""
+@file
+@brief Пакетный импорт голосовых заметок из папки с WAV/FLAC-файлами.
+@details
+Файлы распознаются параллельно ограниченным пулом потоков через выбранный бэкенд
+(scripts/speech_backends.py). Запросы к сервису ограничиваются по частоте (token bucket),
+ошибки сервиса повторяются с экспоненциальной задержкой. Распознанные тексты порции
+классифицируются одним вызовом predict_batch и добавляются в дневник одной транзакцией
+с source="import" и абсолютным путём файла в audio_path; дата заметки берётся из времени изменения файла.
+Уже импортированные файлы (по audio_path) пропускаются, поэтому прерванный импорт
+продолжается повторным запуском той же команды.
+
+Запуск из корня проекта:
+    python import_audio.py ~/voice_memos --workers 4 --rate 5 --chunk-size 32
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from db.session import AsyncSessionLocal
+from db.crud import NoteRepository
+from scripts.audio_store import load_audio_file
+from scripts.detector_factory import create_detector
+from scripts.speech_backends import SpeechNotRecognized, SpeechServiceError, load_speech_backend
+
+#: @brief Расширения поддерживаемых аудиофайлов.
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+
+class RateLimiter:
+    """
+    @brief Потокобезопасное ограничение частоты запросов (token bucket).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        @brief Создаёт ограничитель.
+        @param rate Допустимое число запросов в секунду (0 — без ограничения).
+        @param burst Сколько запросов можно выполнить подряд без ожидания.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        @brief Ждёт, пока появится свободный токен, и забирает его.
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def find_audio_files(directory: str) -> list[str]:
+    """
+    @brief Рекурсивно ищет аудиофайлы.
+    @param directory Папка с записями.
+    @return Отсортированный список абсолютных путей.
+    """
+    found = []
+    for root, _, files in os.walk(directory):
+        found.extend(os.path.abspath(os.path.join(root, name))
+                     for name in files if name.lower().endswith(AUDIO_EXTENSIONS))
+    return sorted(found)
+
+
+def transcribe(backend, path: str, limiter: RateLimiter, retries: int, backoff: float) -> str | None:
+    """
+    @brief Распознаёт один файл с повторами при ошибках сервиса.
+    @param backend Бэкенд распознавания.
+    @param path Путь к файлу.
+    @param limiter Ограничитель частоты запросов.
+    @param retries Сколько раз повторять запрос после ошибки сервиса.
+    @param backoff Базовая задержка перед повтором в секундах; удваивается с каждой попыткой.
+    @return Текст или None, если речь не распознана.
+    @throws SpeechServiceError Если сервис не ответил после всех повторов.
+    """
+    pcm, sample_rate = load_audio_file(path)
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            return backend.recognize(pcm, sample_rate)
+        except SpeechNotRecognized:
+            return None
+        except SpeechServiceError:
+            if attempt == retries:
+                raise
+            # Случайная добавка разводит повторы параллельных потоков во времени
+            time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+
+def file_time(path: str) -> datetime:
+    """
+    @brief Время изменения файла в UTC без часового пояса (как CURRENT_TIMESTAMP в SQLite).
+    """
+    return datetime.fromtimestamp(os.path.getmtime(path), tz=timezone.utc).replace(tzinfo=None)
+
+
+async def import_audio(paths: list[str], backend, detector, *, workers: int, rate: float,
+                       retries: int, backoff: float, chunk_size: int) -> dict[str, int]:
+    """
+    @brief Распознаёт, классифицирует и сохраняет аудиофайлы порциями.
+    @param paths Абсолютные пути к файлам.
+    @param backend Бэкенд распознавания речи.
+    @param detector Детектор эмоций (predict_batch/model_id).
+    @param workers Число одновременных запросов распознавания.
+    @param rate Ограничение запросов в секунду (0 — без ограничения).
+    @param retries Число повторов при ошибке сервиса.
+    @param backoff Базовая задержка перед повтором, секунд.
+    @param chunk_size Сколько файлов обрабатывать и сохранять за одну транзакцию.
+    @return Счётчики: imported, skipped (уже были), empty (речь не распознана), failed.
+    """
+    stats = {"imported": 0, "skipped": 0, "empty": 0, "failed": 0}
+    limiter = RateLimiter(rate, burst=workers)
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    async with AsyncSessionLocal() as session:
+        repo = NoteRepository(session)
+        done = await repo.existing_audio_paths(paths)
+        stats["skipped"] = len(done)
+        pending = [p for p in paths if p not in done]
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import") as pool:
+            for i in range(0, len(pending), chunk_size):
+                chunk = pending[i:i + chunk_size]
+                results = await asyncio.gather(
+                    *(loop.run_in_executor(pool, transcribe, backend, path, limiter, retries, backoff)
+                      for path in chunk),
+                    return_exceptions=True,
+                )
+                recognized = []
+                for path, result in zip(chunk, results):
+                    if isinstance(result, Exception):
+                        stats["failed"] += 1
+                        print(f"Ошибка: {path}: {result}")
+                    elif not result:
+                        stats["empty"] += 1
+                    else:
+                        recognized.append((path, result))
+
+                if recognized:
+                    emotions = await asyncio.to_thread(detector.predict_batch, [text for _, text in recognized])
+                    await repo.add_many([
+                        {"text": text, "emotion": r.label, "score": r.score, "source": "import",
+                         "audio_path": path, "model_version": detector.model_id,
+                         "created_at": file_time(path), "updated_at": file_time(path)}
+                        for (path, text), r in zip(recognized, emotions)
+                    ])
+                    stats["imported"] += len(recognized)
+
+                processed = i + len(chunk)
+                rate_now = processed / (time.perf_counter() - started)
+                print(f"{processed}/{len(pending)} файлов ({rate_now:.1f} файлов/с): "
+                      f"импортировано {stats['imported']}, без речи {stats['empty']}, ошибок {stats['failed']}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Импорт голосовых заметок из WAV/FLAC-файлов")
+    parser.add_argument("directory", help="папка с аудиофайлами (обходится рекурсивно)")
+    parser.add_argument("--backend", default=None, help="бэкенд распознавания (по умолчанию SPEECH_BACKEND)")
+    parser.add_argument("--workers", type=int, default=4, help="одновременных запросов распознавания")
+    parser.add_argument("--rate", type=float, default=5.0, help="запросов в секунду (0 — без ограничения)")
+    parser.add_argument("--retries", type=int, default=3, help="повторов при ошибке сервиса")
+    parser.add_argument("--backoff", type=float, default=1.0, help="начальная задержка повтора, секунд")
+    parser.add_argument("--chunk-size", type=int, default=32, help="файлов на одну транзакцию")
+    args = parser.parse_args()
+
+    paths = find_audio_files(args.directory)
+    print(f"Найдено файлов: {len(paths)}")
+    backend = load_speech_backend(args.backend) if args.backend else load_speech_backend()
+    detector = create_detector(cached=False)
+    stats = asyncio.run(import_audio(paths, backend, detector, workers=args.workers, rate=args.rate,
+                                     retries=args.retries, backoff=args.backoff, chunk_size=args.chunk_size))
+    print(f"Готово: {stats}")
+
+
+if __name__ == "__main__":
+    main()
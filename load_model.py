@@ -3,10 +3,13 @@
 @brief Загрузка и сохранение модели ruBERT для определения эмоций.
 @details
 Скачивает модель и токенизатор с HuggingFace Hub и сохраняет их в локальную папку для дальнейшего использования офлайн.
+Рядом с моделью сохраняются артефакты CPU-бэкендов: int8-квантованная модель и ONNX-экспорт.
 """
 
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
+from scripts.emotion_backends import export_int8, export_onnx
+
 #: @brief Имя модели HuggingFace для загрузки.
 model_name = "MaxKazak/ruBert-base-russian-emotion-detection"
 
@@ -24,3 +27,7 @@ tokenizer.save_pretrained(save_directory)
 model.save_pretrained(save_directory)
 
 print(f"Сохранено в: {save_directory}")
+
+#: @brief Подготовка артефактов для бэкендов int8 и onnx (см. scripts/emotion_backends.py).
+print(f"int8-модель: {export_int8(save_directory)}")
+print(f"ONNX-модель: {export_onnx(save_directory)}")
@@ -5,20 +5,27 @@
 Позволяет создавать текстовые и аудиозаписи с автоматическим определением эмоции, просматривать и редактировать историю записей, а также проводить статистический анализ по эмоциям.
 """
 
-import asyncio
-from datetime import datetime, timezone
+import os
+from datetime import datetime, time, timedelta, timezone
 import pytz
 
 import streamlit as st
-import pandas as pd
-import altair as alt
 
-from scripts.voice_nika import VoiceToTextConverter
-from scripts.emotion_class import EmotionDetector
+# Тяжёлые модули (torch/transformers, sounddevice и бэкенды распознавания речи, pandas/altair)
+# импортируются лениво — там, где они нужны, чтобы первая отрисовка не ждала их загрузки
+from scripts.config import DB_MAINTENANCE_INTERVAL_S, EMOTION_SERVER_ADDRESS, VOICE_STREAMING
+from scripts.detector_factory import create_detector
+from scripts.warmup import BackgroundLoader
+from db.cache import READ_CACHE
+from db.maintenance import maintenance_loop
+from db.runtime import DBRuntime
 from db.session import AsyncSessionLocal, init_db
-from db.crud import NoteRepository
+from db.crud import NoteRepository, StaleCursorError
 from random import randint
 
+#: @brief Число заметок на одной странице истории.
+HISTORY_PAGE_SIZE = 20
+
 #: @brief Словарь соответствия эмоций и эмодзи/картинок.
 name2smile = {
   "joy": ["😊", "src/joy.jpg"],
@@ -43,6 +50,24 @@ def get_emotion_color(emotion: str) -> str:
     }
     return colors.get(emotion, "#bdbdbd, #757575")
 
+def _audio_format(path: str) -> str:
+    """
+    @brief MIME-тип записи для st.audio по расширению файла.
+    @details Записи с микрофона хранятся во FLAC, а import_audio.py сохраняет пути к исходным WAV/FLAC-файлам.
+    """
+    return "audio/wav" if path.lower().endswith(".wav") else "audio/flac"
+
+@st.cache_resource(show_spinner=False)
+def _db_runtime():
+    """
+    @brief Единый на процесс цикл событий для запросов к БД.
+    @details
+    Все сессии браузера выполняют корутины в одном цикле, поэтому соединения пула
+    не закрываются между запросами (в отличие от asyncio.run на каждый вызов).
+    @return DBRuntime.
+    """
+    return DBRuntime()
+
 @st.cache_resource(show_spinner="Подготовка базы данных…")
 def _prepare_database():
     """
@@ -50,15 +75,72 @@ def _prepare_database():
     @details
     Создаёт все таблицы в базе данных, если их ещё нет (через init_db).
     """
-    asyncio.run(init_db())
+    _db_runtime().run(init_db())
+
+@st.cache_resource(show_spinner=False)
+def _start_db_maintenance():
+    """
+    @brief Запускает периодическое обслуживание БД (WAL checkpoint, ANALYZE, optimize) в цикле БД.
+    @details Одна задача на процесс; период задаётся DB_MAINTENANCE_INTERVAL_S (0 — отключено).
+    @return Future задачи обслуживания или None.
+    """
+    if DB_MAINTENANCE_INTERVAL_S <= 0:
+        return None
+    return _db_runtime().submit(maintenance_loop(DB_MAINTENANCE_INTERVAL_S))
+
+@st.cache_resource(show_spinner=False)
+def _detector_loader():
+    """
+    @brief Запускает фоновую загрузку единого на процесс детектора эмоций.
+    @details
+    st.cache_resource создаёт объект один раз и отдаёт его всем сессиям браузера,
+    поэтому веса модели и токенизатор хранятся в памяти в единственном экземпляре.
+    Конкурентные вызовы сериализуются внутри EmotionDetector.
+    Импорт torch/transformers, загрузка весов и прогревочный инференс выполняются
+    в фоновом потоке, пока интерфейс уже отрисован; тайминги печатаются в консоль.
+    @return BackgroundLoader с CachedEmotionDetector.
+    """
+    return BackgroundLoader(
+        create_detector,
+        # С сервером инференса модель в процесс не загружается
+        preload=() if EMOTION_SERVER_ADDRESS else ("scripts.emotion_class",),
+        # Прогрев в обход кэша, чтобы не засорять его служебным текстом
+        warmup=lambda detector: detector.detector.start("Прогрев модели"),
+        name="Детектор эмоций",
+    )
+
+def _emotion_detector():
+    """
+    @brief Возвращает детектор эмоций, дожидаясь окончания фоновой загрузки.
+    @details
+    Кэш детектора избавляет от повторной классификации одного и того же текста,
+    например при каждом перезапуске скрипта во время редактирования заметки.
+    Если загрузка завершилась ошибкой, неудачный загрузчик убирается из st.cache_resource
+    и сразу запускается новая фоновая загрузка, а выполнение скрипта останавливается.
+    @return CachedEmotionDetector.
+    """
+    loader = _detector_loader()
+    if not loader.ready:
+        with st.spinner("Загрузка модели эмоций…"):
+            try:
+                loader.get()
+            except Exception:
+                pass  # ошибка показывается ниже
+    if loader.error is not None:
+        _detector_loader.clear()
+        _detector_loader()  # новый загрузчик сразу начинает загрузку в фоне
+        st.error(f"Модель эмоций не загружена: {loader.error}. Загрузка запущена заново — "
+                 f"повторите действие, когда модель будет готова.")
+        st.stop()
+    return loader.get()
 
 def _run(coro):
     """
-    @brief Запускает асинхронную корутину из синхронного контекста.
-    @param coro Корутинная функция.
+    @brief Выполняет корутину в общем цикле БД и ждёт результат.
+    @param coro Корутина.
     @return Результат выполнения корутины.
     """
-    return asyncio.run(coro)
+    return _db_runtime().run(coro)
 
 def add_note(**fields):
     """
@@ -72,18 +154,22 @@ def add_note(**fields):
             return await repo.add(**fields, as_dict=True)
     return _run(_add())
 
-def update_note(note_id: int, new_text: str, emotion: str):
+def update_note(note_id: int, new_text: str, emotion: str, score: float | None = None,
+                model_version: str | None = None):
     """
-    @brief Обновляет текст и эмоцию заметки.
+    @brief Обновляет текст, эмоцию и уверенность классификатора для заметки.
     @param note_id ID заметки.
     @param new_text Новый текст.
     @param emotion Новая эмоция.
+    @param score Вероятность эмоции по оценке классификатора.
+    @param model_version Идентификатор модели, определившей эмоцию.
     @return Обновлённая заметка (NoteDTO).
     """
     async def _upd():
         async with AsyncSessionLocal() as session:
             repo = NoteRepository(session)
-            return await repo.update(note_id, text=new_text, emotion=emotion, as_dict=True)
+            return await repo.update(note_id, text=new_text, emotion=emotion, score=score,
+                                     model_version=model_version, as_dict=True)
     return _run(_upd())
 
 def delete_note(note_id: int):
@@ -109,8 +195,82 @@ def list_notes(limit: int = 100):
             return await repo.list(limit=limit, as_dict=True)
     return _run(_list())
 
+def list_notes_page(limit: int = 20, cursor: str | None = None, direction: str = "next"):
+    """
+    @brief Получает страницу истории по курсору.
+    @param limit Число заметок на странице.
+    @param cursor Курсор соседней страницы (None — самые новые заметки).
+    @param direction "next" — более старые заметки, "prev" — более новые.
+    @return NotePage со списком NoteDTO и курсорами соседних страниц.
+    """
+    async def _page():
+        async with AsyncSessionLocal() as session:
+            repo = NoteRepository(session)
+            return await repo.list_page(limit=limit, cursor=cursor, direction=direction, as_dict=True)
+    return _run(_page())
+
+def search_notes(query: str, limit: int = 20, cursor: str | None = None):
+    """
+    @brief Ищет заметки по словам текста.
+    @param query Поисковый запрос.
+    @param limit Число результатов на странице.
+    @param cursor Курсор следующей страницы (None — первая страница).
+    @return SearchPage с SearchHit (NoteDTO, HTML-фрагмент с подсветкой, релевантность).
+    """
+    async def _search():
+        async with AsyncSessionLocal() as session:
+            repo = NoteRepository(session)
+            return await repo.search(query, limit=limit, cursor=cursor, as_dict=True)
+    return _run(_search())
+
+def _reset_search():
+    """
+    @brief Возвращает поиск к первой странице при изменении запроса.
+    """
+    st.session_state.search_cursors = []
+
+def note_analytics(date_from=None, date_to=None):
+    """
+    @brief Получает агрегаты для страницы аналитики, не загружая тексты заметок.
+    @param date_from Начало периода (включительно) или None.
+    @param date_to Конец периода (не включительно) или None.
+    @return Кортеж (список EmotionStatsDTO, словарь {час: число заметок}).
+    """
+    async def _stats():
+        async with AsyncSessionLocal() as session:
+            repo = NoteRepository(session)
+            return (await repo.emotion_stats(date_from=date_from, date_to=date_to),
+                    await repo.hour_counts(date_from=date_from, date_to=date_to))
+    return _run(_stats())
+
+@st.fragment(run_every=1.0)
+def _partial_transcript():
+    """
+    @brief Показывает уже распознанную часть записи в потоковом режиме.
+    @details
+    Фрагмент перерисовывается раз в секунду независимо от остальной страницы.
+    """
+    text = st.session_state.voice_converter.get_partial_text()
+    st.text_area("Распознано на данный момент:", value=text or "…", height=150, disabled=True)
+
+@st.fragment(run_every=0.5)
+def _recognition_status():
+    """
+    @brief Ожидает фонового распознавания записи, не блокируя страницу.
+    @details
+    Пока Future не завершён, показывает индикатор (и частичный текст в потоковом режиме);
+    после завершения перезапускает скрипт, чтобы основной код показал результат.
+    """
+    if st.session_state.recognition.done():
+        st.rerun()
+    st.info("⏳ Распознавание записи...")
+    converter = st.session_state.voice_converter
+    if converter.streaming and converter.get_partial_text():
+        st.caption(converter.get_partial_text())
+
 # ----------------- UI (Streamlit) -----------------
 _prepare_database()
+_start_db_maintenance()
 
 st.set_page_config(
     layout="wide",
@@ -152,21 +312,42 @@ if 'current_text' not in st.session_state:
     st.session_state.current_text = ""
 if 'input_mode' not in st.session_state:
     st.session_state.input_mode = "text"
-if "voice_converter" not in st.session_state:
-    st.session_state.voice_converter = VoiceToTextConverter()
-if "e_detector" not in st.session_state:
-    st.session_state.e_detector = EmotionDetector()
 if "recognized_text" not in st.session_state:
     st.session_state.recognized_text = ""
 if "is_recording" not in st.session_state:
     st.session_state.is_recording = False
 if "editing_note_id" not in st.session_state:
     st.session_state.editing_note_id = None
+if "history_cursor" not in st.session_state:
+    # Текущая страница истории: курсор и направление от соседней страницы (None — самые новые)
+    st.session_state.history_cursor = None
+    st.session_state.history_direction = "next"
+if "search_cursors" not in st.session_state:
+    # Курсоры показанных страниц поиска; пустой список — первая страница
+    st.session_state.search_cursors = []
 
 # ---- Навигация страниц ----
 st.sidebar.title("Навигация")
 page = st.sidebar.radio("Выберите страницу", ["Дневник", "Аналитика"])
 
+# Первый вызов запускает загрузку модели; отрисовка её не ждёт
+_loader = _detector_loader()
+if _loader.error is not None:
+    st.sidebar.error(f"Модель эмоций не загружена: {_loader.error}")
+    if st.sidebar.button("🔄 Повторить загрузку модели"):
+        # Загрузчик с ошибкой остаётся в st.cache_resource до перезапуска процесса — сбрасываем его
+        _detector_loader.clear()
+        st.rerun()
+elif _loader.ready:
+    st.sidebar.caption("Модель эмоций готова: " + ", ".join(f"{k} {v:.1f} с" for k, v in _loader.timings.items()))
+else:
+    st.sidebar.caption("Модель эмоций загружается в фоне…")
+
+_cache_stats = READ_CACHE.stats()
+if _cache_stats["hits"] + _cache_stats["misses"]:
+    st.sidebar.caption(f"Кэш чтения БД: {_cache_stats['hit_rate']:.0%} попаданий, "
+                       f"{_cache_stats['size']} результатов")
+
 
 # ----------------- Основные разделы приложения -----------------
 if page == "Дневник":
@@ -194,42 +375,67 @@ if page == "Дневник":
                     use_container_width=True)
 
                 if submitted and note_content.strip():
-                    emotion = st.session_state.e_detector.start(note_content)
-                    add_note(text=note_content, emotion=emotion, score=None, source="text", audio_path=None)
+                    detector = _emotion_detector()
+                    result = detector.start(note_content)
+                    add_note(text=note_content, emotion=result.label, score=result.score, source="text", audio_path=None,
+                             model_version=detector.model_id)
+                    st.session_state.history_cursor = None
+                    st.session_state.history_direction = "next"
                     st.rerun()
 
         else:
-            if not st.session_state.get('is_recording', False):
+            recognition = st.session_state.get("recognition")
+            if recognition is not None and recognition.done():
+                # Распознавание завершилось в фоне — показываем результат
+                st.session_state.recognition = None
+                converter = st.session_state.voice_converter
+                try:
+                    text = recognition.result()
+                    if text:
+                        st.session_state.recognized_text = text
+                        st.session_state.recognized_audio_path = converter.audio_path
+                        st.success("✅ Запись успешно распознана!")
+                        report = converter.vad_report
+                        if report.dropped_seconds >= 0.1:
+                            st.caption(f"Перед распознаванием вырезано {report.dropped_seconds:.1f} с тишины "
+                                       f"({report.dropped_ratio:.0%} записи)")
+                    else:
+                        st.warning("⚠️ Речь не распознана")
+                except RuntimeError as e:
+                    st.error(f"❌ Ошибка: {str(e)}")
+                except Exception as e:
+                    st.error(f"⛔ Ошибка обработки: {str(e)}")
+                if converter.dropped_seconds:
+                    st.warning(f"⚠️ Запись длиннее допустимой: последние "
+                               f"{converter.dropped_seconds:.0f} с не сохранены")
+                recognition = None
+
+            if recognition is not None:
+                _recognition_status()
+            elif not st.session_state.get('is_recording', False):
                 if st.button("🎤 Начать голосовую запись", use_container_width=True):
+                    from scripts.voice_nika import VoiceToTextConverter
+
                     st.session_state.is_recording = True
-                    st.session_state.voice_converter = VoiceToTextConverter()  # дважды инициализируем
+                    st.session_state.voice_converter = VoiceToTextConverter(streaming=VOICE_STREAMING)
                     st.session_state.voice_converter.start_recording()
                     st.rerun()
             else:
                 if st.button("⏹️ Остановить запись", type="primary", use_container_width=True):
-                    st.session_state.voice_converter.stop_recording()
-
-                    with st.spinner("Обработка записи..."):
-                        try:
-                            audio_data = st.session_state.voice_converter.get_audio_data()
-                            if audio_data is not None:
-                                try:
-                                    st.session_state.recognized_text = st.session_state.voice_converter.audio_to_text(
-                                        audio_data)
-                                    st.success("✅ Запись успешно распознана!")
-                                except RuntimeError as e:
-                                    st.error(f"❌ Ошибка: {str(e)}")
-                            else:
-                                st.warning("⚠️ Не удалось получить аудиоданные")
-                        except Exception as e:
-                            st.error(f"⛔ Ошибка обработки: {str(e)}")
-                        finally:
-                            st.session_state.is_recording = False
-                            st.rerun()
+                    # Распознавание идёт в фоновом пуле; скрипт не ждёт ответа сервиса
+                    try:
+                        st.session_state.recognition = st.session_state.voice_converter.stop_and_recognize()
+                    except Exception as e:
+                        st.error(f"⛔ Ошибка обработки: {str(e)}")
+                    finally:
+                        st.session_state.is_recording = False
+                        st.rerun()
 
                 if st.session_state.get('is_recording', False):
                     st.warning("🎙️ Идёт запись... Говорите чётко в микрофон")
                     st.caption("Нажмите '⏹️ Остановить запись' когда закончите")
+                    if st.session_state.voice_converter.streaming:
+                        _partial_transcript()
 
             if st.session_state.recognized_text:
                 with st.form("audio_entry_form", clear_on_submit=True):
@@ -247,88 +453,164 @@ if page == "Дневник":
                     )
 
                     if submitted and note_content.strip():
-                        emotion = st.session_state.e_detector.start(note_content)
-                        add_note(text=note_content, emotion=emotion, score=None, source="audio", audio_path=None)
+                        detector = _emotion_detector()
+                        result = detector.start(note_content)
+                        add_note(text=note_content, emotion=result.label, score=result.score, source="audio",
+                                 audio_path=st.session_state.get("recognized_audio_path"),
+                                 model_version=detector.model_id)
                         st.session_state.recognized_text = ""
+                        st.session_state.recognized_audio_path = None
+                        st.session_state.history_cursor = None
+                        st.session_state.history_direction = "next"
                         st.rerun()
 
     with col2:
         st.subheader("История записей")
-        notes = list_notes(limit=100)
-
-        if not notes:
-            st.info("Здесь будут появляться ваши записи")
-        else:
-            for note in notes:
-
-                nid = note["id"]
-
-                moscow_tz = pytz.timezone('Europe/Moscow')
+        search_query = st.text_input("Поиск", placeholder="🔎 Поиск по записям", key="search_query",
+                                     on_change=_reset_search, label_visibility="collapsed")
+
+        if search_query.strip():
+            cursors = st.session_state.search_cursors
+            try:
+                found = search_notes(search_query, limit=HISTORY_PAGE_SIZE, cursor=cursors[-1] if cursors else None)
+            except StaleCursorError:
+                # Заметки изменились, оценки релевантности сдвинулись — показываем выдачу с начала
+                cursors.clear()
+                st.info("Записи изменились — результаты поиска показаны с начала")
+                found = search_notes(search_query, limit=HISTORY_PAGE_SIZE)
+            if not found.items:
+                st.info("Ничего не найдено")
+            for hit in found.items:
+                note = hit.note
                 created_at = datetime.fromisoformat(note["created_at"]).replace(tzinfo=timezone.utc)
-                disp = created_at.astimezone(moscow_tz).strftime("%d.%m.%Y %H:%M")
-
-                if st.session_state.editing_note_id == nid:
-                    with st.form(f"edit_form_{nid}"):
-                        edited_text = st.text_area("Редактировать заметку:", value=note['text'], height=150)
-                        emotion = st.session_state.e_detector.start(edited_text)
-
-                        c1, c2 = st.columns(2)
-                        if c1.form_submit_button("Сохранить"):
-                            update_note(nid, edited_text, emotion)
-                            st.session_state.editing_note_id = None
-                            st.rerun()
-                        if c2.form_submit_button("Отмена"):
-                            st.session_state.editing_note_id = None
-                            st.rerun()
-                    st.markdown("---")
-                    continue
-
-                with st.container():
-
-                    current_emotion = note.get('emotion', 'neutral')
-                    emotion_emoji = name2smile[current_emotion][0]
-                    image_path = name2smile[current_emotion][1]
-
-                    # Изображение-шапка с динамической шириной
-                    st.image(
-                        image_path,
-                        use_container_width=True,
-                        output_format='PNG'
-                    )
-
-                    # Карточка записи с оригинальным расположением смайла
-                    st.markdown(
-                        f"""
-                        <div class="note-card">
-                            <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.5rem;">
-                                <div style="display:flex;align-items:center;gap:0.5rem;">
-                                    <span style="font-size:1.8rem;">{emotion_emoji}</span>
-                                    <h4 style="margin:0;">Запись от {disp}</h4>
-                                </div>
-                                <small style="color:#666;">#ID {nid}</small>
+                disp = created_at.astimezone(pytz.timezone('Europe/Moscow')).strftime("%d.%m.%Y %H:%M")
+                # Фрагмент уже экранирован в репозитории, совпадения выделены <mark>
+                st.markdown(
+                    f"""
+                    <div class="note-card">
+                        <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.5rem;">
+                            <div style="display:flex;align-items:center;gap:0.5rem;">
+                                <span style="font-size:1.4rem;">{name2smile.get(note["emotion"], name2smile["neutral"])[0]}</span>
+                                <h5 style="margin:0;">Запись от {disp}</h5>
                             </div>
-                            <div style="white-space:pre-wrap;padding:0.5rem 0;line-height:1.6;">{note['text']}</div>
+                            <small style="color:#666;">#ID {note["id"]}</small>
                         </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
+                        <div style="white-space:pre-wrap;line-height:1.6;">{hit.snippet}</div>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                st.markdown("---")
+
+            back_col, more_col = st.columns(2)
+            if cursors and back_col.button("← Назад", use_container_width=True):
+                cursors.pop()
+                st.rerun()
+            if found.next_cursor and more_col.button("Ещё результаты →", use_container_width=True):
+                cursors.append(found.next_cursor)
+                st.rerun()
+        else:
+            history = list_notes_page(limit=HISTORY_PAGE_SIZE, cursor=st.session_state.history_cursor,
+                                      direction=st.session_state.history_direction)
+            notes = history.items
 
-                    edit_col, btn_col, empty = st.columns([0.1, 2.5, 0.1])
-                    with btn_col:
-                        if st.button("🗑", key=f"del-{nid}"):
-                            delete_note(nid)
-                            st.rerun()
-                    with edit_col:
-                        if st.button("✏️", key=f"edit-{nid}"):
-                            st.session_state.editing_note_id = nid
-                            st.rerun()
-                    st.markdown("---")
+            if not notes:
+                st.info("Здесь будут появляться ваши записи")
+            else:
+                for note in notes:
+
+                    nid = note["id"]
+
+                    moscow_tz = pytz.timezone('Europe/Moscow')
+                    created_at = datetime.fromisoformat(note["created_at"]).replace(tzinfo=timezone.utc)
+                    disp = created_at.astimezone(moscow_tz).strftime("%d.%m.%Y %H:%M")
+
+                    if st.session_state.editing_note_id == nid:
+                        with st.form(f"edit_form_{nid}"):
+                            edited_text = st.text_area("Редактировать заметку:", value=note['text'], height=150)
+                            detector = _emotion_detector()
+                            result = detector.start(edited_text)
+
+                            c1, c2 = st.columns(2)
+                            if c1.form_submit_button("Сохранить"):
+                                update_note(nid, edited_text, result.label, result.score, detector.model_id)
+                                st.session_state.editing_note_id = None
+                                st.rerun()
+                            if c2.form_submit_button("Отмена"):
+                                st.session_state.editing_note_id = None
+                                st.rerun()
+                        st.markdown("---")
+                        continue
+
+                    with st.container():
+
+                        current_emotion = note.get('emotion', 'neutral')
+                        emotion_emoji = name2smile[current_emotion][0]
+                        image_path = name2smile[current_emotion][1]
+
+                        # Изображение-шапка с динамической шириной
+                        st.image(
+                            image_path,
+                            use_container_width=True,
+                            output_format='PNG'
+                        )
+
+                        # Карточка записи с оригинальным расположением смайла
+                        st.markdown(
+                            f"""
+                            <div class="note-card">
+                                <div style="display:flex;justify-content:space-between;align-items:center;margin-bottom:0.5rem;">
+                                    <div style="display:flex;align-items:center;gap:0.5rem;">
+                                        <span style="font-size:1.8rem;">{emotion_emoji}</span>
+                                        <h4 style="margin:0;">Запись от {disp}</h4>
+                                    </div>
+                                    <small style="color:#666;">#ID {nid}</small>
+                                </div>
+                                <div style="white-space:pre-wrap;padding:0.5rem 0;line-height:1.6;">{note['text']}</div>
+                            </div>
+                            """,
+                            unsafe_allow_html=True
+                        )
+
+                        # FLAC-файл отдаётся браузеру как есть, без декодирования на сервере
+                        if note.get("audio_path") and os.path.exists(note["audio_path"]):
+                            st.audio(note["audio_path"], format=_audio_format(note["audio_path"]))
+
+                        edit_col, btn_col, empty = st.columns([0.1, 2.5, 0.1])
+                        with btn_col:
+                            if st.button("🗑", key=f"del-{nid}"):
+                                delete_note(nid)
+                                st.rerun()
+                        with edit_col:
+                            if st.button("✏️", key=f"edit-{nid}"):
+                                st.session_state.editing_note_id = nid
+                                st.rerun()
+                        st.markdown("---")
+
+            newer_col, older_col = st.columns(2)
+            if history.prev_cursor and newer_col.button("← Новее", use_container_width=True):
+                st.session_state.history_cursor = history.prev_cursor
+                st.session_state.history_direction = "prev"
+                st.rerun()
+            if history.next_cursor and older_col.button("Старее →", use_container_width=True):
+                st.session_state.history_cursor = history.next_cursor
+                st.session_state.history_direction = "next"
+                st.rerun()
 
 if page == "Аналитика":
-    st.header("Аналитика заметок")
-    notes = list_notes(limit=10000)
+    import pandas as pd
+    import altair as alt
 
-    if not notes:
+    st.header("Аналитика заметок")
+    period = st.date_input("Период", value=(), format="DD.MM.YYYY")
+    # Даты выбираются по московскому времени, как и показываются заметки; границы передаются с поясом
+    moscow_tz = pytz.timezone('Europe/Moscow')
+    date_from = moscow_tz.localize(datetime.combine(period[0], time())) if len(period) > 0 else None
+    # Последний день периода включается целиком
+    date_to = moscow_tz.localize(datetime.combine(period[1] + timedelta(days=1), time())) if len(period) > 1 else None
+    emotion_stats, hour_counts = note_analytics(date_from, date_to)
+
+    if not emotion_stats:
         st.info("Нет заметок для анализа")
     else:
         # Словарь перевода эмоций на русский
@@ -344,15 +626,13 @@ if page == "Аналитика":
             "neutral": "Нейтрально"
         }
 
-        df = pd.DataFrame(notes)
-        df['created_at'] = pd.to_datetime(df['created_at'])
-
-        # Добавляем русские названия эмоций
-        df['emotion_ru'] = df['emotion'].map(emotion_translation)
+        # Одна строка на эмоцию: сами заметки на страницу не загружаются
+        df = pd.DataFrame(emotion_stats)
+        df['emotion_ru'] = df['emotion'].map(emotion_translation).fillna(df['emotion'])
 
         # 1. Распределение эмоций (круговая диаграмма)
         st.subheader("Распределение эмоций")
-        counts = df['emotion_ru'].value_counts().rename_axis('Эмоция').reset_index(name='Количество')
+        counts = df.rename(columns={'emotion_ru': 'Эмоция', 'count': 'Количество'})
         pie = alt.Chart(counts).mark_arc(innerRadius=50).encode(
             theta='Количество:Q',
             color='Эмоция:N',
@@ -362,30 +642,33 @@ if page == "Аналитика":
 
         # 2. Распределение по часам (если применен скрипт рандомизации)
         st.subheader("Активность по часам")
-        df['hour'] = df['created_at'].dt.hour
-        hour_counts = df['hour'].value_counts().sort_index().reset_index(name='count').rename(columns={'index': 'hour'})
-        hist = alt.Chart(hour_counts).mark_bar().encode(
+        hours = pd.DataFrame({'hour': list(hour_counts), 'count': list(hour_counts.values())})
+        hist = alt.Chart(hours).mark_bar().encode(
             x=alt.X('hour:O', title='Час суток'),
             y='count:Q',
             tooltip=['hour', 'count']
         )
         st.altair_chart(hist, use_container_width=True)
 
-        # 3. Боксплот длины текста по эмоциям
+        # 3. Средняя длина текста по эмоциям ± стандартное отклонение
         st.subheader("Длина заметок по эмоциям")
-        df['text_len'] = df['text'].str.len()
-        box = alt.Chart(df).mark_boxplot().encode(
-            x='emotion:N', y='text_len:Q', color='emotion:N', tooltip=['emotion', 'text_len']
+        df['len_low'] = (df['avg_len'] - df['std_len']).clip(lower=0)
+        df['len_high'] = df['avg_len'] + df['std_len']
+        base = alt.Chart(df).encode(x='emotion:N')
+        bars = base.mark_bar().encode(
+            y=alt.Y('avg_len:Q', title='Средняя длина, символов'), color='emotion:N',
+            tooltip=['emotion', 'count', alt.Tooltip('avg_len:Q', format='.1f'), alt.Tooltip('std_len:Q', format='.1f')]
         )
-        st.altair_chart(box, use_container_width=True)
+        whiskers = base.mark_rule().encode(y='len_low:Q', y2='len_high:Q')
+        st.altair_chart(bars + whiskers, use_container_width=True)
 
         # 4. Общая статистика
         st.subheader("Общая статистика")
-        counts = df['emotion_ru'].value_counts().reset_index()
-        most_common = counts.iloc[0]['emotion_ru'] if not counts.empty else "Нет данных"
+        total = int(df['count'].sum())
+        most_common = df.iloc[0]['emotion_ru']
 
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Всего записей", df.shape[0])
-        col2.metric("Уникальных эмоций", df['emotion'].nunique())
+        col1.metric("Всего записей", total)
+        col2.metric("Уникальных эмоций", df.shape[0])
         col3.metric("Чаще всего", most_common)
-        col4.metric("Средняя длина", f"{df['text'].str.len().mean():.1f} символов")
+        col4.metric("Средняя длина", f"{(df['avg_len'] * df['count']).sum() / total:.1f} символов")
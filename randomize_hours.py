@@ -1,27 +1,34 @@
-import random
-from datetime import datetime, timedelta
-from db.session import AsyncSessionLocal
-from db.crud import NoteRepository
 import asyncio
+from datetime import datetime, timezone
 
+from sqlalchemy import func, update
 
-async def randomize_hours():
-    async with AsyncSessionLocal() as session:
-        repo = NoteRepository(session)
-        notes = await repo.list(limit=None, as_dict=True)
+from db.models import Note
+from db.session import AsyncSessionLocal
 
-        for note in notes:
-            # Сохраняем оригинальную дату
-            original_date = datetime.fromisoformat(note['created_at'])
-            # Меняем только час
-            new_hour = random.randint(0, 23)
-            new_date = original_date.replace(hour=new_hour)
-            # Обновляем запись
-            await repo.update(note['id'], created_at=new_date)
 
+async def randomize_hours():
+    """
+    @brief Ставит каждой заметке случайный час создания, сохраняя дату, минуты и секунды.
+    @details
+    Выполняется одним UPDATE на всю таблицу: случайный час вычисляет сама SQLite,
+    поэтому заметки не загружаются в Python и commit выполняется один раз.
+    Как и при NoteRepository.update(), updated_at ставится в текущее время — в том же UPDATE.
+    """
+    table = Note.__table__
+    # Дата хранится строкой "YYYY-MM-DD HH:MM:SS[.ffffff]": заменяем только символы часа
+    new_created_at = (
+        func.substr(table.c.created_at, 1, 11)
+        .op("||")(func.printf("%02d", func.abs(func.random()) % 24))
+        .op("||")(func.substr(table.c.created_at, 14))
+    )
+    async with AsyncSessionLocal() as session:
+        res = await session.execute(
+            update(table).values(created_at=new_created_at, updated_at=datetime.now(tz=timezone.utc))
+        )
         await session.commit()
-        print(f"Обновлено {len(notes)} записей")
+        print(f"Обновлено {res.rowcount} записей")
 
 
 if __name__ == "__main__":
-    asyncio.run(randomize_hours())
\ No newline at end of file
+    asyncio.run(randomize_hours())
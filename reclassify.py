@@ -0,0 +1,109 @@
+"""
+@file
+@brief Пересчёт эмоций всех заметок текущей моделью.
+@details
+После замены модели (load_model.py) эмоции в таблице notes устаревают. Утилита обходит заметки
+порциями по возрастанию id, пропуская уже классифицированные текущей моделью (Note.model_version),
+классифицирует тексты пакетами и записывает результаты одним UPDATE на порцию.
+Прогресс сохраняется в файл контрольной точки, поэтому прерванный запуск продолжается с места остановки.
+В памяти одновременно находится не больше одной порции, так что объём дневника не ограничен.
+
+Запуск из корня проекта:
+    python reclassify.py --chunk-size 500 --batch-size 32
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from db.session import AsyncSessionLocal
+from db.crud import NoteRepository
+from scripts.detector_factory import create_detector
+
+
+def load_checkpoint(path: str, model_version: str) -> int:
+    """
+    @brief Читает id последней обработанной заметки из контрольной точки.
+    @param path Путь к файлу контрольной точки.
+    @param model_version Текущая версия модели; точка другой версии игнорируется.
+    @return id, после которого нужно продолжить (0 — с начала).
+    """
+    if not os.path.exists(path):
+        return 0
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return state["last_id"] if state.get("model_version") == model_version else 0
+
+
+def save_checkpoint(path: str, model_version: str, last_id: int, processed: int) -> None:
+    """
+    @brief Атомарно сохраняет контрольную точку.
+    @param path Путь к файлу контрольной точки.
+    @param model_version Текущая версия модели.
+    @param last_id id последней обработанной заметки.
+    @param processed Сколько заметок обработано в этом запуске.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"model_version": model_version, "last_id": last_id, "processed": processed}, f)
+    os.replace(tmp_path, path)
+
+
+async def reclassify(detector, *, chunk_size: int, batch_size: int, checkpoint: str) -> int:
+    """
+    @brief Пересчитывает эмоции устаревших заметок.
+    @param detector Детектор эмоций (start/predict_batch/model_id).
+    @param chunk_size Сколько заметок читать и записывать за одну транзакцию.
+    @param batch_size Размер пакета для модели.
+    @param checkpoint Путь к файлу контрольной точки.
+    @return Количество обновлённых заметок.
+    """
+    version = detector.model_id
+    last_id = load_checkpoint(checkpoint, version)
+    if last_id:
+        print(f"Продолжаем после id={last_id}")
+
+    processed = 0
+    started = time.perf_counter()
+    async with AsyncSessionLocal() as session:
+        repo = NoteRepository(session)
+        while True:
+            chunk = await repo.list_stale(version, after_id=last_id, limit=chunk_size)
+            if not chunk:
+                break
+            # Модель работает синхронно; выносим её в поток, чтобы не блокировать цикл событий
+            results = await asyncio.to_thread(detector.predict_batch, [text for _, text in chunk], batch_size)
+            await repo.set_classification([
+                {"id": note_id, "emotion": r.label, "score": r.score, "model_version": version}
+                for (note_id, _), r in zip(chunk, results)
+            ])
+
+            last_id = chunk[-1][0]
+            processed += len(chunk)
+            save_checkpoint(checkpoint, version, last_id, processed)
+            rate = processed / (time.perf_counter() - started)
+            print(f"Обновлено {processed} заметок (id ≤ {last_id}, {rate:.1f} заметок/с)")
+
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+    return processed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Пересчёт эмоций заметок текущей моделью")
+    parser.add_argument("--chunk-size", type=int, default=500, help="заметок на одну транзакцию")
+    parser.add_argument("--batch-size", type=int, default=32, help="текстов на один проход модели")
+    parser.add_argument("--checkpoint", default="reclassify.checkpoint.json", help="файл контрольной точки")
+    args = parser.parse_args()
+
+    detector = create_detector(cached=False)
+    print(f"Модель: {detector.model_id}")
+    total = asyncio.run(reclassify(detector, chunk_size=args.chunk_size,
+                                   batch_size=args.batch_size, checkpoint=args.checkpoint))
+    print(f"Готово: обновлено {total} заметок")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+@file
+@brief Кольцевой буфер int16 для захвата звука без промежуточных копий.
+@details
+Callback звуковой карты пишет блоки прямо в заранее выделенный массив, а распознавание получает
+срезы этого массива (view) без копирования. Позиции отсчитываются от начала записи и только растут;
+позиция p хранится в ячейке p % capacity. Буфер растёт удвоением до max_samples.
+У буфера может быть несколько потребителей (например, распознавание фраз и запись на диск);
+каждый регистрируется под своим именем и сообщает, до какой позиции данные ему больше не нужны (release).
+Данные, освобождённые всеми потребителями, перезаписываются новыми, поэтому объём памяти ограничен
+ещё не обработанной частью записи. Без потребителей буфер хранит всю запись до max_samples.
+Если свободного места не осталось или запись достигла max_total, новые сэмплы отбрасываются
+и учитываются в dropped_samples.
+"""
+
+from threading import Condition
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    @brief Растущий кольцевой буфер моно-сэмплов int16 с ограничением по размеру.
+
+    @details
+    Один писатель (callback InputStream) и любое число потребителей. Запись, освобождение и рост
+    выполняются под общей блокировкой; чтение возвращает view, если диапазон не пересекает
+    границу кольца, иначе — склеенную копию.
+    """
+
+    def __init__(self, max_samples: int, initial_samples: int = 16000 * 10, max_total: int | None = None):
+        """
+        @brief Создаёт буфер.
+        @param max_samples Максимальное число неосвобождённых сэмплов (предел памяти).
+        @param initial_samples Начальная ёмкость; не больше max_samples.
+        @param max_total Максимальная длина всей записи в сэмплах, включая освобождённые (None — без ограничения).
+        """
+        if max_samples <= 0:
+            raise ValueError("max_samples должен быть положительным")
+        self.max_samples = max_samples
+        self.max_total = max_total
+        self.data = np.zeros(min(initial_samples, max_samples), dtype=np.int16)
+        self.start = 0  #: первая неосвобождённая позиция
+        self.end = 0  #: позиция после последнего записанного сэмпла
+        self.dropped_samples = 0
+        self.closed = False
+        self.readers: dict[str, int] = {}
+        self.cond = Condition()
+
+    @property
+    def capacity(self) -> int:
+        """
+        @brief Текущая ёмкость выделенного массива в сэмплах.
+        """
+        return len(self.data)
+
+    def __len__(self) -> int:
+        """
+        @brief Число неосвобождённых сэмплов.
+        """
+        return self.end - self.start
+
+    def clear(self) -> None:
+        """
+        @brief Сбрасывает буфер перед новой записью, сохраняя выделенную память.
+        """
+        with self.cond:
+            self.start = self.end = 0
+            self.dropped_samples = 0
+            self.closed = False
+            self.readers.clear()
+
+    def register(self, reader: str) -> None:
+        """
+        @brief Регистрирует потребителя; до его release данные с текущей позиции не освобождаются.
+        @param reader Имя потребителя.
+        """
+        with self.cond:
+            self.readers[reader] = self.start
+
+    def write(self, block: np.ndarray) -> int:
+        """
+        @brief Копирует блок сэмплов в буфер.
+        @param block Одномерный массив int16.
+        @return Сколько сэмплов записано; остаток сверх max_samples или max_total отбрасывается.
+        """
+        with self.cond:
+            count = min(len(block), self.max_samples - len(self))
+            if self.max_total is not None:
+                count = min(count, self.max_total - self.end)
+            self.dropped_samples += len(block) - count
+            if count <= 0:
+                return 0
+            if len(self) + count > self.capacity:
+                self._grow(len(self) + count)
+
+            self._put(self.data, self.end, block[:count])
+            self.end += count
+            self.cond.notify_all()
+            return count
+
+    def read(self, start: int, stop: int) -> np.ndarray:
+        """
+        @brief Возвращает сэмплы диапазона позиций [start, stop).
+        @param start Начальная позиция (не меньше self.start).
+        @param stop Конечная позиция (не больше self.end).
+        @return View буфера или копия, если диапазон пересекает границу кольца.
+        @throws IndexError Если диапазон уже освобождён или ещё не записан.
+        """
+        with self.cond:
+            if not self.start <= start <= stop <= self.end:
+                raise IndexError(f"Диапазон [{start}, {stop}) вне буфера [{self.start}, {self.end})")
+            return self._get(self.data, start, stop)
+
+    def release(self, position: int, reader: str) -> None:
+        """
+        @brief Помечает данные до позиции position как обработанные потребителем reader.
+        @param position Позиция, до которой данные больше не нужны.
+        @param reader Имя зарегистрированного потребителя.
+        @details Место переиспользуется, когда данные освободили все потребители.
+        """
+        with self.cond:
+            self.readers[reader] = max(self.readers[reader], min(position, self.end))
+            self.start = min(self.readers.values())
+
+    def close(self) -> None:
+        """
+        @brief Сообщает потребителю, что новых данных не будет.
+        """
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def wait(self, position: int, timeout: float | None = None) -> int:
+        """
+        @brief Ждёт, пока буфер заполнится дальше позиции position или будет закрыт.
+        @param position Позиция, до которой потребитель уже всё прочитал.
+        @param timeout Максимальное время ожидания в секундах.
+        @return Текущая конечная позиция буфера.
+        """
+        with self.cond:
+            self.cond.wait_for(lambda: self.end > position or self.closed, timeout)
+            return self.end
+
+    def _grow(self, needed: int) -> None:
+        """
+        @brief Увеличивает ёмкость, сохраняя соответствие позиция -> ячейка.
+        @param needed Минимально необходимая ёмкость.
+        """
+        new = np.empty(min(self.max_samples, max(needed, 2 * self.capacity)), dtype=np.int16)
+        self._put(new, self.start, self._get(self.data, self.start, self.end))
+        self.data = new
+
+    @staticmethod
+    def _get(data: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """
+        @brief Читает позиции [start, stop) из кольца data: view или копия двух кусков.
+        """
+        offset = start % len(data)
+        if offset + (stop - start) <= len(data):
+            return data[offset:offset + stop - start]
+        return np.concatenate((data[offset:], data[:stop - start - (len(data) - offset)]))
+
+    @staticmethod
+    def _put(data: np.ndarray, position: int, block: np.ndarray) -> None:
+        """
+        @brief Пишет block в кольцо data начиная с позиции position.
+        """
+        offset = position % len(data)
+        head = min(len(block), len(data) - offset)
+        data[offset:offset + head] = block[:head]
+        if head < len(block):
+            data[:len(block) - head] = block[head:]
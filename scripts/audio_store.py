@@ -0,0 +1,156 @@
+"""
+@file
+@brief Хранение голосовых записей на диске в FLAC с адресацией по содержимому.
+@details
+AudioFileWriter подключается к кольцевому буферу как отдельный потребитель и во время записи
+дописывает звук во временный FLAC-файл, освобождая записанные сэмплы в буфере.
+Поэтому память под звук не растёт с длительностью записи.
+Одновременно считается SHA-256 от PCM; по окончании файл переносится в
+AUDIO_DIR/<первые 2 символа хэша>/<хэш>.flac, так что одинаковые записи хранятся один раз.
+read_audio читает из файла только нужный фрагмент, не декодируя запись целиком,
+iter_audio — всю запись последовательными частями ограниченного размера.
+"""
+
+import hashlib
+import os
+import tempfile
+from threading import Thread
+from typing import Iterator
+
+import numpy as np
+import soundfile as sf
+
+from .audio_buffer import AudioRingBuffer
+
+
+class AudioFileWriter:
+    """
+    @brief Фоновая запись содержимого AudioRingBuffer в FLAC-файл.
+    """
+
+    reader = "disk"
+
+    def __init__(self, buffer: AudioRingBuffer, directory: str, sample_rate: int):
+        """
+        @brief Создаёт писатель.
+        @param buffer Буфер, из которого читается звук.
+        @param directory Корневая папка хранилища записей.
+        @param sample_rate Частота дискретизации, Гц.
+        """
+        self.buffer = buffer
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.hasher = hashlib.sha256()
+        self.samples = 0
+        self.error = None
+        os.makedirs(directory, exist_ok=True)
+        fd, self.tmp_path = tempfile.mkstemp(suffix=".flac.part", dir=directory)
+        os.close(fd)
+        self.file = sf.SoundFile(self.tmp_path, "w", samplerate=sample_rate, channels=1,
+                                 format="FLAC", subtype="PCM_16")
+        self.buffer.register(self.reader)
+        self.thread = Thread(target=self._write_loop, name="audio-writer", daemon=True)
+
+    def start(self) -> None:
+        """
+        @brief Запускает фоновый поток записи.
+        """
+        self.thread.start()
+
+    def finish(self, timeout: float | None = None) -> str | None:
+        """
+        @brief Дописывает остаток буфера и переносит файл на постоянное место.
+        @details Буфер должен быть закрыт (AudioRingBuffer.close), иначе поток не завершится.
+        @param timeout Максимальное время ожидания потока записи в секундах.
+        @return Путь к FLAC-файлу или None, если звука не было.
+        @throws RuntimeError Если запись на диск завершилась ошибкой.
+        """
+        self.thread.join(timeout)
+        self.file.close()
+        if self.error is not None or not self.samples:
+            os.remove(self.tmp_path)
+            if self.error is not None:
+                raise RuntimeError(f"Не удалось сохранить запись: {self.error}")
+            return None
+
+        digest = self.hasher.hexdigest()
+        path = os.path.join(self.directory, digest[:2], f"{digest}.flac")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.remove(self.tmp_path)  # такая запись уже сохранена
+        else:
+            os.replace(self.tmp_path, path)
+        return path
+
+    def _write_loop(self) -> None:
+        """
+        @brief Переносит новые сэмплы из буфера в файл, пока буфер не закрыт и не опустошён.
+        """
+        position = self.buffer.start
+        try:
+            while True:
+                end = self.buffer.wait(position, timeout=0.5)
+                if end > position:
+                    block = self.buffer.read(position, end)
+                    self.file.write(block)
+                    self.hasher.update(block.tobytes())
+                    self.samples += end - position
+                    position = end
+                    self.buffer.release(position, self.reader)
+                elif self.buffer.closed:
+                    return
+        except Exception as e:  # ошибка диска не должна ронять поток записи с микрофона
+            self.error = e
+            # Освобождаем буфер, чтобы остальные потребители не упёрлись в предел памяти
+            self.buffer.release(self.buffer.end, self.reader)
+
+
+def read_audio(path: str, start_s: float = 0.0, duration_s: float | None = None) -> np.ndarray:
+    """
+    @brief Читает фрагмент сохранённой записи.
+    @param path Путь к FLAC-файлу.
+    @param start_s Начало фрагмента в секундах.
+    @param duration_s Длительность фрагмента в секундах (None — до конца записи).
+    @return Сэмплы int16 (моно).
+    """
+    with sf.SoundFile(path) as f:
+        f.seek(min(f.frames, int(start_s * f.samplerate)))
+        frames = -1 if duration_s is None else int(duration_s * f.samplerate)
+        return f.read(frames, dtype="int16")
+
+
+def iter_audio(path: str, chunk_samples: int) -> Iterator[np.ndarray]:
+    """
+    @brief Последовательно читает сохранённую запись частями.
+    @param path Путь к FLAC-файлу.
+    @param chunk_samples Длина части в сэмплах; последняя часть может быть короче.
+    @return Генератор сэмплов int16 (моно); в памяти одновременно находится одна часть.
+    """
+    with sf.SoundFile(path) as f:
+        while True:
+            chunk = f.read(chunk_samples, dtype="int16")
+            if not len(chunk):
+                return
+            yield chunk
+
+
+def audio_duration(path: str) -> float:
+    """
+    @brief Длительность сохранённой записи в секундах без декодирования звука.
+    @param path Путь к FLAC-файлу.
+    @return Секунды.
+    """
+    info = sf.info(path)
+    return info.frames / info.samplerate
+
+
+def load_audio_file(path: str) -> tuple[np.ndarray, int]:
+    """
+    @brief Читает WAV/FLAC-файл целиком и сводит его в моно.
+    @param path Путь к файлу.
+    @return Кортеж (сэмплы int16, частота дискретизации).
+    """
+    data, sample_rate = sf.read(path, dtype="int16", always_2d=True)
+    if data.shape[1] == 1:
+        return data[:, 0], sample_rate
+    return data.mean(axis=1).astype(np.int16), sample_rate
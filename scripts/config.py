@@ -1,11 +1,13 @@
 """
 @file
-@brief Хранит пути и параметры подключения к базе данных.
+@brief Хранит пути и параметры подключения к базе данных, а также настройки детектора эмоций.
 @details
 Модуль определяет базовую директорию проекта, подгружает переменные окружения из .env
 и формирует строку подключения к базе данных (SQLite через aiosqlite).
+Остальные параметры можно переопределить переменными окружения с тем же именем.
 """
 
+import os
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -17,4 +19,91 @@ load_dotenv(BASE_DIR / ".env")
 
 #: @brief Строка подключения SQLAlchemy для асинхронной работы с SQLite.
 #: @details Используйте "sqlite+aiosqlite" для асинхронного доступа.
-SQLALCHEMY_DATABASE_URI = "sqlite+aiosqlite:///./diary.db"
+SQLALCHEMY_DATABASE_URI = os.getenv("SQLALCHEMY_DATABASE_URI", "sqlite+aiosqlite:///./diary.db")
+
+#: @brief Бэкенд инференса детектора эмоций: eager, int8 или onnx.
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "eager")
+
+#: @brief Обработка текстов длиннее контекста модели: truncate, mean или weighted.
+#: @details В режимах mean/weighted текст разбивается на перекрывающиеся окна, вероятности окон усредняются.
+#: По умолчанию truncate: смена режима меняет EmotionDetector.model_id, после чего все заметки
+#: считаются устаревшими для reclassify.py, а кэш классификации — пустым.
+EMOTION_LONG_TEXT = os.getenv("EMOTION_LONG_TEXT", "truncate")
+
+#: @brief Перекрытие соседних окон в токенах для длинных текстов.
+EMOTION_WINDOW_STRIDE = int(os.getenv("EMOTION_WINDOW_STRIDE", "128"))
+
+#: @brief Размер LRU-кэша результатов классификации в памяти процесса.
+EMOTION_CACHE_SIZE = int(os.getenv("EMOTION_CACHE_SIZE", "1024"))
+
+#: @brief Путь к SQLite-файлу дискового кэша классификации.
+#: @details Пустая строка отключает дисковый уровень кэша.
+EMOTION_CACHE_DB = os.getenv("EMOTION_CACHE_DB", "./emotion_cache.db")
+
+#: @brief Максимальное число записей в дисковом кэше классификации.
+EMOTION_CACHE_DB_MAX_ENTRIES = int(os.getenv("EMOTION_CACHE_DB_MAX_ENTRIES", "100000"))
+
+#: @brief Адрес сервера инференса (путь к Unix-сокету, см. scripts/inference_server.py).
+#: @details Пустая строка — модель загружается в процессе приложения.
+EMOTION_SERVER_ADDRESS = os.getenv("EMOTION_SERVER_ADDRESS", "")
+
+#: @brief Общий секрет сервера инференса и его клиентов (проверка подключения HMAC-рукопожатием).
+#: @details Запросы передаются pickle, поэтому без ключа любой локальный процесс с доступом к сокету
+#: мог бы выполнить код в сервере. Сервер без ключа не запускается.
+EMOTION_SERVER_AUTHKEY = os.getenv("EMOTION_SERVER_AUTHKEY", "")
+
+#: @brief Максимальное число текстов в одном пакете сервера инференса.
+EMOTION_SERVER_MAX_BATCH = int(os.getenv("EMOTION_SERVER_MAX_BATCH", "32"))
+
+#: @brief Сколько миллисекунд сервер инференса ждёт новых запросов для пакета.
+EMOTION_SERVER_MAX_WAIT_MS = float(os.getenv("EMOTION_SERVER_MAX_WAIT_MS", "5"))
+
+#: @brief Распознавать речь по фразам во время записи (1) или целиком после остановки (0).
+VOICE_STREAMING = os.getenv("VOICE_STREAMING", "1") not in ("0", "false", "False", "")
+
+#: @brief Максимальная длительность голосовой записи в секундах; ограничивает память буфера.
+VOICE_MAX_DURATION_S = float(os.getenv("VOICE_MAX_DURATION_S", "600"))
+
+#: @brief Бэкенд распознавания речи: google (онлайн), vosk (офлайн) или stub (заглушка для тестов).
+SPEECH_BACKEND = os.getenv("SPEECH_BACKEND", "google")
+
+#: @brief Язык распознавания речи для онлайн-бэкенда.
+SPEECH_LANGUAGE = os.getenv("SPEECH_LANGUAGE", "ru-RU")
+
+#: @brief Путь к распакованной модели Vosk для офлайн-распознавания.
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "./vosk_model")
+
+#: @brief Папка для FLAC-файлов голосовых записей (адресация по SHA-256 содержимого).
+#: @details Пустая строка отключает сохранение записей на диск.
+AUDIO_DIR = os.getenv("AUDIO_DIR", "./audio") or None
+
+# ----- Профиль соединения SQLite (PRAGMA при каждом новом соединении; пустая строка — значение SQLite по умолчанию) -----
+
+#: @brief Режим журнала: WAL позволяет читателям не ждать писателя.
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+
+#: @brief Режим синхронизации: NORMAL в WAL-режиме безопасен при сбое приложения и не делает fsync на каждый commit.
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+#: @brief Объём файла БД, читаемого через mmap, в байтах.
+SQLITE_MMAP_SIZE = os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+
+#: @brief Размер кэша страниц: отрицательное значение — в КиБ (-65536 = 64 МиБ).
+SQLITE_CACHE_SIZE = os.getenv("SQLITE_CACHE_SIZE", "-65536")
+
+#: @brief Где хранить временные таблицы и индексы: MEMORY, FILE или DEFAULT.
+SQLITE_TEMP_STORE = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+
+#: @brief Сколько миллисекунд ждать снятия блокировки, прежде чем вернуть «database is locked».
+SQLITE_BUSY_TIMEOUT_MS = os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")
+
+#: @brief Период обслуживания БД (WAL checkpoint, ANALYZE, PRAGMA optimize) в секундах; 0 — отключено.
+DB_MAINTENANCE_INTERVAL_S = float(os.getenv("DB_MAINTENANCE_INTERVAL_S", "3600"))
+
+#: @brief Максимальное число результатов в кэше чтения заметок (db/cache.py); 0 — кэш отключён.
+READ_CACHE_SIZE = int(os.getenv("READ_CACHE_SIZE", "512"))
+
+#: @brief Время жизни результата в кэше чтения в секундах.
+#: @details Ограничивает устаревание после записей из других процессов (импорт, пересчёт эмоций),
+#: которые не сбрасывают кэш этого процесса.
+READ_CACHE_TTL_S = float(os.getenv("READ_CACHE_TTL_S", "60"))
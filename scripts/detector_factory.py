@@ -0,0 +1,40 @@
+"""
+@file
+@brief Создание детектора эмоций по настройкам из scripts/config.py.
+@details
+Единая точка сборки детектора для приложения и утилит командной строки:
+локальная модель или клиент сервера инференса, при необходимости — с кэшем результатов.
+"""
+
+from .config import (
+    EMOTION_BACKEND, EMOTION_CACHE_SIZE, EMOTION_CACHE_DB, EMOTION_CACHE_DB_MAX_ENTRIES, EMOTION_SERVER_ADDRESS,
+    EMOTION_SERVER_AUTHKEY, EMOTION_LONG_TEXT, EMOTION_WINDOW_STRIDE,
+)
+from .emotion_cache import CachedEmotionDetector
+
+
+def create_detector(cached: bool = True):
+    """
+    @brief Создаёт детектор эмоций согласно конфигурации.
+    @param cached Обернуть детектор в CachedEmotionDetector.
+    @return Объект с интерфейсом EmotionDetector (start, predict_batch, model_id).
+
+    @details
+    Если задан EMOTION_SERVER_ADDRESS, модель в процесс не загружается: запросы уходят
+    на сервер инференса (scripts/inference_server.py), который пакетирует их между процессами.
+    """
+    if EMOTION_SERVER_ADDRESS:
+        from .inference_server import RemoteEmotionDetector
+        detector = RemoteEmotionDetector(EMOTION_SERVER_ADDRESS, EMOTION_SERVER_AUTHKEY.encode())
+    else:
+        from .emotion_class import EmotionDetector
+        detector = EmotionDetector(backend=EMOTION_BACKEND, long_text=EMOTION_LONG_TEXT,
+                                   stride=EMOTION_WINDOW_STRIDE)
+    if not cached:
+        return detector
+    return CachedEmotionDetector(
+        detector,
+        max_entries=EMOTION_CACHE_SIZE,
+        db_path=EMOTION_CACHE_DB or None,
+        max_disk_entries=EMOTION_CACHE_DB_MAX_ENTRIES,
+    )
@@ -0,0 +1,175 @@
+"""
+@file
+@brief CPU-бэкенды инференса модели ruBERT: eager fp32, динамическое int8-квантование и ONNX Runtime.
+@details
+Каждый бэкенд принимает тензоры токенизатора и возвращает тензор логитов формы (batch, num_labels),
+поэтому EmotionDetector не зависит от способа исполнения модели.
+Артефакты квантованной и экспортированной моделей лежат рядом с весами,
+сохранёнными load_model.py:
+    ruBert_emotion_model/int8/model.pt
+    ruBert_emotion_model/onnx/model.onnx
+"""
+
+import inspect
+import os
+
+import torch
+from transformers import AutoConfig, AutoModelForSequenceClassification, AutoTokenizer
+
+#: @brief Относительный путь к квантованной модели внутри папки модели.
+INT8_ARTIFACT = os.path.join("int8", "model.pt")
+
+#: @brief Относительный путь к ONNX-модели внутри папки модели.
+ONNX_ARTIFACT = os.path.join("onnx", "model.onnx")
+
+
+class EagerBackend:
+    """
+    @brief Исходный путь исполнения: PyTorch eager, fp32.
+    """
+    name = "eager"
+
+    def __init__(self, model_path: str):
+        """
+        @brief Загружает модель из локальной папки.
+        @param model_path Путь к папке с моделью.
+        """
+        self.model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        self.config = self.model.config
+
+    def __call__(self, inputs) -> torch.Tensor:
+        """
+        @brief Выполняет прямой проход.
+        @param inputs Выход токенизатора (return_tensors="pt").
+        @return Тензор логитов.
+        """
+        with torch.no_grad():
+            return self.model(**inputs).logits
+
+
+class Int8Backend(EagerBackend):
+    """
+    @brief PyTorch с динамическим int8-квантованием линейных слоёв.
+
+    @details
+    Если артефакт int8/model.pt уже подготовлен (см. export_int8), загружается он;
+    иначе модель квантуется при загрузке.
+    """
+    name = "int8"
+
+    def __init__(self, model_path: str):
+        """
+        @brief Загружает квантованную модель.
+        @param model_path Путь к папке с моделью.
+        """
+        artifact = os.path.join(model_path, INT8_ARTIFACT)
+        if os.path.exists(artifact):
+            # Артефакт создаётся локально функцией export_int8, поэтому ему можно доверять
+            self.model = torch.load(artifact, weights_only=False)
+        else:
+            self.model = quantize_int8(AutoModelForSequenceClassification.from_pretrained(model_path))
+        self.model.eval()
+        self.config = self.model.config
+
+
+class OnnxBackend:
+    """
+    @brief Исполнение экспортированной ONNX-модели через ONNX Runtime на CPU.
+    """
+    name = "onnx"
+
+    def __init__(self, model_path: str):
+        """
+        @brief Открывает сессию ONNX Runtime.
+        @param model_path Путь к папке с моделью.
+        @throws FileNotFoundError Если модель не экспортирована (см. export_onnx).
+        """
+        import onnxruntime as ort
+
+        artifact = os.path.join(model_path, ONNX_ARTIFACT)
+        if not os.path.exists(artifact):
+            raise FileNotFoundError(f"Нет ONNX-модели {artifact}; запустите python load_model.py")
+        self.session = ort.InferenceSession(artifact, providers=["CPUExecutionProvider"])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+        self.config = AutoConfig.from_pretrained(model_path)
+
+    def __call__(self, inputs) -> torch.Tensor:
+        """
+        @brief Выполняет прямой проход в ONNX Runtime.
+        @param inputs Выход токенизатора (return_tensors="pt").
+        @return Тензор логитов.
+        """
+        feed = {name: inputs[name].numpy() for name in self.input_names}
+        logits = self.session.run(["logits"], feed)[0]
+        return torch.from_numpy(logits)
+
+
+#: @brief Доступные бэкенды по имени.
+BACKENDS = {cls.name: cls for cls in (EagerBackend, Int8Backend, OnnxBackend)}
+
+
+def load_backend(name: str, model_path: str):
+    """
+    @brief Создаёт бэкенд по имени.
+    @param name Имя бэкенда: "eager", "int8" или "onnx".
+    @param model_path Путь к папке с моделью.
+    @return Экземпляр бэкенда.
+    @throws ValueError Если имя бэкенда неизвестно.
+    """
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный бэкенд {name!r}, доступны: {', '.join(BACKENDS)}") from None
+    return backend_cls(model_path)
+
+
+def quantize_int8(model):
+    """
+    @brief Динамически квантует линейные слои модели в int8.
+    @param model Модель fp32.
+    @return Квантованная модель.
+    """
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def export_int8(model_path: str) -> str:
+    """
+    @brief Сохраняет int8-квантованную модель рядом с исходной.
+    @param model_path Путь к папке с моделью.
+    @return Путь к созданному артефакту.
+    """
+    model = quantize_int8(AutoModelForSequenceClassification.from_pretrained(model_path))
+    artifact = os.path.join(model_path, INT8_ARTIFACT)
+    os.makedirs(os.path.dirname(artifact), exist_ok=True)
+    torch.save(model, artifact)
+    return artifact
+
+
+def export_onnx(model_path: str, opset: int = 17) -> str:
+    """
+    @brief Экспортирует модель в ONNX с динамическими размерами пакета и последовательности.
+    @param model_path Путь к папке с моделью.
+    @param opset Версия набора операторов ONNX.
+    @return Путь к созданному артефакту.
+    """
+    tokenizer = AutoTokenizer.from_pretrained(model_path)
+    model = AutoModelForSequenceClassification.from_pretrained(model_path)
+    sample = tokenizer(["пример текста"], return_tensors="pt")
+    # Входы графа именуются позиционно, поэтому порядок должен совпадать с сигнатурой forward
+    input_names = [name for name in inspect.signature(model.forward).parameters if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    artifact = os.path.join(model_path, ONNX_ARTIFACT)
+    os.makedirs(os.path.dirname(artifact), exist_ok=True)
+    torch.onnx.export(
+        model,
+        (dict(sample),),
+        artifact,
+        input_names=input_names,
+        output_names=["logits"],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset,
+        dynamo=False,
+    )
+    return artifact
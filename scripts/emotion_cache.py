@@ -0,0 +1,250 @@
+"""
+@file
+@brief Кэш результатов классификации эмоций с адресацией по содержимому.
+@details
+Обёртка над EmotionDetector: повторный текст не отправляется в BERT.
+Ключ кэша — SHA-256 от идентификатора модели и нормализованного текста.
+Первый уровень — ограниченный LRU в памяти процесса, второй (опционально) — SQLite-файл
+на диске, который переживает перезапуски приложения.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict
+from threading import Lock
+
+from .emotion_result import EmotionResult
+
+
+def normalize_text(text: str) -> str:
+    """
+    @brief Приводит текст к канонической форме для ключа кэша.
+    @param text Исходный текст.
+    @return Текст в форме NFC с одиночными пробелами между словами.
+
+    @details
+    Токенизатор BERT не различает виды и количество пробельных символов,
+    поэтому такие тексты дают одинаковый результат и должны иметь один ключ.
+    """
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def cache_key(model_id: str, text: str) -> str:
+    """
+    @brief Вычисляет ключ кэша для пары (модель, текст).
+    @param model_id Идентификатор версии модели.
+    @param text Исходный текст.
+    @return Шестнадцатеричный SHA-256.
+    """
+    payload = f"{model_id}\0{normalize_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class DiskCache:
+    """
+    @brief Дисковый уровень кэша на SQLite с вытеснением по размеру.
+
+    @details
+    Хранит результаты в JSON. При превышении max_entries удаляются записи
+    с самым давним временем последнего обращения (до 90% от лимита, чтобы
+    не чистить таблицу на каждой вставке).
+    """
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        """
+        @brief Открывает (или создаёт) файл кэша.
+        @param path Путь к SQLite-файлу.
+        @param max_entries Максимальное число записей в файле.
+        """
+        self.max_entries = max_entries
+        # Доступ к соединению сериализуется блокировкой CachedEmotionDetector
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS emotion_cache ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_emotion_cache_accessed ON emotion_cache (accessed_at)"
+        )
+        self.conn.commit()
+        self.size = self.conn.execute("SELECT COUNT(*) FROM emotion_cache").fetchone()[0]
+
+    def get(self, key: str) -> EmotionResult | None:
+        """
+        @brief Читает результат по ключу и отмечает время обращения.
+        @param key Ключ кэша.
+        @return EmotionResult или None, если записи нет.
+        """
+        row = self.conn.execute("SELECT result FROM emotion_cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        self.conn.execute("UPDATE emotion_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        self.conn.commit()
+        return EmotionResult(**json.loads(row[0]))
+
+    def put_many(self, items: dict[str, EmotionResult]) -> None:
+        """
+        @brief Сохраняет пачку результатов одной транзакцией.
+        @param items Словарь ключ -> результат.
+        """
+        if not items:
+            return
+        now = time.time()
+        with self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO emotion_cache (key, result, accessed_at) VALUES (?, ?, ?)",
+                [(key, json.dumps(asdict(result), ensure_ascii=False), now) for key, result in items.items()],
+            )
+            self.size += self.conn.total_changes - before
+            if self.size > self.max_entries:
+                self._evict(self.size - int(self.max_entries * 0.9))
+
+    def _evict(self, count: int) -> None:
+        """
+        @brief Удаляет count наиболее давно использованных записей.
+        @param count Количество удаляемых записей.
+        """
+        cur = self.conn.execute(
+            "DELETE FROM emotion_cache WHERE key IN ("
+            " SELECT key FROM emotion_cache ORDER BY accessed_at LIMIT ?)",
+            (count,),
+        )
+        self.size -= cur.rowcount
+
+    def close(self) -> None:
+        """
+        @brief Закрывает соединение с файлом кэша.
+        """
+        self.conn.close()
+
+
+class CachedEmotionDetector:
+    """
+    @brief Детектор эмоций с кэшированием результатов.
+
+    @details
+    Предоставляет тот же интерфейс, что и EmotionDetector (start, predict_batch),
+    и обращается к модели только для текстов, которых нет ни в памяти, ни на диске.
+    Счётчики попаданий и промахов доступны через stats().
+    """
+
+    def __init__(self, detector, max_entries: int = 1024,
+                 db_path: str | None = None, max_disk_entries: int = 100_000):
+        """
+        @brief Создаёт кэширующую обёртку.
+        @param detector Экземпляр EmotionDetector (или объект с тем же интерфейсом и атрибутом model_id).
+        @param max_entries Размер LRU-кэша в памяти.
+        @param db_path Путь к SQLite-файлу дискового кэша; None — только память.
+        @param max_disk_entries Максимальное число записей на диске.
+        """
+        self.detector = detector
+        self.max_entries = max_entries
+        self.memory: OrderedDict[str, EmotionResult] = OrderedDict()
+        self.disk = DiskCache(db_path, max_disk_entries) if db_path else None
+        self.lock = Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @property
+    def model_id(self) -> str:
+        """
+        @brief Идентификатор модели обёрнутого детектора.
+        """
+        return self.detector.model_id
+
+    def start(self, text: str) -> EmotionResult:
+        """
+        @brief Определить эмоцию текста, используя кэш.
+        @param text Входной текст для анализа.
+        @return Результат классификации (EmotionResult).
+        """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: list[str], batch_size: int = 32) -> list[EmotionResult]:
+        """
+        @brief Определить эмоции для списка текстов, классифицируя только промахи кэша.
+        @param texts Список входных текстов.
+        @param batch_size Размер пакета для модели.
+        @return Список результатов в исходном порядке текстов.
+        """
+        keys = [cache_key(self.model_id, text) for text in texts]
+        found: dict[str, EmotionResult] = {}
+        missing: dict[str, str] = {}  # ключ -> текст; дубликаты классифицируются один раз
+
+        with self.lock:
+            for key, text in zip(keys, texts):
+                if key in found or key in missing:
+                    continue
+                result = self._lookup(key)
+                if result is None:
+                    missing[key] = text
+                else:
+                    found[key] = result
+            self.misses += len(missing)
+
+        if missing:
+            computed = self.detector.predict_batch(list(missing.values()), batch_size=batch_size)
+            fresh = dict(zip(missing.keys(), computed))
+            with self.lock:
+                for key, result in fresh.items():
+                    self._remember(key, result)
+                if self.disk is not None:
+                    self.disk.put_many(fresh)
+            found.update(fresh)
+
+        return [found[key] for key in keys]
+
+    def _lookup(self, key: str) -> EmotionResult | None:
+        """
+        @brief Ищет результат сначала в памяти, затем на диске (вызывается под блокировкой).
+        @param key Ключ кэша.
+        @return EmotionResult или None.
+        """
+        result = self.memory.get(key)
+        if result is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return result
+        if self.disk is not None:
+            result = self.disk.get(key)
+            if result is not None:
+                self.disk_hits += 1
+                self._remember(key, result)
+                return result
+        return None
+
+    def _remember(self, key: str, result: EmotionResult) -> None:
+        """
+        @brief Кладёт результат в LRU-кэш в памяти, вытесняя самый старый элемент.
+        @param key Ключ кэша.
+        @param result Результат классификации.
+        """
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def stats(self) -> dict[str, int | float]:
+        """
+        @brief Возвращает счётчики работы кэша.
+        @return Словарь: попадания в память и на диск, промахи, доля попаданий, размеры уровней.
+        """
+        with self.lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_size": len(self.memory),
+                "disk_size": self.disk.size if self.disk is not None else 0,
+            }
@@ -5,10 +5,36 @@
 Класс для загрузки локальной модели BERT и определения эмоциональной окраски текста.
 """
 
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+from transformers import AutoTokenizer
 import torch
 import torch.nn.functional as F
+import hashlib
 import os
+from threading import Lock
+
+from .emotion_backends import load_backend
+from .emotion_result import EmotionResult
+
+
+def model_fingerprint(model_path: str) -> str:
+    """
+    @brief Вычисляет короткий идентификатор версии локальной модели.
+    @param model_path Путь к папке с моделью.
+    @return Шестнадцатеричная строка из 16 символов.
+
+    @details
+    Хэшируется содержимое config.json (архитектура, метки классов) и размеры файлов весов.
+    Читать сами веса (сотни мегабайт) ради идентификатора не требуется.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(model_path)):
+        full_path = os.path.join(model_path, name)
+        if name == "config.json":
+            with open(full_path, "rb") as f:
+                digest.update(f.read())
+        elif name.endswith((".safetensors", ".bin")):
+            digest.update(f"{name}:{os.path.getsize(full_path)}".encode())
+    return digest.hexdigest()[:16]
 
 
 class EmotionDetector:
@@ -17,42 +43,142 @@ class EmotionDetector:
 
     @details
     Загружает локальную модель и токенизатор для классификации эмоций в тексте.
-    Использует Huggingface Transformers и Torch.
+    Использует Huggingface Transformers и Torch; способ исполнения модели
+    задаётся бэкендом (см. scripts/emotion_backends.py).
+    Экземпляр потокобезопасен и может разделяться между всеми сессиями процесса:
+    токенизация и прямой проход выполняются под блокировкой (быстрый токенизатор
+    не допускает конкурентного использования, а torch и так занимает все ядра
+    внутри одного прохода).
+    Тексты длиннее контекста модели по умолчанию обрезаются; в режимах "mean" и "weighted"
+    они разбиваются на перекрывающиеся окна токенов, а вероятности окон усредняются.
     """
 
-    def __init__(self):
+    #: @brief Режимы обработки текстов длиннее контекста модели.
+    LONG_TEXT_MODES = ("truncate", "mean", "weighted")
+
+    def __init__(self, backend: str = "eager", long_text: str = "truncate", stride: int = 128):
         """
         @brief Инициализация детектора эмоций.
+        @param backend Бэкенд инференса: "eager" (fp32), "int8" (динамическое квантование) или "onnx".
+        @param long_text Обработка длинных текстов: "truncate" — только начало текста,
+               "mean" — среднее вероятностей скользящих окон, "weighted" — среднее, взвешенное числом токенов окна.
+        @param stride Число токенов, на которое перекрываются соседние окна.
         @details
         Загружает токенизатор и модель из локальной папки ruBert_emotion_model.
         """
+        if long_text not in self.LONG_TEXT_MODES:
+            raise ValueError(f"Неизвестный режим long_text {long_text!r}, доступны: {', '.join(self.LONG_TEXT_MODES)}")
         # Получаем путь к директории, где находится этот файл
         base_dir = os.path.dirname(os.path.abspath(__file__))
         # Собираем относительный путь к папке с моделью
         local_model_path = os.path.join(base_dir, "../ruBert_emotion_model")
         # Приводим к нормальной форме (убирает лишние ../)
         local_model_path = os.path.normpath(local_model_path)
+        self.model_path = local_model_path
         self.tokenizer = AutoTokenizer.from_pretrained(local_model_path)
-        self.model = AutoModelForSequenceClassification.from_pretrained(local_model_path)
+        self.backend = load_backend(backend, local_model_path)
+        self.config = self.backend.config
+        self.long_text = long_text
+        self.stride = stride
+        # model_max_length у некоторых токенизаторов не задан и равен огромному числу
+        self.max_length = min(self.tokenizer.model_max_length, self.config.max_position_embeddings)
+        #: Идентификатор версии модели и способа классификации, используется в ключах кэша:
+        #: квантованная модель и окна для длинных текстов могут давать другие вероятности.
+        self.model_id = f"{model_fingerprint(local_model_path)}-{backend}"
+        if long_text != "truncate":
+            self.model_id += f"-{long_text}{stride}"
+        self.lock = Lock()
 
-    def start(self, text: str):
+    def start(self, text: str) -> EmotionResult:
         """
         @brief Определить эмоцию текста.
         @param text Входной текст для анализа.
-        @return Название класса эмоции (str), например, 'joy', 'sadness', и т.д.
+        @return Результат классификации (EmotionResult): метка, её вероятность и вероятности всех классов.
+        """
+        return self.predict_batch([text])[0]
+
+    def _to_results(self, probs: torch.Tensor) -> list[EmotionResult]:
         """
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, padding=True)
+        @brief Преобразует вероятности пакета в список результатов классификации.
+        @param probs Тензор вероятностей формы (batch, num_labels).
+        @return Список EmotionResult в порядке строк тензора.
 
-        with torch.no_grad():
-            outputs = self.model(**inputs)
+        @details
+        Выбор максимума считается тензорно для всего пакета,
+        в Python-объекты переводятся только готовые результаты.
+        """
+        top_scores, top_idx = probs.max(dim=-1)
+
+        labels = self.config.id2label
+        names = [labels[i] for i in range(probs.shape[-1])]
+        return [
+            EmotionResult(label=labels[idx], score=score, probs=dict(zip(names, row)))
+            for idx, score, row in zip(top_idx.tolist(), top_scores.tolist(), probs.tolist())
+        ]
+
+    def predict_batch(self, texts: list[str], batch_size: int = 32) -> list[EmotionResult]:
+        """
+        @brief Определить эмоции для списка текстов пакетами.
+        @param texts Список входных текстов.
+        @param batch_size Максимальное число окон (текстов) в одном прямом проходе модели.
+        @return Список результатов (EmotionResult) в исходном порядке текстов.
 
-        logits = outputs.logits
-        probs = F.softmax(logits, dim=1)
+        @details
+        Тексты токенизируются один раз без паддинга и сортируются по длине в токенах,
+        поэтому каждый пакет дополняется только до своей максимальной длины.
+        Для каждого пакета выполняется один прямой проход бэкенда (без градиентов).
+        В оконных режимах длинный текст превращается в несколько окон, которые
+        пакетируются вместе с остальными, поэтому стоимость растёт линейно с длиной.
+        Если ни один текст не превысил контекст, окна совпадают с текстами и
+        агрегация пропускается.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size должен быть положительным")
+        if not texts:
+            return []
+
+        windowed = self.long_text != "truncate"
+        with self.lock:
+            encoded = self.tokenizer(
+                list(texts), truncation=True, max_length=self.max_length, padding=False,
+                return_overflowing_tokens=windowed, stride=self.stride if windowed else 0,
+            )
+        # Номер исходного текста для каждого окна
+        owners = encoded.pop("overflow_to_sample_mapping", None) or list(range(len(texts)))
+        lengths = [len(ids) for ids in encoded["input_ids"]]
+        # Индексы окон, отсортированные по длине: соседние окна попадают в один пакет
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
 
-        labels = self.model.config.id2label
-        for i, prob in enumerate(probs[0]):
-            print(f"{labels[i]}: {prob.item():.4f}")
+        probs = torch.empty(len(lengths), self.config.num_labels)
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            features = [{key: encoded[key][i] for key in encoded.keys()} for i in bucket]
+            # Блокировка берётся на каждый пакет, чтобы одиночные запросы других
+            # сессий не ждали окончания всей длинной пачки
+            with self.lock:
+                inputs = self.tokenizer.pad(features, padding="longest", return_tensors="pt")
+                logits = self.backend(inputs)
+            probs[bucket] = F.softmax(logits.float(), dim=-1)
 
-        predicted_class_idx = torch.argmax(probs, dim=1).item()
+        if len(owners) != len(texts):
+            probs = self._aggregate_windows(probs, owners, lengths, len(texts))
+        return self._to_results(probs)
 
-        return labels[predicted_class_idx]
+    def _aggregate_windows(self, probs: torch.Tensor, owners: list[int],
+                           lengths: list[int], count: int) -> torch.Tensor:
+        """
+        @brief Сводит вероятности окон к вероятностям исходных текстов.
+        @param probs Вероятности окон, форма (windows, num_labels).
+        @param owners Номер исходного текста для каждого окна.
+        @param lengths Длина каждого окна в токенах.
+        @param count Число исходных текстов.
+        @return Вероятности текстов, форма (count, num_labels).
+        """
+        owners_t = torch.tensor(owners)
+        if self.long_text == "weighted":
+            weights = torch.tensor(lengths, dtype=probs.dtype)
+        else:
+            weights = torch.ones(len(owners), dtype=probs.dtype)
+        sums = torch.zeros(count, probs.shape[-1]).index_add_(0, owners_t, probs * weights[:, None])
+        norms = torch.zeros(count).index_add_(0, owners_t, weights)
+        return sums / norms[:, None]
@@ -0,0 +1,24 @@
+"""
+@file
+@brief Результат классификации эмоции текста.
+@details
+Вынесен в отдельный модуль без зависимостей от torch/transformers, чтобы кэш,
+клиенты и утилиты могли работать с результатами, не загружая модель.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class EmotionResult:
+    """
+    @brief Результат классификации одного текста.
+    """
+    label: str
+    """@brief Название наиболее вероятного класса эмоции."""
+
+    score: float
+    """@brief Вероятность наиболее вероятного класса (от 0 до 1)."""
+
+    probs: dict[str, float]
+    """@brief Вероятности всех классов в порядке id2label модели."""
@@ -0,0 +1,347 @@
+"""
+@file
+@brief Локальный сервер инференса эмоций с микропакетированием запросов.
+@details
+Один процесс держит EmotionDetector и принимает запросы от всех сессий Streamlit и рабочих
+процессов через Unix-сокет (на Windows — именованный канал) средствами multiprocessing.connection.
+Запросы, пришедшие в течение max_wait_ms, объединяются в один пакет до max_batch_size текстов,
+классифицируются одним вызовом predict_batch, а результаты раздаются обратно по запросам.
+Клиент RemoteEmotionDetector повторяет интерфейс EmotionDetector (start, predict_batch, model_id).
+Сообщения передаются pickle, поэтому подключение проверяется общим ключом (authkey,
+EMOTION_SERVER_AUTHKEY), а Unix-сокет доступен только владельцу (0600).
+
+Запуск сервера из корня проекта:
+    EMOTION_SERVER_AUTHKEY=<секрет> python -m scripts.inference_server --address /tmp/emotion.sock
+"""
+
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from queue import Empty, Queue
+from threading import Lock, Thread
+
+from .config import (
+    EMOTION_BACKEND, EMOTION_LONG_TEXT, EMOTION_SERVER_AUTHKEY, EMOTION_SERVER_MAX_BATCH, EMOTION_SERVER_MAX_WAIT_MS,
+    EMOTION_WINDOW_STRIDE,
+)
+from .emotion_result import EmotionResult
+
+
+@dataclass
+class _Pending:
+    """
+    @brief Запрос клиента, ожидающий попадания в пакет.
+    """
+    request_id: int
+    texts: list[str]
+    conn: Connection
+    send_lock: Lock = field(repr=False)
+
+
+class InferenceServer:
+    """
+    @brief Сервер инференса с объединением запросов в пакеты.
+
+    @details
+    На каждое подключение заводится поток, который только читает запросы и кладёт их в общую очередь.
+    Единственный поток пакетирования забирает запросы из очереди, ждёт следующие не дольше max_wait_ms
+    и вызывает detector.predict_batch для всех накопленных текстов сразу.
+    """
+
+    def __init__(self, detector, address: str, authkey: bytes, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        """
+        @brief Создаёт сервер.
+        @param detector EmotionDetector или объект с тем же интерфейсом.
+        @param address Путь к Unix-сокету или имя именованного канала.
+        @param authkey Общий с клиентами ключ; подключения без него отклоняются.
+        @param max_batch_size Максимальное число текстов, собираемых в один пакет.
+        @param max_wait_ms Сколько миллисекунд ждать новых запросов после первого в пакете.
+        """
+        if not authkey:
+            raise ValueError("Сервер инференса требует непустой authkey (EMOTION_SERVER_AUTHKEY)")
+        self.detector = detector
+        self.address = address
+        self.authkey = authkey
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue: Queue[_Pending | None] = Queue()
+        self.listener: Listener | None = None
+        self.batches = 0
+        self.requests = 0
+        self.texts = 0
+
+    def serve_forever(self) -> None:
+        """
+        @brief Принимает подключения до вызова close().
+        """
+        if os.path.exists(self.address):
+            os.unlink(self.address)  # сокет, оставшийся от предыдущего запуска
+        listener = Listener(self.address, authkey=self.authkey)
+        if os.path.exists(self.address):
+            os.chmod(self.address, 0o600)  # Unix-сокет: подключаться может только владелец
+        self.listener = listener
+        Thread(target=self._batch_loop, name="emotion-batcher", daemon=True).start()
+        while True:
+            try:
+                conn = self.listener.accept()
+            except AuthenticationError:
+                continue  # клиент с неверным ключом
+            except OSError:
+                break  # listener закрыт
+            Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def start(self) -> Thread:
+        """
+        @brief Запускает serve_forever в фоновом потоке и ждёт готовности сокета.
+        @return Поток сервера.
+        """
+        thread = Thread(target=self.serve_forever, name="emotion-server", daemon=True)
+        thread.start()
+        while self.listener is None:
+            time.sleep(0.001)
+        return thread
+
+    def close(self) -> None:
+        """
+        @brief Останавливает приём подключений и поток пакетирования.
+        """
+        self.queue.put(None)
+        if self.listener is not None:
+            self.listener.close()
+
+    def stats(self) -> dict[str, float]:
+        """
+        @brief Возвращает счётчики сервера.
+        @return Число пакетов, запросов, текстов и средний размер пакета.
+        """
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "texts": self.texts,
+            "mean_batch_texts": self.texts / self.batches if self.batches else 0.0,
+        }
+
+    def _read_loop(self, conn: Connection) -> None:
+        """
+        @brief Читает запросы одного клиента и ставит их в очередь.
+        @param conn Соединение с клиентом.
+        """
+        send_lock = Lock()
+        with conn:
+            while True:
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    kind, request_id, payload = message
+                except (TypeError, ValueError):
+                    return  # не наш протокол: без request_id ответить некому
+                if kind == "predict":
+                    self.queue.put(_Pending(request_id, payload, conn, send_lock))
+                elif kind == "info":
+                    self._reply(conn, send_lock, request_id, "ok", {"model_id": self.detector.model_id})
+                else:
+                    self._reply(conn, send_lock, request_id, "error", f"Неизвестный запрос {kind!r}")
+
+    def _batch_loop(self) -> None:
+        """
+        @brief Собирает запросы в пакеты и выполняет их.
+        """
+        while True:
+            first = self.queue.get()
+            if first is None:
+                return
+            if not self._accept(first):
+                continue
+            batch = [first]
+            size = len(first.texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except Empty:
+                    break
+                if item is None:
+                    self.queue.put(None)  # обработаем текущий пакет и завершимся на следующей итерации
+                    break
+                if not self._accept(item):
+                    continue
+                batch.append(item)
+                size += len(item.texts)
+            self._run_batch(batch)
+
+    def _accept(self, item: _Pending) -> bool:
+        """
+        @brief Проверяет запрос перед добавлением в пакет; некорректный отклоняется только для его клиента.
+        @param item Запрос.
+        @return True, если запрос — непустой список строк.
+        """
+        if isinstance(item.texts, list) and item.texts and all(isinstance(t, str) for t in item.texts):
+            return True
+        self._reply(item.conn, item.send_lock, item.request_id, "error",
+                    "Запрос predict должен содержать непустой список строк")
+        return False
+
+    def _run_batch(self, batch: list[_Pending]) -> None:
+        """
+        @brief Классифицирует тексты всех запросов пакета и раздаёт результаты.
+        @param batch Список запросов.
+        """
+        texts = [text for item in batch for text in item.texts]
+        try:
+            results = self.detector.predict_batch(texts, batch_size=self.max_batch_size)
+        except Exception as e:  # ошибка модели возвращается всем клиентам пакета
+            for item in batch:
+                self._reply(item.conn, item.send_lock, item.request_id, "error", str(e))
+            return
+
+        self.batches += 1
+        self.requests += len(batch)
+        self.texts += len(texts)
+        offset = 0
+        for item in batch:
+            chunk = results[offset:offset + len(item.texts)]
+            offset += len(item.texts)
+            self._reply(item.conn, item.send_lock, item.request_id, "ok", chunk)
+
+    @staticmethod
+    def _reply(conn: Connection, send_lock: Lock, request_id: int, status: str, payload) -> None:
+        """
+        @brief Отправляет ответ клиенту; отключившийся клиент игнорируется.
+        """
+        try:
+            with send_lock:
+                conn.send((request_id, status, payload))
+        except OSError:
+            pass
+
+
+class RemoteEmotionDetector:
+    """
+    @brief Клиент сервера инференса с интерфейсом EmotionDetector.
+
+    @details
+    Одно соединение разделяется между потоками: каждый запрос получает свой идентификатор,
+    ответы разбирает фоновый поток. Поэтому одновременные вызовы из разных сессий
+    уходят на сервер параллельно и могут попасть в один пакет.
+    """
+
+    def __init__(self, address: str, authkey: bytes, timeout: float = 30.0):
+        """
+        @brief Подключается к серверу.
+        @param address Путь к Unix-сокету или имя именованного канала.
+        @param authkey Общий с сервером ключ.
+        @param timeout Максимальное время ожидания ответа, секунд.
+        @throws multiprocessing.AuthenticationError Если ключ не совпадает с ключом сервера.
+        """
+        self.conn = Client(address, authkey=authkey)
+        self.timeout = timeout
+        self.send_lock = Lock()
+        self.pending: dict[int, Future] = {}
+        self.pending_lock = Lock()
+        self.ids = itertools.count()
+        Thread(target=self._receive_loop, name="emotion-client", daemon=True).start()
+        self.model_id = self._call("info", None)["model_id"]
+
+    def start(self, text: str) -> EmotionResult:
+        """
+        @brief Определить эмоцию текста на сервере.
+        @param text Входной текст для анализа.
+        @return Результат классификации (EmotionResult).
+        """
+        return self.predict_batch([text])[0]
+
+    def predict_batch(self, texts: list[str], batch_size: int | None = None) -> list[EmotionResult]:
+        """
+        @brief Определить эмоции для списка текстов на сервере.
+        @param texts Список входных текстов.
+        @param batch_size Не используется: размер пакета задаётся сервером.
+        @return Список результатов в исходном порядке текстов.
+        """
+        if not texts:
+            return []
+        return self._call("predict", list(texts))
+
+    def close(self) -> None:
+        """
+        @brief Закрывает соединение с сервером.
+        """
+        self.conn.close()
+
+    def _call(self, kind: str, payload):
+        """
+        @brief Отправляет запрос и ждёт ответ.
+        @throws RuntimeError Если сервер вернул ошибку.
+        @throws TimeoutError Если ответ не пришёл за timeout секунд.
+        """
+        request_id = next(self.ids)
+        future: Future = Future()
+        with self.pending_lock:
+            self.pending[request_id] = future
+        try:
+            with self.send_lock:
+                self.conn.send((kind, request_id, payload))
+            return future.result(timeout=self.timeout)
+        finally:
+            # После таймаута или ошибки отправки ответ уже никто не ждёт
+            with self.pending_lock:
+                self.pending.pop(request_id, None)
+
+    def _receive_loop(self) -> None:
+        """
+        @brief Разбирает ответы сервера и завершает соответствующие Future.
+        """
+        while True:
+            try:
+                request_id, status, payload = self.conn.recv()
+            except (EOFError, OSError, TypeError) as e:  # TypeError — соединение закрыто через close()
+                with self.pending_lock:
+                    pending, self.pending = self.pending, {}
+                for future in pending.values():
+                    future.set_exception(RuntimeError(f"Соединение с сервером инференса потеряно: {e}"))
+                return
+            with self.pending_lock:
+                future = self.pending.pop(request_id, None)
+            if future is None:
+                continue
+            if status == "ok":
+                future.set_result(payload)
+            else:
+                future.set_exception(RuntimeError(f"Ошибка сервера инференса: {payload}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сервер инференса эмоций с микропакетированием")
+    parser.add_argument("--address", required=True, help="путь к Unix-сокету или имя именованного канала")
+    parser.add_argument("--backend", default=EMOTION_BACKEND, help="бэкенд EmotionDetector")
+    parser.add_argument("--long-text", default=EMOTION_LONG_TEXT, help="обработка длинных текстов")
+    parser.add_argument("--max-batch", type=int, default=EMOTION_SERVER_MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=EMOTION_SERVER_MAX_WAIT_MS)
+    args = parser.parse_args()
+    if not EMOTION_SERVER_AUTHKEY:
+        parser.error("задайте общий с клиентами ключ в переменной окружения EMOTION_SERVER_AUTHKEY")
+
+    from .emotion_class import EmotionDetector
+
+    detector = EmotionDetector(backend=args.backend, long_text=args.long_text, stride=EMOTION_WINDOW_STRIDE)
+    server = InferenceServer(detector, args.address, EMOTION_SERVER_AUTHKEY.encode(),
+                             max_batch_size=args.max_batch, max_wait_ms=args.max_wait_ms)
+    print(f"Сервер инференса слушает {args.address}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.close()
+        print(f"Остановлен: {server.stats()}")
+
+
+if __name__ == "__main__":
+    main()
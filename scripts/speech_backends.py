@@ -0,0 +1,181 @@
+"""
+@file
+@brief Бэкенды распознавания речи: Google Speech Recognition, офлайн Vosk и детерминированная заглушка.
+@details
+Каждый бэкенд принимает PCM int16 (моно) с частотой дискретизации и возвращает текст.
+Метод submit выполняет распознавание в общем пуле потоков и сразу возвращает Future,
+поэтому поток скрипта Streamlit не ждёт сетевого запроса или работы офлайн-модели.
+Бэкенд выбирается переменной окружения SPEECH_BACKEND (см. scripts/config.py).
+Офлайн-модель Vosk для русского языка скачивается отдельно и распаковывается в VOSK_MODEL_PATH.
+"""
+
+import json
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+
+from .config import SPEECH_BACKEND, SPEECH_LANGUAGE, VOSK_MODEL_PATH
+
+#: @brief Общий пул потоков распознавания для всех сессий приложения.
+EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="speech")
+
+
+class SpeechNotRecognized(RuntimeError):
+    """
+    @brief Во входном звуке не найдено разборчивой речи.
+    """
+
+
+class SpeechServiceError(RuntimeError):
+    """
+    @brief Сервис или модель распознавания недоступны.
+    """
+
+
+class SpeechBackend:
+    """
+    @brief Базовый класс бэкенда распознавания речи.
+    """
+    name = "base"
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        """
+        @brief Синхронно распознаёт речь.
+        @param pcm Сэмплы int16 (моно).
+        @param sample_rate Частота дискретизации, Гц.
+        @return Распознанный текст.
+        @throws SpeechNotRecognized Если речь не распознана.
+        @throws SpeechServiceError Если сервис или модель недоступны.
+        """
+        raise NotImplementedError
+
+    def submit(self, pcm: np.ndarray, sample_rate: int) -> Future:
+        """
+        @brief Запускает распознавание в фоновом пуле потоков.
+        @param pcm Сэмплы int16; массив не должен меняться до завершения Future.
+        @param sample_rate Частота дискретизации, Гц.
+        @return Future с текстом или исключением из recognize.
+        """
+        return EXECUTOR.submit(self.recognize, pcm, sample_rate)
+
+
+class GoogleBackend(SpeechBackend):
+    """
+    @brief Google Speech Recognition через библиотеку SpeechRecognition (нужна сеть).
+    """
+    name = "google"
+
+    def __init__(self, language: str = SPEECH_LANGUAGE):
+        """
+        @brief Создаёт бэкенд.
+        @param language Код языка распознавания.
+        """
+        import speech_recognition as sr
+
+        self.sr = sr
+        self.recognizer = sr.Recognizer()
+        self.language = language
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        audio = self.sr.AudioData(np.asarray(pcm, dtype=np.int16).tobytes(), sample_rate=sample_rate, sample_width=2)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except self.sr.UnknownValueError:
+            raise SpeechNotRecognized("Речь не распознана") from None
+        except self.sr.RequestError as e:
+            raise SpeechServiceError(f"Ошибка сервиса: {e}") from e
+
+
+@lru_cache(maxsize=None)
+def _vosk_model(model_path: str):
+    """
+    @brief Загружает модель Vosk один раз на процесс.
+    @param model_path Путь к распакованной модели.
+    @return vosk.Model.
+    """
+    import vosk
+
+    vosk.SetLogLevel(-1)
+    return vosk.Model(model_path)
+
+
+class VoskBackend(SpeechBackend):
+    """
+    @brief Офлайн-распознавание моделью Vosk (Kaldi) на CPU.
+
+    @details
+    Модель загружается один раз на процесс и разделяется между экземплярами;
+    на каждый запрос создаётся свой KaldiRecognizer, поэтому вызовы из разных потоков независимы.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path: str = VOSK_MODEL_PATH):
+        """
+        @brief Загружает модель.
+        @param model_path Путь к распакованной модели Vosk.
+        @throws SpeechServiceError Если модель не найдена.
+        """
+        import vosk
+
+        self.vosk = vosk
+        try:
+            self.model = _vosk_model(model_path)
+        except Exception as e:  # vosk сообщает об отсутствии модели общим исключением
+            raise SpeechServiceError(f"Не удалось загрузить модель Vosk из {model_path}: {e}") from e
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        recognizer = self.vosk.KaldiRecognizer(self.model, sample_rate)
+        recognizer.AcceptWaveform(np.asarray(pcm, dtype=np.int16).tobytes())
+        text = json.loads(recognizer.FinalResult()).get("text", "")
+        if not text:
+            raise SpeechNotRecognized("Речь не распознана")
+        return text
+
+
+class StubBackend(SpeechBackend):
+    """
+    @brief Детерминированная заглушка для тестов и замеров.
+
+    @details
+    Возвращает фиксированный текст для любого звука, в котором есть ненулевые сэмплы,
+    и SpeechNotRecognized для пустого или нулевого. Задержка latency имитирует время ответа сервиса.
+    """
+    name = "stub"
+
+    def __init__(self, text: str = "тестовая запись", latency: float = 0.0):
+        """
+        @brief Создаёт заглушку.
+        @param text Возвращаемый текст.
+        @param latency Искусственная задержка ответа в секундах.
+        """
+        self.text = text
+        self.latency = latency
+        self.calls = 0
+
+    def recognize(self, pcm: np.ndarray, sample_rate: int) -> str:
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if not np.any(pcm):
+            raise SpeechNotRecognized("Речь не распознана")
+        return self.text
+
+
+#: @brief Доступные бэкенды по имени.
+BACKENDS = {cls.name: cls for cls in (GoogleBackend, VoskBackend, StubBackend)}
+
+
+def load_speech_backend(name: str = SPEECH_BACKEND) -> SpeechBackend:
+    """
+    @brief Создаёт бэкенд распознавания по имени.
+    @param name Имя бэкенда: "google", "vosk" или "stub".
+    @return Экземпляр бэкенда.
+    @throws ValueError Если имя бэкенда неизвестно.
+    """
+    try:
+        backend_cls = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный бэкенд распознавания {name!r}, доступны: {', '.join(BACKENDS)}") from None
+    return backend_cls()
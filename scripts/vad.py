@@ -0,0 +1,93 @@
+"""
+@file
+@brief Определение речевой активности по энергии кадров и вырезание тишины перед распознаванием.
+@details
+Запись делится на кадры по frame_ms миллисекунд, для каждого кадра векторно считается RMS.
+Кадры с RMS не ниже energy_threshold считаются речью и расширяются на padding_ms в обе стороны,
+чтобы не срезать тихие начала и окончания слов. Тишина до первой и после последней фразы отбрасывается,
+паузы внутри записи сокращаются до pause_threshold секунд.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class VadReport:
+    """
+    @brief Сколько звука осталось после вырезания тишины.
+    """
+    input_samples: int
+    output_samples: int
+    sample_rate: int
+
+    @property
+    def dropped_seconds(self) -> float:
+        """
+        @brief Длительность вырезанного звука в секундах.
+        """
+        return (self.input_samples - self.output_samples) / self.sample_rate
+
+    @property
+    def dropped_ratio(self) -> float:
+        """
+        @brief Доля вырезанного звука от 0 до 1.
+        """
+        return 1 - self.output_samples / self.input_samples if self.input_samples else 0.0
+
+    def __add__(self, other: "VadReport") -> "VadReport":
+        """
+        @brief Суммирует отчёты нескольких фрагментов одной записи.
+        """
+        return VadReport(self.input_samples + other.input_samples,
+                         self.output_samples + other.output_samples, self.sample_rate)
+
+
+def frame_rms(pcm: np.ndarray, frame_len: int) -> np.ndarray:
+    """
+    @brief Считает RMS каждого кадра.
+    @param pcm Сэмплы int16 (моно).
+    @param frame_len Длина кадра в сэмплах; неполный последний кадр дополняется нулями.
+    @return Массив RMS по кадрам (float64, в единицах int16).
+    """
+    frames = -(-len(pcm) // frame_len)
+    padded = np.zeros(frames * frame_len, dtype=np.float64)
+    padded[:len(pcm)] = pcm
+    padded = padded.reshape(frames, frame_len)
+    return np.sqrt(np.einsum("ij,ij->i", padded, padded) / frame_len)
+
+
+def trim_silence(pcm: np.ndarray, sample_rate: int, energy_threshold: float, pause_threshold: float,
+                 frame_ms: int = 30, padding_ms: int = 200) -> tuple[np.ndarray, VadReport]:
+    """
+    @brief Вырезает тишину по краям записи и сокращает длинные паузы.
+    @param pcm Сэмплы int16 (моно).
+    @param sample_rate Частота дискретизации, Гц.
+    @param energy_threshold Порог RMS кадра, начиная с которого кадр считается речью.
+    @param pause_threshold Максимальная длительность паузы внутри записи в секундах.
+    @param frame_ms Длина кадра в миллисекундах.
+    @param padding_ms Сколько тишины оставлять вокруг речи.
+    @return Кортеж (сэмплы без тишины, отчёт). Если речь не найдена, запись возвращается без изменений:
+    порог мог оказаться слишком высоким для микрофона, и решение остаётся за распознавателем.
+    """
+    frame_len = max(1, sample_rate * frame_ms // 1000)
+    voiced = frame_rms(pcm, frame_len) >= energy_threshold
+    if not voiced.any():
+        return pcm, VadReport(len(pcm), len(pcm), sample_rate)
+
+    # Расширяем речь на padding кадров в обе стороны
+    pad = padding_ms // frame_ms
+    keep = np.convolve(voiced.astype(np.int32), np.ones(2 * pad + 1, dtype=np.int32), mode="same") > 0
+
+    # Серии тишины: края записи убираем целиком, внутренние паузы укорачиваем до pause_frames
+    edges = np.flatnonzero(np.diff(np.concatenate(([1], keep.astype(np.int8), [1]))))
+    pause_frames = int(pause_threshold * 1000 // frame_ms)
+    for start, stop in zip(edges[::2], edges[1::2]):
+        if start > 0 and stop < len(keep):
+            keep[start:start + min(pause_frames, stop - start)] = True
+
+    if keep.all():
+        return pcm, VadReport(len(pcm), len(pcm), sample_rate)
+    trimmed = pcm[np.repeat(keep, frame_len)[:len(pcm)]]
+    return trimmed, VadReport(len(pcm), len(trimmed), sample_rate)
@@ -1,15 +1,28 @@
 """
 @file
-@brief Класс для преобразования речи в текст с помощью SoundDevice и SpeechRecognition.
+@brief Класс для преобразования речи в текст с помощью SoundDevice и подключаемых бэкендов распознавания.
 @details
-Позволяет записывать аудио с микрофона, сохранять его в буфер и распознавать текст через Google Speech Recognition API.
+Позволяет записывать аудио с микрофона, сохранять его в буфер и распознавать текст бэкендом
+из scripts/speech_backends.py (Google Speech Recognition, офлайн Vosk или заглушка).
+Звук пишется в int16 прямо в кольцевой буфер (scripts/audio_buffer.py), длительность записи ограничена max_duration.
+В потоковом режиме запись во время захвата режется на фразы по паузам, и готовые фразы
+распознаются в фоновом потоке, так что к моменту остановки записи почти весь текст уже готов.
+Перед отправкой в бэкенд тишина по краям вырезается, а длинные паузы сокращаются (scripts/vad.py).
+Во время записи звук сохраняется в FLAC-файл (scripts/audio_store.py), путь к нему — в audio_path.
+Без потокового режима сохранённая запись распознаётся частями не длиннее chunk_duration секунд,
+поэтому память не растёт с длительностью записи.
 """
 
-import sounddevice as sd
 import numpy as np
-import speech_recognition as sr
-from queue import Queue, Empty
-from threading import Event
+import sounddevice as sd
+from concurrent.futures import Future
+from threading import Event, Lock, Thread
+
+from .audio_buffer import AudioRingBuffer
+from .audio_store import AudioFileWriter, iter_audio
+from .config import AUDIO_DIR, VOICE_MAX_DURATION_S
+from .speech_backends import EXECUTOR, SpeechBackend, SpeechNotRecognized, load_speech_backend
+from .vad import VadReport, frame_rms, trim_silence
 
 
 class VoiceToTextConverter:
@@ -20,19 +33,36 @@ class VoiceToTextConverter:
     Позволяет записывать звук с микрофона, управлять процессом записи, собирать аудиоданные и преобразовывать их в текст (русский язык).
     """
 
-    def __init__(self):
+    def __init__(self, streaming: bool = False, max_duration: float = VOICE_MAX_DURATION_S,
+                 backend: SpeechBackend | None = None, audio_dir: str | None = AUDIO_DIR):
         """
         @brief Инициализация конвертера.
+        @param streaming Распознавать фразы во время записи (см. get_partial_text, finish_streaming).
+        @param max_duration Максимальная длительность записи в секундах: звук сверх неё отбрасывается
+        (см. dropped_seconds) и не попадает ни в файл, ни в распознавание.
+        @param backend Бэкенд распознавания; по умолчанию выбирается SPEECH_BACKEND.
+        @param audio_dir Папка для FLAC-файлов записей; None — запись на диск не сохраняется.
         @details
-        Создаёт recognizer, очередь для аудиоданных, событие для остановки и поток записи.
+        Создаёт бэкенд распознавания, кольцевой буфер для аудиоданных, событие для остановки и поток записи.
         """
-        self.recognizer = sr.Recognizer()
-        self.recognizer.pause_threshold = 0.8
+        self.backend = backend or load_speech_backend()
+        self.pause_threshold = 0.8
         self.sample_rate = 16000
-        self.recognizer.energy_threshold = 4000
+        self.energy_threshold = 4000
+        self.chunk_duration = 30.0
         self.stop_event = Event()
-        self.audio_queue = Queue()
+        max_samples = int(max_duration * self.sample_rate)
+        self.buffer = AudioRingBuffer(max_samples=max_samples, max_total=max_samples)
         self.stream = None
+        self.streaming = streaming
+        self.worker = None
+        self.partials_lock = Lock()
+        self.partials = []
+        self.stream_error = None
+        self.vad_report = VadReport(0, 0, self.sample_rate)
+        self.audio_dir = audio_dir
+        self.writer = None
+        self.audio_path = None
 
     def callback(self, indata, frames, time, status):
         """
@@ -43,25 +73,37 @@ class VoiceToTextConverter:
         @param time Временная метка.
         @param status Статус захвата.
         @details
-        Кладёт аудиоданные в очередь. Прерывает поток при установленном событии остановки.
+        Копирует аудиоданные в кольцевой буфер. Прерывает поток при установленном событии остановки.
         """
         if self.stop_event.is_set():
             raise sd.CallbackAbort
-        self.audio_queue.put(indata.copy())
+        self.buffer.write(indata[:, 0])
 
     def start_recording(self):
         """
         @brief Начинает запись аудио с микрофона.
 
         @details
-        Очищает событие остановки и очередь, и запускает новый InputStream.
+        Очищает событие остановки и буфер, и запускает новый InputStream.
+        Запускает запись в FLAC-файл, а в потоковом режиме — и поток распознавания фраз.
         """
         self.stop_event.clear()
-        self.audio_queue = Queue()
+        self.buffer.clear()
+        self.partials = []
+        self.stream_error = None
+        self.vad_report = VadReport(0, 0, self.sample_rate)
+        self.audio_path = None
+        if self.audio_dir is not None:
+            self.writer = AudioFileWriter(self.buffer, self.audio_dir, self.sample_rate)
+            self.writer.start()
+        if self.streaming:
+            self.buffer.register("stream")
+            self.worker = Thread(target=self._stream_worker, name="speech-stream", daemon=True)
+            self.worker.start()
         self.stream = sd.InputStream(
             samplerate=self.sample_rate,
             channels=1,
-            dtype='float32',
+            dtype='int16',
             callback=self.callback
         )
         self.stream.start()
@@ -71,49 +113,232 @@ class VoiceToTextConverter:
         @brief Останавливает запись аудио.
 
         @details
-        Устанавливает событие остановки, закрывает InputStream.
+        Устанавливает событие остановки, закрывает InputStream и буфер.
         """
         self.stop_event.set()
         if self.stream:
             self.stream.close()
             self.stream = None
+        self.buffer.close()
 
-    def get_audio_data(self):
+    @property
+    def dropped_seconds(self) -> float:
         """
-        @brief Получает все накопленные аудиоданные из очереди.
+        @brief Сколько секунд звука отброшено из-за ограничения max_duration.
+        """
+        return self.buffer.dropped_samples / self.sample_rate
 
-        @return Numpy-массив аудиоданных (int16) или None, если данных нет.
+    def get_audio_data(self):
         """
-        audio_chunks = []
-        while True:
-            try:
-                chunk = self.audio_queue.get_nowait()
-                audio_chunks.append(chunk)
-            except Empty:
-                break
+        @brief Получает все накопленные аудиоданные из буфера.
 
-        return np.concatenate(audio_chunks) * 32767 if audio_chunks else None
+        @return Numpy-массив аудиоданных (int16, как правило view буфера без копирования) или None, если данных нет.
+        """
+        if not len(self.buffer):
+            return None
+        return self.buffer.read(self.buffer.start, self.buffer.end)
 
     def audio_to_text(self, audio_data):
         """
-        @brief Преобразует аудиомассив в текст с помощью Google Speech Recognition.
+        @brief Синхронно преобразует аудиомассив в текст выбранным бэкендом.
 
         @param audio_data Numpy-массив аудиоданных (int16).
         @return Распознанный текст (str) или None, если аудиоданных нет.
-        @throws RuntimeError Если речь не распознана или возникла ошибка сервиса.
+        @throws RuntimeError Если речь не распознана (SpeechNotRecognized) или возникла ошибка сервиса (SpeechServiceError).
         """
         if audio_data is None:
             return None
+        return self.backend.recognize(self.trim_silence(audio_data), self.sample_rate)
 
-        audio_data = audio_data.astype(np.int16)
-        audio_data = sr.AudioData(
-            audio_data.tobytes(),
-            sample_rate=self.sample_rate,
-            sample_width=2
-        )
+    def trim_silence(self, audio_data):
+        """
+        @brief Вырезает тишину перед распознаванием и учитывает её в vad_report.
+
+        @param audio_data Numpy-массив аудиоданных (int16).
+        @return Сэмплы без тишины по краям и с паузами не длиннее pause_threshold.
+        """
+        trimmed, report = trim_silence(audio_data, self.sample_rate, self.energy_threshold, self.pause_threshold)
+        self.vad_report = self.vad_report + report
+        return trimmed
+
+    def stop_and_recognize(self) -> Future:
+        """
+        @brief Останавливает запись и распознаёт её в фоне, не блокируя вызывающий поток.
+
+        @return Future с распознанным текстом (str) или None, если аудиоданных нет.
+        Ошибки распознавания передаются через Future как RuntimeError.
+        @details
+        В потоковом режиме Future дожидается последней фразы (finish_streaming),
+        иначе запись очищается от тишины и отправляется в бэкенд (частями, если она сохранена на диск).
+        Пока Future не завершён, новую запись начинать нельзя:
+        звук читается из того же буфера. После завершения Future путь к файлу записи лежит в audio_path.
+        """
+        self.stop_recording()
+        if self.streaming:
+            return EXECUTOR.submit(self.finish_streaming)
+        return EXECUTOR.submit(self._recognize_recording)
+
+    def _recognize_recording(self):
+        """
+        @brief Сохраняет запись и распознаёт её (непотоковый режим).
+        @return Распознанный текст (str) или None, если аудиоданных нет.
+        """
+        audio_path = self.save_audio()
+        # Записанные в файл сэмплы освобождены в буфере, поэтому читаем запись с диска
+        if audio_path:
+            return self._recognize_file(audio_path)
+        return self.audio_to_text(self.get_audio_data())
+
+    def _recognize_file(self, path):
+        """
+        @brief Распознаёт сохранённую запись частями, не загружая её в память целиком.
+
+        @param path Путь к FLAC-файлу.
+        @return Распознанный текст (str).
+        @throws RuntimeError Если речь не распознана ни в одной части или возникла ошибка сервиса.
+        @details
+        Запись читается по chunk_duration секунд. Часть обрезается по самому тихому блоку (100 мс)
+        в её последней трети, чтобы не разрезать слово; остаток переносится в начало следующей части.
+        Части без распознанной речи пропускаются.
+        """
+        block = self.sample_rate // 10
+        chunk = int(self.chunk_duration * self.sample_rate) // block * block
+        texts = []
+        tail = np.empty(0, dtype=np.int16)
+        for samples in iter_audio(path, chunk):
+            window = np.concatenate((tail, samples))
+            cut = len(window)
+            if len(samples) == chunk:  # запись может продолжаться — режем по паузе
+                search = max(block, len(window) * 2 // 3 // block * block)
+                rms = frame_rms(window[search:], block)
+                cut = search + int(rms.argmin()) * block
+            self._recognize_part(window[:cut], texts)
+            tail = window[cut:]
+        if len(tail):
+            self._recognize_part(tail, texts)
+        if not texts:
+            raise SpeechNotRecognized("Речь не распознана")
+        return " ".join(texts)
+
+    def _recognize_part(self, samples, texts):
+        """
+        @brief Распознаёт часть записи и добавляет текст в texts; нераспознанная часть пропускается.
+        """
+        try:
+            text = self.audio_to_text(samples)
+        except SpeechNotRecognized:
+            return
+        if text:
+            texts.append(text)
+
+    def save_audio(self):
+        """
+        @brief Дожидается записи FLAC-файла и запоминает путь к нему в audio_path.
+        @return Путь к файлу или None, если запись на диск отключена или звука не было.
+        @throws RuntimeError Если файл не удалось записать.
+        """
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            self.audio_path = writer.finish()
+        return self.audio_path
+
+    def get_partial_text(self):
+        """
+        @brief Возвращает текст уже распознанных фраз текущей записи.
+
+        @return Строка (пустая, если ни одна фраза ещё не распознана).
+        """
+        with self.partials_lock:
+            return " ".join(self.partials)
+
+    def finish_streaming(self, timeout=None):
+        """
+        @brief Дожидается распознавания последней фразы и возвращает полный текст записи.
+
+        @param timeout Максимальное время ожидания в секундах (None — без ограничения).
+        @return Распознанный текст (str) или None, если речь не распознана.
+        @throws RuntimeError Если при распознавании возникла ошибка сервиса.
+        """
+        self.stop_recording()
+        if self.worker is not None:
+            self.worker.join(timeout)
+            self.worker = None
+        self.save_audio()
+        if self.stream_error is not None:
+            raise self.stream_error
+        return self.get_partial_text() or None
+
+    def _stream_worker(self):
+        """
+        @brief Фоновый поток потокового режима: режет звук на фразы и распознаёт их.
+
+        @details
+        Поток читает буфер блоками по 100 мс. Фраза заканчивается, когда после речи
+        (блоки с RMS не ниже energy_threshold) накопилось pause_threshold секунд тишины.
+        Распознанная фраза освобождается в буфере, поэтому память занимает только текущая фраза.
+        Если в записи уже закончилась хотя бы одна фраза (порог подходит микрофону), от тишины между фразами
+        сохраняются только последние pause_threshold секунд (начало следующей фразы), остальное освобождается.
+        Пока ни одной фразы не было, порог мог оказаться слишком высоким для микрофона: тихий звук не отбрасывается,
+        а распознаётся частями не длиннее chunk_duration секунд и хвостом записи. В обоих случаях память
+        ограничена, а не растёт до предела max_duration. Нераспознанные фразы пропускаются, не прерывая запись.
+        """
+        block = self.sample_rate // 10
+        pause = self.pause_threshold
+        lead = int(pause * self.sample_rate)
+        chunk = int(self.chunk_duration * self.sample_rate)
+        threshold = self.energy_threshold
+        segment_start = position = 0
+        voiced = heard = False
+        silence = 0.0
+
+        while True:
+            end = self.buffer.wait(position + block - 1, timeout=0.1)
+            closed = self.buffer.closed
+            while position + block <= end or (closed and position < end):
+                stop = min(position + block, end)
+                samples = self.buffer.read(position, stop)
+                rms = frame_rms(samples, len(samples))[0]
+                position = stop
+                if rms >= threshold:
+                    voiced = True
+                    silence = 0.0
+                else:
+                    silence += len(samples) / self.sample_rate
+                if voiced and silence >= pause:
+                    self._recognize_segment(self.buffer.read(segment_start, position))
+                    self.buffer.release(position, "stream")
+                    segment_start, voiced, silence = position, False, 0.0
+                    heard = True
+                elif not voiced and heard and position - segment_start > lead + block:
+                    segment_start = position - lead
+                    self.buffer.release(segment_start, "stream")
+                elif not voiced and position - segment_start >= chunk:
+                    self._recognize_segment(self.buffer.read(segment_start, position))
+                    self.buffer.release(position, "stream")
+                    segment_start, silence = position, 0.0
+            if closed and position >= self.buffer.end:
+                break
+
+        # Хвост записи распознаём, если в нём была речь или если порог энергии
+        # оказался слишком высоким для микрофона и ни одна фраза не выделилась
+        if position > segment_start and (voiced or not heard):
+            self._recognize_segment(self.buffer.read(segment_start, position))
+
+    def _recognize_segment(self, samples):
+        """
+        @brief Распознаёт одну фразу и добавляет текст к частичной расшифровке.
+
+        @param samples Сэмплы фразы (int16).
+        """
+        if self.stream_error is not None:
+            return
         try:
-            return self.recognizer.recognize_google(audio_data, language="ru-RU")
-        except sr.UnknownValueError:
-            raise RuntimeError("Речь не распознана")
-        except sr.RequestError as e:
-            raise RuntimeError(f"Ошибка сервиса: {e}")
+            text = self.backend.recognize(self.trim_silence(samples), self.sample_rate)
+        except SpeechNotRecognized:
+            return  # шум или неразборчивая фраза — продолжаем запись
+        except RuntimeError as e:
+            self.stream_error = e
+            return
+        if text:
+            with self.partials_lock:
+                self.partials.append(text)
@@ -0,0 +1,89 @@
+"""
+@file
+@brief Фоновая загрузка тяжёлых ресурсов с замером времени.
+@details
+Позволяет начать импорт torch/transformers и загрузку модели сразу при старте приложения,
+не блокируя отрисовку интерфейса: ожидание нужно только там, где ресурс действительно используется.
+"""
+
+import importlib
+import sys
+import time
+from concurrent.futures import Future
+from threading import Thread
+from typing import Callable, Generic, Iterable, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundLoader(Generic[T]):
+    """
+    @brief Загружает ресурс в фоновом потоке.
+
+    @details
+    Этапы выполняются по порядку: импорт модулей из preload, вызов factory, вызов warmup.
+    Длительность каждого этапа сохраняется в timings и печатается по завершении.
+    Исключение, возникшее при загрузке, пробрасывается из get().
+    """
+
+    def __init__(self, factory: Callable[[], T], *, preload: Iterable[str] = (),
+                 warmup: Callable[[T], object] | None = None, name: str = "ресурс"):
+        """
+        @brief Запускает фоновую загрузку.
+        @param factory Функция, создающая ресурс.
+        @param preload Имена модулей, которые нужно импортировать до вызова factory.
+        @param warmup Функция прогрева, вызывается с готовым ресурсом (например, первый инференс).
+        @param name Название ресурса для сообщений.
+        """
+        self.name = name
+        self.timings: dict[str, float] = {}
+        self._future: Future = Future()
+        Thread(target=self._load, args=(factory, tuple(preload), warmup),
+               name=f"loader-{name}", daemon=True).start()
+
+    def _load(self, factory, preload, warmup) -> None:
+        """
+        @brief Тело фонового потока.
+        """
+        try:
+            started = time.perf_counter()
+            for module in preload:
+                importlib.import_module(module)
+            self.timings["import_s"] = time.perf_counter() - started
+
+            started = time.perf_counter()
+            resource = factory()
+            self.timings["load_s"] = time.perf_counter() - started
+
+            if warmup is not None:
+                started = time.perf_counter()
+                warmup(resource)
+                self.timings["warmup_s"] = time.perf_counter() - started
+        except BaseException as e:
+            print(f"Не удалось загрузить {self.name}: {e!r}", file=sys.stderr)
+            self._future.set_exception(e)
+            return
+        print(f"{self.name} готов: " + ", ".join(f"{k}={v:.2f}" for k, v in self.timings.items()))
+        self._future.set_result(resource)
+
+    @property
+    def ready(self) -> bool:
+        """
+        @brief Завершена ли загрузка (успешно или с ошибкой).
+        """
+        return self._future.done()
+
+    @property
+    def error(self) -> BaseException | None:
+        """
+        @brief Исключение, прервавшее загрузку, или None.
+        """
+        return self._future.exception() if self._future.done() else None
+
+    def get(self, timeout: float | None = None) -> T:
+        """
+        @brief Возвращает ресурс, при необходимости дожидаясь окончания загрузки.
+        @param timeout Максимальное время ожидания в секундах (None — без ограничения).
+        @return Загруженный ресурс.
+        """
+        return self._future.result(timeout=timeout)
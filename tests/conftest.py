@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Тесты работают с отдельной временной БД и не трогают diary.db.
+# Переменная должна быть задана до импорта db.session, который создаёт движок.
+os.environ["SQLALCHEMY_DATABASE_URI"] = (
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'test_diary.db')}"
+)
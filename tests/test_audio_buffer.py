@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from scripts.audio_buffer import AudioRingBuffer
+
+
+def test_read_returns_view_without_copy():
+    buf = AudioRingBuffer(max_samples=100, initial_samples=100)
+    buf.write(np.arange(10, dtype=np.int16))
+    view = buf.read(2, 8)
+    assert np.array_equal(view, np.arange(2, 8))
+    assert np.shares_memory(view, buf.data)
+
+
+def test_grows_up_to_cap_and_counts_dropped():
+    buf = AudioRingBuffer(max_samples=50, initial_samples=8)
+    for i in range(6):
+        buf.write(np.full(10, i, dtype=np.int16))
+    assert buf.capacity == 50
+    assert len(buf) == 50
+    assert buf.dropped_samples == 10
+    assert np.array_equal(buf.read(0, 50), np.repeat(np.arange(5), 10))
+
+
+def test_released_space_is_reused_across_wrap():
+    buf = AudioRingBuffer(max_samples=16, initial_samples=16)
+    buf.register("stream")
+    buf.write(np.arange(12, dtype=np.int16))
+    buf.release(10, "stream")
+    buf.write(np.arange(12, 20, dtype=np.int16))
+    assert buf.capacity == 16
+    assert buf.dropped_samples == 0
+    assert np.array_equal(buf.read(10, 20), np.arange(10, 20))
+    with pytest.raises(IndexError):
+        buf.read(0, 5)
+
+
+def test_grow_keeps_wrapped_data():
+    buf = AudioRingBuffer(max_samples=64, initial_samples=8)
+    buf.register("stream")
+    buf.write(np.arange(6, dtype=np.int16))
+    buf.release(4, "stream")
+    buf.write(np.arange(6, 12, dtype=np.int16))  # заворачивается через границу кольца
+    buf.write(np.arange(12, 20, dtype=np.int16))  # требует роста
+    assert buf.capacity > 8
+    assert np.array_equal(buf.read(4, 20), np.arange(4, 20))
+
+
+def test_space_is_freed_only_after_all_readers():
+    buf = AudioRingBuffer(max_samples=100, initial_samples=100)
+    buf.register("stream")
+    buf.register("disk")
+    buf.write(np.arange(50, dtype=np.int16))
+    buf.release(40, "disk")
+    assert buf.start == 0
+    buf.release(30, "stream")
+    assert buf.start == 30
+
+
+def test_total_length_is_capped_even_when_released():
+    buf = AudioRingBuffer(max_samples=100, max_total=150)
+    buf.register("disk")
+    for _ in range(5):
+        buf.write(np.ones(40, dtype=np.int16))
+        buf.release(buf.end, "disk")
+    assert buf.end == 150
+    assert buf.dropped_samples == 50
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+from scripts.audio_buffer import AudioRingBuffer  # noqa: E402
+from scripts.audio_store import AudioFileWriter, iter_audio, read_audio  # noqa: E402
+
+
+def record(tmp_path, pcm, block=1000):
+    buf = AudioRingBuffer(max_samples=4000, initial_samples=2000)
+    writer = AudioFileWriter(buf, str(tmp_path), 16000)
+    writer.start()
+    offset = 0
+    while offset < len(pcm):
+        written = buf.write(pcm[offset:offset + block])
+        offset += written
+        if not written:
+            buf.wait(buf.end, timeout=0.01)  # ждём, пока писатель освободит место
+    buf.close()
+    return buf, writer.finish(timeout=5)
+
+
+def test_recording_longer_than_buffer_is_stored(tmp_path):
+    pcm = (np.arange(48000) % 2000 - 1000).astype(np.int16)
+    buf, path = record(tmp_path, pcm)
+    assert buf.capacity <= 4000
+    assert os.path.basename(path).startswith(os.path.basename(os.path.dirname(path)))
+    assert np.array_equal(read_audio(path), pcm)
+    assert np.array_equal(read_audio(path, start_s=1.0, duration_s=0.5), pcm[16000:24000])
+    chunks = list(iter_audio(path, 20000))
+    assert [len(c) for c in chunks] == [20000, 20000, 8000]
+    assert np.array_equal(np.concatenate(chunks), pcm)
+
+
+def test_same_content_is_stored_once(tmp_path):
+    pcm = np.ones(8000, dtype=np.int16)
+    _, first = record(tmp_path, pcm)
+    _, second = record(tmp_path, pcm)
+    assert first == second
+    assert not [p for p in os.listdir(tmp_path) if p.endswith(".part")]
@@ -1,10 +1,13 @@
 import pytest
 import asyncio
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
 
 from db.session import engine, AsyncSessionLocal
 from db import models
-from db.crud import NoteRepository
+from db.crud import NoteRepository, StaleCursorError
+from db.models import NoteStat
 
 
 # ───────────────────────── фикстуры ─────────────────────────
@@ -20,7 +23,7 @@ async def prepare_db():
 @pytest.fixture
 async def repo():
     async with AsyncSessionLocal() as session:
-        yield NoteRepository(session)
+        yield NoteRepository(session, cache=None)
 
 
 def _check_basic(note, *, text, emotion, score, source):
@@ -128,3 +131,233 @@ async def test_list_empty_then_filled(repo):
 @pytest.mark.asyncio
 async def test_get_returns_none_for_missing_id(repo):
     assert await repo.get(987654321, as_dict=True) is None
+
+
+# ───────────────────────── пересчёт эмоций ──────────────────
+@pytest.mark.asyncio
+async def test_list_stale_skips_current_model_version(repo):
+    await repo.clear()
+    old = await repo.add(text="old", emotion="joy", model_version="v1", as_dict=True)
+    unknown = await repo.add(text="unknown", emotion="joy", as_dict=True)
+    await repo.add(text="current", emotion="joy", model_version="v2", as_dict=True)
+
+    stale = await repo.list_stale("v2")
+    assert stale == [(old["id"], "old"), (unknown["id"], "unknown")]
+    assert await repo.list_stale("v2", after_id=old["id"], limit=1) == [(unknown["id"], "unknown")]
+
+
+@pytest.mark.asyncio
+async def test_set_classification_keeps_updated_at(repo):
+    await repo.clear()
+    note = await repo.add(text="text", emotion="joy", model_version="v1", as_dict=True)
+    await asyncio.sleep(1)
+    await repo.set_classification([
+        {"id": note["id"], "emotion": "sadness", "score": 0.7, "model_version": "v2"}
+    ])
+    repo.session.expire_all()
+    fetched = await repo.get(note["id"], as_dict=True)
+    assert (fetched["emotion"], fetched["score"], fetched["model_version"]) == ("sadness", 0.7, "v2")
+    assert fetched["updated_at"] == note["updated_at"]
+    assert await repo.list_stale("v2") == []
+
+
+@pytest.mark.asyncio
+async def test_existing_audio_paths(repo):
+    await repo.clear()
+    await repo.add(text="a", emotion="joy", source="import", audio_path="/memos/a.wav")
+    await repo.add(text="b", emotion="joy", source="import", audio_path="/memos/b.flac")
+    found = await repo.existing_audio_paths(["/memos/a.wav", "/memos/b.flac", "/memos/c.wav"], chunk_size=2)
+    assert found == {"/memos/a.wav", "/memos/b.flac"}
+
+
+# ───────────────────────── курсорная постраничность ─────────
+@pytest.mark.asyncio
+async def test_list_page_walks_both_directions(repo):
+    await repo.clear()
+    # Пять заметок за одну секунду: порядок внутри секунды задаёт id
+    ids = [(await repo.add(text=f"n{i}", emotion="joy")).id for i in range(5)]
+    newest_first = ids[::-1]
+
+    first = await repo.list_page(limit=2, as_dict=True)
+    assert [n["id"] for n in first.items] == newest_first[:2]
+    assert first.prev_cursor is None
+
+    second = await repo.list_page(limit=2, cursor=first.next_cursor)
+    assert [n.id for n in second.items] == newest_first[2:4]
+
+    # Новая заметка не сдвигает уже выданные страницы
+    await repo.add(text="fresh", emotion="joy")
+    third = await repo.list_page(limit=2, cursor=second.next_cursor)
+    assert [n.id for n in third.items] == newest_first[4:]
+    assert third.next_cursor is None
+
+    back = await repo.list_page(limit=2, cursor=second.prev_cursor, direction="prev")
+    assert [n.id for n in back.items] == newest_first[:2]
+    assert back.prev_cursor is not None  # появилась более новая заметка
+
+
+@pytest.mark.asyncio
+async def test_list_page_orders_like_list(repo):
+    await repo.clear()
+    a = await repo.add(text="a", emotion="joy")
+    await repo.add(text="b", emotion="joy")
+    await asyncio.sleep(1)
+    await repo.update(a.id, text="a edited")  # updated_at с микросекундами
+    page = await repo.list_page(limit=10)
+    assert [n.id for n in page.items] == [n.id for n in await repo.list(limit=10)]
+
+
+@pytest.mark.asyncio
+async def test_list_page_rejects_bad_cursor(repo):
+    with pytest.raises(ValueError):
+        await repo.list_page(cursor="not-a-cursor")
+
+
+# ───────────────────────── пакетные операции ────────────────
+@pytest.mark.asyncio
+async def test_add_many_returns_notes_in_order(repo):
+    await repo.clear()
+    rows = [{"text": f"bulk {i}", "emotion": "joy", "source": "import"} for i in range(7)]
+    rows.append({"text": "with date", "emotion": "fear", "created_at": datetime(2024, 5, 1, 8, 30)})
+    notes = await repo.add_many(rows, chunk_size=3, returning=True, as_dict=True)
+    assert [n["text"] for n in notes] == [r["text"] for r in rows]
+    assert notes[-1]["source"] == "voice"
+    assert notes[-1]["created_at"] == "2024-05-01T08:30:00"
+    assert len(await repo.list(limit=None)) == 8
+    assert await repo.add_many([{"text": "x", "emotion": "joy"}]) is None
+
+
+@pytest.mark.asyncio
+async def test_add_many_is_atomic(repo):
+    await repo.clear()
+    rows = [{"text": "ok", "emotion": "joy"}, {"text": None, "emotion": "joy"}]
+    with pytest.raises(Exception):
+        await repo.add_many(rows, chunk_size=1)
+    assert await repo.list(as_dict=True) == []
+
+
+@pytest.mark.asyncio
+async def test_update_many_mixed_fields_and_touch(repo):
+    await repo.clear()
+    a, b = await repo.add_many([{"text": "a", "emotion": "joy"}, {"text": "b", "emotion": "joy"}],
+                               returning=True, as_dict=True)
+    await asyncio.sleep(1)
+    updated = await repo.update_many([
+        {"id": a["id"], "emotion": "anger"},
+        {"id": b["id"], "text": "b2", "score": 0.5},
+    ], chunk_size=1, returning=True, as_dict=True)
+    assert [(n["text"], n["emotion"], n["score"]) for n in updated] == [("a", "anger", None), ("b2", "joy", 0.5)]
+    assert all(n["updated_at"] > a["updated_at"] for n in updated)
+
+    kept = await repo.update_many([{"id": a["id"], "text": "quiet"}], touch=False, returning=True, as_dict=True)
+    assert kept[0]["updated_at"] == updated[0]["updated_at"]
+
+
+@pytest.mark.asyncio
+async def test_delete_many(repo):
+    await repo.clear()
+    notes = await repo.add_many([{"text": str(i), "emotion": "joy"} for i in range(5)], returning=True)
+    assert await repo.delete_many([n.id for n in notes[:3]] + [999999], chunk_size=2) == 3
+    assert [n.id for n in await repo.list(limit=None)] == [notes[4].id, notes[3].id]
+
+
+# ───────────────────────── аналитика ─────────────────────────
+@pytest.mark.asyncio
+async def test_emotion_stats_and_hour_counts(repo):
+    await repo.clear()
+    await repo.add_many([
+        {"text": "ab", "emotion": "joy", "created_at": datetime(2024, 5, 1, 8, 0)},
+        {"text": "abcdef", "emotion": "joy", "created_at": datetime(2024, 5, 1, 8, 30)},
+        {"text": "abcd", "emotion": "sadness", "created_at": datetime(2024, 5, 2, 21, 0)},
+    ])
+    # Заметка с CURRENT_TIMESTAMP (другой формат хранения даты)
+    await repo.add(text="a", emotion="sadness")
+
+    stats = await repo.emotion_stats()
+    assert [(s["emotion"], s["count"]) for s in stats] == [("joy", 2), ("sadness", 2)]
+    assert stats[0]["avg_len"] == 4.0
+    assert stats[0]["std_len"] == pytest.approx(2.0)
+
+    hours = await repo.hour_counts(date_from=datetime(2024, 5, 1), date_to=datetime(2024, 5, 3))
+    assert hours == {8: 2, 21: 1}
+    day = await repo.emotion_stats(date_from=datetime(2024, 5, 1, 8, 0), date_to=datetime(2024, 5, 2))
+    assert [(s["emotion"], s["count"], s["std_len"]) for s in day] == [("joy", 2, 2.0)]
+    # Границы с поясом: 3 мая по Москве начинается 2 мая в 21:00 UTC
+    msk = timezone(timedelta(hours=3))
+    may3 = await repo.emotion_stats(date_from=datetime(2024, 5, 3, tzinfo=msk), date_to=datetime(2024, 5, 4, tzinfo=msk))
+    assert [(s["emotion"], s["count"]) for s in may3] == [("sadness", 1)]
+
+
+async def _stats_rows(repo):
+    key = (NoteStat.day, NoteStat.hour, NoteStat.emotion)
+    res = await repo.session.execute(
+        select(*key, NoteStat.count, NoteStat.len_sum, NoteStat.len_sq_sum).order_by(*key))
+    return res.all()
+
+
+@pytest.mark.asyncio
+async def test_rollup_triggers_match_rebuild(repo):
+    await repo.clear()
+    assert await _stats_rows(repo) == []
+    a, b, c = await repo.add_many([
+        {"text": "ab", "emotion": "joy", "created_at": datetime(2024, 5, 1, 8, 0)},
+        {"text": "abc", "emotion": "joy", "created_at": datetime(2024, 5, 1, 8, 45)},
+        {"text": "abcd", "emotion": "fear", "created_at": datetime(2024, 5, 1, 9, 0)},
+    ], returning=True)
+    await repo.add(text="now", emotion="neutral")
+    await repo.update(a.id, text="abcdef", emotion="anger")
+    await repo.update_many([{"id": b.id, "created_at": datetime(2024, 5, 2, 23, 0)}], touch=False)
+    await repo.delete(c.id)
+
+    rows = await _stats_rows(repo)
+    assert ("2024-05-01", 8, "anger", 1, 6, 36) in rows
+    assert ("2024-05-02", 23, "joy", 1, 3, 9) in rows
+    assert not any(r.emotion in ("fear", "joy") and r.day == "2024-05-01" for r in rows)
+    assert await repo.rebuild_stats() == len(rows) == 3
+    assert await _stats_rows(repo) == rows
+
+
+# ───────────────────────── поиск ─────────────────────────────
+@pytest.mark.asyncio
+async def test_search_ranks_highlights_and_pages(repo):
+    await repo.clear()
+    sad, rain, joy = await repo.add_many([
+        {"text": "Грусть, грусть и ещё раз грусть", "emotion": "sadness"},
+        {"text": "Дождь <b>весь</b> день, немного грустно", "emotion": "sadness"},
+        {"text": "Грустить некогда: праздник!", "emotion": "joy"},
+    ], returning=True)
+
+    page = await repo.search("груст", limit=2, as_dict=True)
+    assert page.items[0].note["id"] == sad.id
+    assert page.items[0].snippet.count("<mark>Грусть</mark>") == 1
+    assert page.items[0].rank <= page.items[1].rank
+    rest = await repo.search("груст", limit=2, cursor=page.next_cursor)
+    assert len(rest.items) == 1 and rest.next_cursor is None
+    assert {h.note["id"] for h in page.items} | {rest.items[0].note.id} == {sad.id, rain.id, joy.id}
+
+    hit, = (await repo.search("весь ДЕНЬ")).items
+    assert hit.note.id == rain.id
+    assert "&lt;b&gt;<mark>весь</mark>&lt;/b&gt; <mark>день</mark>" in hit.snippet
+    assert [h.note.id for h in (await repo.search("груст", emotion="joy")).items] == [joy.id]
+    assert (await repo.search('" OR *')).items == []
+
+    # Индекс следует за правкой и удалением
+    await repo.update(rain.id, text="Солнечно")
+    await repo.delete(sad.id)
+    assert [h.note.id for h in (await repo.search("груст")).items] == [joy.id]
+    assert [h.note.id for h in (await repo.search("солн")).items] == [rain.id]
+
+
+@pytest.mark.asyncio
+async def test_search_cursor_is_rejected_after_notes_change(repo):
+    await repo.clear()
+    await repo.add_many([{"text": f"прогулка номер {i}", "emotion": "joy"} for i in range(3)])
+    page = await repo.search("прогулка", limit=2)
+    # Без изменений курсор продолжает выдачу
+    assert len((await repo.search("прогулка", limit=2, cursor=page.next_cursor)).items) == 1
+
+    # Новая заметка меняет оценки bm25 всех результатов — старый курсор недействителен
+    await repo.add(text="ещё одна прогулка", emotion="joy")
+    with pytest.raises(StaleCursorError):
+        await repo.search("прогулка", limit=2, cursor=page.next_cursor)
+    assert len((await repo.search("прогулка", limit=10)).items) == 4
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import NullPool
+
+from db.maintenance import run_maintenance
+from db.session import engine, make_engine
+
+
+async def pragma(conn, name):
+    return (await conn.execute(text(f"PRAGMA {name}"))).scalar()
+
+
+@pytest.mark.asyncio
+async def test_every_connection_gets_pragma_profile():
+    async with engine.connect() as conn:
+        assert (await pragma(conn, "journal_mode")).lower() == "wal"
+        assert await pragma(conn, "synchronous") == 1  # NORMAL
+        assert await pragma(conn, "busy_timeout") == 5000
+        assert await pragma(conn, "cache_size") == -65536
+        assert await pragma(conn, "temp_store") == 2  # MEMORY
+
+
+@pytest.mark.asyncio
+async def test_maintenance_pass_truncates_wal():
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE IF NOT EXISTS maintenance_probe (x)"))
+        await conn.execute(text("INSERT INTO maintenance_probe VALUES (1)"))
+
+    maintenance_engine = make_engine(str(engine.url), poolclass=NullPool)
+    try:
+        stats = await run_maintenance(maintenance_engine)
+    finally:
+        await maintenance_engine.dispose()
+    assert stats["busy"] == 0
+    assert stats["wal_pages"] == stats["checkpointed_pages"]
+
+    async with engine.begin() as conn:
+        await conn.execute(text("DROP TABLE maintenance_probe"))
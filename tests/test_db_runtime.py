@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+
+from db.runtime import DBRuntime
+from db.session import engine, make_engine
+
+
+@pytest.fixture
+def runtime():
+    rt = DBRuntime()
+    yield rt
+    rt.close()
+
+
+def test_run_returns_result_and_propagates_errors(runtime):
+    async def double(x):
+        await asyncio.sleep(0)
+        return 2 * x
+
+    async def fail():
+        raise ValueError("boom")
+
+    assert runtime.run(double(21)) == 42
+    with pytest.raises(ValueError, match="boom"):
+        runtime.run(fail())
+
+
+def test_pool_connection_is_reused_between_calls(runtime):
+    pooled = make_engine(str(engine.url))
+    connections = []
+
+    async def connection_id():
+        async with pooled.connect() as conn:
+            connections.append(id(conn.sync_connection.connection.dbapi_connection))
+            return (await conn.execute(text("SELECT 1"))).scalar()
+
+    try:
+        assert [runtime.run(connection_id()) for _ in range(3)] == [1, 1, 1]
+    finally:
+        runtime.close(pooled)
+    assert len(set(connections)) == 1
+
+
+def test_close_cancels_background_tasks_and_rejects_new_work(runtime):
+    future = runtime.submit(asyncio.sleep(3600))
+    runtime.close()
+
+    assert future.cancelled()
+    assert not runtime.thread.is_alive()
+    with pytest.raises(RuntimeError):
+        runtime.run(asyncio.sleep(0))
+
+
+def test_run_from_loop_thread_is_rejected(runtime):
+    async def nested():
+        return runtime.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError, match="том же цикле"):
+        runtime.run(nested())
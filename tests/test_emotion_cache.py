@@ -0,0 +1,62 @@
+from scripts.emotion_cache import CachedEmotionDetector, cache_key
+from scripts.emotion_result import EmotionResult
+
+
+class FakeDetector:
+    """Детектор-заглушка: считает, сколько текстов реально классифицировано."""
+
+    def __init__(self, model_id="fake-v1"):
+        self.model_id = model_id
+        self.calls = []
+
+    def predict_batch(self, texts, batch_size=32):
+        self.calls.append(list(texts))
+        return [EmotionResult(label="joy", score=len(t) / 100, probs={"joy": len(t) / 100})
+                for t in texts]
+
+
+def test_repeated_text_skips_model():
+    fake = FakeDetector()
+    cached = CachedEmotionDetector(fake)
+    first = cached.start("Хороший  день")
+    second = cached.start("Хороший день ")
+    assert first == second
+    assert len(fake.calls) == 1
+    assert cached.stats()["memory_hits"] == 1
+    assert cached.stats()["misses"] == 1
+
+
+def test_batch_classifies_only_unique_misses():
+    fake = FakeDetector()
+    cached = CachedEmotionDetector(fake)
+    cached.start("a")
+    results = cached.predict_batch(["a", "bb", "bb", "ccc"])
+    assert [r.score for r in results] == [0.01, 0.02, 0.02, 0.03]
+    assert fake.calls[-1] == ["bb", "ccc"]
+
+
+def test_memory_lru_is_bounded():
+    cached = CachedEmotionDetector(FakeDetector(), max_entries=2)
+    for text in ["a", "b", "c"]:
+        cached.start(text)
+    assert cached.stats()["memory_size"] == 2
+
+
+def test_model_id_is_part_of_key():
+    assert cache_key("v1", "текст") != cache_key("v2", "текст")
+
+
+def test_disk_tier_survives_restart_and_evicts(tmp_path):
+    path = str(tmp_path / "cache.db")
+    cached = CachedEmotionDetector(FakeDetector(), db_path=path, max_disk_entries=10)
+    cached.predict_batch([f"text {i}" for i in range(8)])
+    cached.disk.close()
+
+    fake = FakeDetector()
+    restarted = CachedEmotionDetector(fake, db_path=path, max_disk_entries=10)
+    assert restarted.start("text 3").score == 0.06
+    assert fake.calls == []
+    assert restarted.stats()["disk_hits"] == 1
+
+    restarted.predict_batch([f"other {i}" for i in range(5)])
+    assert restarted.stats()["disk_size"] <= 10
@@ -0,0 +1,97 @@
+import time
+
+import numpy as np
+import pytest
+
+sf = pytest.importorskip("soundfile")
+
+from db import models  # noqa: E402
+from db.session import engine  # noqa: E402
+from import_audio import RateLimiter, find_audio_files, import_audio, transcribe  # noqa: E402
+from scripts.emotion_result import EmotionResult  # noqa: E402
+from scripts.speech_backends import SpeechServiceError, StubBackend  # noqa: E402
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def prepare_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+
+
+class FakeDetector:
+    model_id = "fake-v1"
+
+    def predict_batch(self, texts, batch_size=32):
+        return [EmotionResult(label="neutral", score=1.0, probs={"neutral": 1.0}) for _ in texts]
+
+
+class FlakyBackend(StubBackend):
+    """Отвечает ошибкой сервиса первые failures раз."""
+
+    def __init__(self, failures):
+        super().__init__(text="после повтора")
+        self.failures = failures
+
+    def recognize(self, pcm, sample_rate):
+        if self.calls < self.failures:
+            self.calls += 1
+            raise SpeechServiceError("503")
+        return super().recognize(pcm, sample_rate)
+
+
+def write_wav(path, value):
+    sf.write(str(path), np.full(1600, value, dtype=np.int16), 16000, subtype="PCM_16")
+    return str(path)
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(rate=20, burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        limiter.acquire()
+    assert time.monotonic() - started >= 0.19  # первый токен готов сразу, ещё 4 — по 50 мс
+
+    unlimited = RateLimiter(rate=0)
+    started = time.monotonic()
+    for _ in range(1000):
+        unlimited.acquire()
+    assert time.monotonic() - started < 0.1
+
+
+def test_transcribe_retries_service_errors(tmp_path):
+    path = write_wav(tmp_path / "a.wav", 1000)
+    limiter = RateLimiter(rate=0)
+
+    backend = FlakyBackend(failures=2)
+    assert transcribe(backend, path, limiter, retries=2, backoff=0.001) == "после повтора"
+    assert backend.calls == 3
+    with pytest.raises(SpeechServiceError):
+        transcribe(FlakyBackend(failures=2), path, limiter, retries=1, backoff=0.001)
+    # Тишина — не ошибка сервиса: повторов нет, текста нет
+    silent = StubBackend()
+    assert transcribe(silent, write_wav(tmp_path / "silent.wav", 0), limiter, retries=3, backoff=0.001) is None
+    assert silent.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_repeated_import_skips_imported_files(tmp_path):
+    (tmp_path / "nested").mkdir()
+    write_wav(tmp_path / "one.wav", 1000)
+    write_wav(tmp_path / "nested" / "two.wav", 2000)
+    write_wav(tmp_path / "silent.wav", 0)
+    (tmp_path / "notes.txt").write_text("не аудио")
+    paths = find_audio_files(str(tmp_path))
+    assert len(paths) == 3
+
+    options = dict(workers=2, rate=0, retries=0, backoff=0.0, chunk_size=2)
+    first = await import_audio(paths, StubBackend("импорт"), FakeDetector(), **options)
+    assert first == {"imported": 2, "skipped": 0, "empty": 1, "failed": 0}
+
+    # Повторный запуск продолжает импорт: сохранённые файлы не распознаются заново
+    backend = StubBackend("импорт")
+    second = await import_audio(paths, backend, FakeDetector(), **options)
+    assert second == {"imported": 0, "skipped": 2, "empty": 1, "failed": 0}
+    assert backend.calls == 1
@@ -0,0 +1,89 @@
+import os
+import stat
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import AuthenticationError
+
+import pytest
+
+from scripts.emotion_result import EmotionResult
+from scripts.inference_server import InferenceServer, RemoteEmotionDetector
+
+
+KEY = b"test-secret"
+
+
+class FakeDetector:
+    model_id = "fake-v1"
+
+    def __init__(self):
+        self.batches = []
+
+    def predict_batch(self, texts, batch_size=32):
+        if "boom" in texts:
+            raise ValueError("model failure")
+        if "slow" in texts:
+            time.sleep(0.5)
+        self.batches.append(len(texts))
+        return [EmotionResult(label=t, score=1.0, probs={t: 1.0}) for t in texts]
+
+
+@pytest.fixture
+def server(tmp_path):
+    fake = FakeDetector()
+    srv = InferenceServer(fake, str(tmp_path / "emotion.sock"), KEY, max_batch_size=64, max_wait_ms=50)
+    srv.start()
+    yield srv
+    srv.close()
+
+
+def test_proxy_matches_detector_interface(server):
+    client = RemoteEmotionDetector(server.address, KEY)
+    assert client.model_id == "fake-v1"
+    assert client.start("joy").label == "joy"
+    assert [r.label for r in client.predict_batch(["a", "b", "c"])] == ["a", "b", "c"]
+    client.close()
+
+
+def test_concurrent_requests_are_batched(server):
+    client = RemoteEmotionDetector(server.address, KEY)
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        labels = list(pool.map(lambda i: client.start(f"t{i}").label, range(16)))
+    assert labels == [f"t{i}" for i in range(16)]
+    assert server.stats()["requests"] == 16
+    assert server.stats()["batches"] < 16
+    client.close()
+
+
+def test_model_error_is_reported_to_client(server):
+    client = RemoteEmotionDetector(server.address, KEY)
+    with pytest.raises(RuntimeError, match="model failure"):
+        client.predict_batch(["boom"])
+    assert client.start("ok").label == "ok"
+    client.close()
+
+
+def test_socket_is_private_and_requires_authkey(server):
+    assert stat.S_IMODE(os.stat(server.address).st_mode) == 0o600
+    with pytest.raises(AuthenticationError):
+        RemoteEmotionDetector(server.address, b"wrong")
+    client = RemoteEmotionDetector(server.address, KEY)  # сервер продолжает принимать подключения
+    assert client.start("ok").label == "ok"
+    client.close()
+
+
+def test_malformed_request_is_rejected_to_its_caller_only(server):
+    client = RemoteEmotionDetector(server.address, KEY)
+    for payload in (None, [1, 2], "text", []):
+        with pytest.raises(RuntimeError, match="непустой список строк"):
+            client._call("predict", payload)
+    assert client.start("ok").label == "ok"
+    client.close()
+
+
+def test_timed_out_request_is_forgotten(server):
+    client = RemoteEmotionDetector(server.address, KEY, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        client.start("slow")
+    assert client.pending == {}
+    client.close()
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from db import models
+from db.crud import NoteRepository
+from db.models import Note
+
+ROWS = 20_000
+
+
+# ───────────────────────── фикстуры ─────────────────────────
+@pytest.fixture(scope="module")
+async def engine():
+    """Отдельная in-memory БД с большой синтетической таблицей."""
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+        start = datetime(2025, 1, 1)
+        emotions = ["joy", "sadness", "anger", "neutral", "fear"]
+        await conn.execute(insert(Note), [
+            {"text": f"note {i}", "emotion": emotions[i % len(emotions)], "source": "import",
+             "created_at": start + timedelta(minutes=i), "updated_at": start + timedelta(minutes=i, seconds=i % 7)}
+            for i in range(ROWS)
+        ])
+        await conn.execute(text("ANALYZE"))
+    yield engine
+    await engine.dispose()
+
+
+async def query_plan(engine, sql, params=()):
+    async with engine.connect() as conn:
+        res = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}", params)
+        return " | ".join(row[-1] for row in res)
+
+
+def test_model_indexes_are_declared():
+    names = {index.name for index in Note.__table__.indexes}
+    assert {"ix_notes_updated_at_created_at", "ix_notes_emotion_created_at", "ix_notes_created_at"} <= names
+
+
+async def repository_plan(engine, call):
+    """Выполняет вызов репозитория и возвращает план последнего выполненного им запроса."""
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        async with AsyncSession(engine) as session:
+            result = await call(NoteRepository(session, cache=None))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", capture)
+    statement, parameters = captured[-1]
+    return result, await query_plan(engine, statement, parameters)
+
+
+@pytest.mark.asyncio
+async def test_history_listing_uses_index(engine):
+    notes, plan = await repository_plan(engine, lambda repo: repo.list(limit=20))
+    assert len(notes) == 20
+    assert "ix_notes_updated_at_created_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("direction", ["next", "prev"])
+async def test_keyset_page_uses_index_range(engine, direction):
+    async with AsyncSession(engine) as session:
+        middle = await NoteRepository(session, cache=None).list_page(limit=ROWS // 2)
+
+    page, plan = await repository_plan(
+        engine, lambda repo: repo.list_page(limit=20, cursor=middle.next_cursor, direction=direction))
+    assert len(page.items) == 20
+    # Поиск по индексу с условием на ключ, а не полный просмотр с пропуском OFFSET строк
+    assert "SEARCH notes USING INDEX ix_notes_updated_at_created_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_emotion_grouping_uses_covering_index(engine):
+    stmt = select(Note.emotion, func.count()).group_by(Note.emotion)
+    plan = await query_plan(engine, str(stmt.compile(compile_kwargs={"literal_binds": True})))
+    assert "COVERING INDEX ix_notes_emotion_created_at" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+@pytest.mark.asyncio
+async def test_analytics_reads_hourly_rollup(engine):
+    hours, plan = await repository_plan(
+        engine, lambda repo: repo.hour_counts(date_from=datetime(2025, 1, 2), date_to=datetime(2025, 1, 3)))
+    assert sum(hours.values()) == 24 * 60
+    # Читается диапазон первичного ключа сводки, а не заметки
+    assert "SEARCH note_stats USING" in plan
+    assert "notes " not in plan
+
+
+@pytest.mark.asyncio
+async def test_analytics_unaligned_range_uses_created_at_index(engine):
+    hours, plan = await repository_plan(
+        engine, lambda repo: repo.hour_counts(date_from=datetime(2025, 1, 2, 0, 30), date_to=datetime(2025, 1, 3)))
+    assert sum(hours.values()) == 24 * 60 - 30
+    assert "COVERING INDEX ix_notes_created_at (created_at>? AND created_at<?)" in plan
@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from db import models
+from db.cache import ReadCache
+from db.crud import NoteRepository
+from db.session import engine, AsyncSessionLocal
+
+
+@pytest.fixture(autouse=True, scope="module")
+async def prepare_db():
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.create_all)
+    yield
+    async with engine.begin() as conn:
+        await conn.run_sync(models.Base.metadata.drop_all)
+
+
+def test_lru_eviction_ttl_and_stats(monkeypatch):
+    cache = ReadCache(max_entries=2, ttl_s=10)
+    for key in "abc":
+        cache.put(key, key.upper(), cache.version)
+    assert cache.get("a") == (False, None)  # вытеснен самый давний
+    assert cache.get("b") == (True, "B")
+
+    now = time.monotonic()
+    monkeypatch.setattr("db.cache.time.monotonic", lambda: now + 11)
+    assert cache.get("c") == (False, None)  # истёк срок жизни
+    assert cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3, "evictions": 1, "size": 1, "version": 0}
+
+
+def test_result_read_before_write_is_not_stored():
+    cache = ReadCache(max_entries=10, ttl_s=60)
+    version = cache.version
+    cache.invalidate()  # запись завершилась, пока шло чтение
+    cache.put("k", "stale", version)
+    assert cache.get("k") == (False, None)
+
+
+@pytest.mark.asyncio
+async def test_repository_reads_are_served_until_write():
+    cache = ReadCache(max_entries=10, ttl_s=60)
+    async with AsyncSessionLocal() as session:
+        writer = NoteRepository(session, cache=cache)
+        await writer.clear()
+        note = await writer.add(text="первая", emotion="joy", as_dict=True)
+
+    async with AsyncSessionLocal() as session:
+        reader = NoteRepository(session, cache=cache)
+        first = await reader.list(limit=10, as_dict=True)
+        first[0]["text"] = "испорчено"  # изменение результата вызывающим не попадает в кэш
+        assert [n["text"] for n in await reader.list(limit=10, as_dict=True)] == ["первая"]
+        assert await reader.get(note["id"], as_dict=True) == note
+        assert (await reader.emotion_stats())[0]["count"] == 1
+        await reader.list(limit=10)  # ORM-объекты не кэшируются
+        assert cache.stats()["hits"] == 1
+
+        await reader.update(note["id"], text="изменённая")
+        assert [n["text"] for n in await reader.list(limit=10, as_dict=True)] == ["изменённая"]
+        await reader.delete(note["id"])
+        assert await reader.list(limit=10, as_dict=True) == []
+        assert await reader.emotion_stats() == []
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from scripts.speech_backends import SpeechNotRecognized, StubBackend, load_speech_backend
+
+
+def test_stub_is_deterministic():
+    backend = StubBackend(text="привет")
+    pcm = np.full(1600, 1000, dtype=np.int16)
+    assert backend.recognize(pcm, 16000) == "привет"
+    assert backend.recognize(pcm, 16000) == "привет"
+
+
+def test_stub_rejects_silence():
+    with pytest.raises(SpeechNotRecognized):
+        StubBackend().recognize(np.zeros(1600, dtype=np.int16), 16000)
+
+
+def test_submit_runs_in_background():
+    backend = StubBackend(text="фон", latency=0.05)
+    future = backend.submit(np.ones(160, dtype=np.int16), 16000)
+    assert future.result(timeout=5) == "фон"
+
+    failed = backend.submit(np.zeros(160, dtype=np.int16), 16000)
+    assert isinstance(failed.exception(timeout=5), SpeechNotRecognized)
+
+
+def test_unknown_backend_name():
+    with pytest.raises(ValueError):
+        load_speech_backend("nope")
+    assert isinstance(load_speech_backend("stub"), StubBackend)
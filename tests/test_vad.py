@@ -0,0 +1,39 @@
+import numpy as np
+
+from scripts.vad import frame_rms, trim_silence
+
+SR = 16000
+
+
+def tone(seconds, amplitude=8000):
+    t = np.arange(int(seconds * SR)) / SR
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * SR), dtype=np.int16)
+
+
+def test_frame_rms_matches_loop():
+    pcm = tone(0.1)
+    rms = frame_rms(pcm, 480)
+    expected = [np.sqrt(np.mean(pcm[i:i + 480].astype(np.float64) ** 2)) for i in range(0, len(pcm), 480)]
+    expected[-1] = np.sqrt(np.sum(pcm[len(pcm) // 480 * 480:].astype(np.float64) ** 2) / 480)
+    assert np.allclose(rms, expected)
+
+
+def test_trims_edges_and_collapses_pauses():
+    pcm = np.concatenate([silence(2), tone(1), silence(5), tone(1), silence(3)])
+    trimmed, report = trim_silence(pcm, SR, energy_threshold=1000, pause_threshold=0.8)
+    # 2 с речи + пауза 0.8 с + по 0.2 с отступа вокруг каждой фразы
+    assert 2.8 * SR <= len(trimmed) <= 4.0 * SR
+    assert report.input_samples == len(pcm)
+    assert report.output_samples == len(trimmed)
+    assert report.dropped_seconds > 7
+
+
+def test_no_speech_keeps_audio():
+    pcm = tone(1, amplitude=10)
+    trimmed, report = trim_silence(pcm, SR, energy_threshold=1000, pause_threshold=0.8)
+    assert trimmed is pcm
+    assert report.dropped_seconds == 0
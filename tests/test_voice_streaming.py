@@ -0,0 +1,50 @@
+import time
+from threading import Thread
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sounddevice")
+pytest.importorskip("soundfile")
+
+from scripts.speech_backends import StubBackend  # noqa: E402
+from scripts.voice_nika import VoiceToTextConverter  # noqa: E402
+
+RATE = 16000
+
+
+def stream(converter, pcm, block=1600, backlog=None):
+    """Прогоняет звук через поток распознавания фраз, как это делает запись с микрофона.
+    backlog — сколько неосвобождённых сэмплов допускать перед следующим блоком (имитация реального времени)."""
+    converter.buffer.clear()
+    converter.buffer.register("stream")
+    converter.worker = Thread(target=converter._stream_worker, daemon=True)
+    converter.worker.start()
+    for i in range(0, len(pcm), block):
+        converter.buffer.write(pcm[i:i + block])
+        deadline = time.monotonic() + 1
+        while backlog is not None and len(converter.buffer) > backlog and time.monotonic() < deadline:
+            time.sleep(0.001)
+    return converter.finish_streaming(timeout=5)
+
+
+def speech(seconds, amplitude):
+    return (np.sin(np.arange(int(seconds * RATE)) * 0.3) * amplitude).astype(np.int16)
+
+
+def test_speech_below_energy_threshold_is_recognized():
+    converter = VoiceToTextConverter(streaming=True, backend=StubBackend("привет"), audio_dir=None)
+    # RMS ≈ 2100 — обычная речь, но ниже energy_threshold=4000
+    pcm = np.concatenate([speech(1.5, 3000), np.zeros(RATE, dtype=np.int16), speech(1.5, 3000)])
+    assert stream(converter, pcm) == "привет"
+    assert converter.dropped_seconds == 0
+
+
+def test_silence_between_phrases_is_released():
+    converter = VoiceToTextConverter(streaming=True, backend=StubBackend("привет"), audio_dir=None)
+    initial = converter.buffer.capacity
+    pcm = np.concatenate([speech(1, 10000), np.zeros(40 * RATE, dtype=np.int16), speech(1, 10000),
+                          np.zeros(RATE, dtype=np.int16)])
+    assert stream(converter, pcm, backlog=3 * RATE) == "привет привет"
+    # Пауза длиннее начальной ёмкости буфера не заставила его расти
+    assert converter.buffer.capacity == initial